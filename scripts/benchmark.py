@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+
+"""Benchmarks for loading projects.
+
+Usage:
+
+    python scripts/benchmark.py parse /path/to/Project.xcodeproj
+    python scripts/benchmark.py construct /path/to/Project.xcodeproj
+    python scripts/benchmark.py schemes /path/to/Scheme.xcscheme
+    python scripts/benchmark.py schemes /tmp/Synthetic.xcscheme --synthetic-tests 20000
+"""
+
+import argparse
+import functools
+import os
+import shutil
+import statistics
+import sys
+import time
+import tracemalloc
+from collections.abc import Callable
+from typing import Any
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+# pylint: disable=wrong-import-position
+import deserialize  # noqa: E402
+
+import xcodeproj  # noqa: E402
+from xcodeproj import _deserialize_object, _load_pbxproj  # noqa: E402
+from xcodeproj.constructors import construct  # noqa: E402
+from xcodeproj.schemeparser import parse_scheme_file  # noqa: E402
+
+# pylint: enable=wrong-import-position
+
+
+def measure(name: str, function: Callable[[], Any], iterations: int) -> None:
+    """Time a function and print the results.
+
+    :param name: The name to print for the measurement
+    :param function: The function to time
+    :param iterations: The number of times to run the function
+    """
+
+    timings: list[float] = []
+
+    for _ in range(iterations):
+        start = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - start)
+
+    print(
+        f"{name:<24} min {min(timings) * 1000:9.1f} ms"
+        f"   mean {statistics.mean(timings) * 1000:9.1f} ms"
+        f"   ({iterations} runs)"
+    )
+
+
+def measure_peak_memory(name: str, function: Callable[[], Any]) -> None:
+    """Measure the most memory a function allocates at once and print it.
+
+    :param name: The name to print for the measurement
+    :param function: The function to measure
+    """
+
+    tracemalloc.start()
+
+    try:
+        function()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    print(f"{name:<24} peak {peak / (1024 * 1024):9.1f} MiB")
+
+
+def benchmark_parse(project_path: str, iterations: int) -> None:
+    """Compare the built-in parser with plutil, and the ways of loading a project.
+
+    :param project_path: The path to the xcodeproj
+    :param iterations: The number of times to run each measurement
+    """
+
+    measure("parser", lambda: _load_pbxproj(project_path), iterations)
+
+    if shutil.which("plutil") is None:
+        print("plutil               not available")
+    else:
+        measure("plutil", lambda: _load_pbxproj(project_path, use_plutil=True), iterations)
+
+    measure("XcodeProject", lambda: xcodeproj.XcodeProject(project_path), iterations)
+    measure(
+        "XcodeProject (lazy)",
+        lambda: xcodeproj.XcodeProject(project_path, lazy=True).targets(),
+        iterations,
+    )
+
+    def parse_then_construct() -> dict[str, Any]:
+        objects = _load_pbxproj(project_path)["objects"]
+        return {key: _deserialize_object(key, value, throw_on_unhandled=True) for key, value in objects.items()}
+
+    # Building objects as they are parsed is compared with building them once the whole file is parsed
+    measure_peak_memory("parser", lambda: _load_pbxproj(project_path))
+    measure_peak_memory("parse, then construct", parse_then_construct)
+    measure_peak_memory(
+        "construct while parsing",
+        lambda: _load_pbxproj(
+            project_path,
+            object_hook=functools.partial(_deserialize_object, throw_on_unhandled=True),
+        ),
+    )
+    measure_peak_memory("XcodeProject", lambda: xcodeproj.XcodeProject(project_path))
+    measure_peak_memory("XcodeProject (lazy)", lambda: xcodeproj.XcodeProject(project_path, lazy=True).targets())
+
+
+def benchmark_construct(project_path: str, iterations: int) -> None:
+    """Compare the compiled constructors with the deserialize library.
+
+    :param project_path: The path to the xcodeproj
+    :param iterations: The number of times to run each measurement
+    """
+
+    objects = _load_pbxproj(project_path)["objects"]
+
+    for key, value in objects.items():
+        value["object_key"] = key
+
+    def run_deserialize() -> None:
+        for value in objects.values():
+            deserialize.deserialize(
+                xcodeproj.PBXObject,
+                value,
+                throw_on_unhandled=True,
+                raw_storage_mode=deserialize.RawStorageMode.ALL,
+            )
+
+    def run_construct() -> None:
+        for value in objects.values():
+            construct(xcodeproj.PBXObject, value, throw_on_unhandled=True)
+
+    measure("deserialize", run_deserialize, iterations)
+    measure("construct", run_construct, iterations)
+
+
+def write_synthetic_scheme(scheme_path: str, test_count: int) -> None:
+    """Write a scheme with a large number of selected and skipped tests.
+
+    :param scheme_path: The path to write the scheme to
+    :param test_count: The number of tests to list, split across five testables
+    """
+
+    lines = [
+        '<?xml version="1.0" encoding="UTF-8"?>',
+        '<Scheme LastUpgradeVersion = "1500" version = "1.7">',
+        '   <TestAction buildConfiguration = "Debug" shouldUseLaunchSchemeArgsEnv = "YES">',
+        "      <Testables>",
+    ]
+
+    for testable in range(5):
+        lines += [
+            '         <TestableReference skipped = "NO" parallelizable = "YES">',
+            "            <BuildableReference",
+            '               BuildableIdentifier = "primary"',
+            f'               BlueprintIdentifier = "{testable:024X}"',
+            f'               BuildableName = "Tests{testable}.xctest"',
+            f'               BlueprintName = "Tests{testable}"',
+            '               ReferencedContainer = "container:App.xcodeproj">',
+            "            </BuildableReference>",
+            "            <SkippedTests>" if testable % 2 else "            <SelectedTests>",
+        ]
+        lines += [
+            f'               <Test Identifier = "Suite{test // 100}/test{test}()"></Test>'
+            for test in range(testable, test_count, 5)
+        ]
+        lines += [
+            "            </SkippedTests>" if testable % 2 else "            </SelectedTests>",
+            "         </TestableReference>",
+        ]
+
+    lines += ["      </Testables>", "   </TestAction>", "</Scheme>", ""]
+
+    with open(scheme_path, "w", encoding="utf-8") as scheme_file:
+        scheme_file.write("\n".join(lines))
+
+
+def benchmark_schemes(scheme_path: str, iterations: int) -> None:
+    """Compare the streaming scheme parser with the ElementTree one.
+
+    :param scheme_path: The path to the xcscheme
+    :param iterations: The number of times to run each measurement
+    """
+
+    measure("ElementTree", lambda: xcodeproj.Scheme.from_file(scheme_path), iterations)
+    measure("expat", lambda: parse_scheme_file(scheme_path), iterations)
+    measure_peak_memory("ElementTree", lambda: xcodeproj.Scheme.from_file(scheme_path))
+    measure_peak_memory("expat", lambda: parse_scheme_file(scheme_path))
+
+
+def main() -> None:
+    """Run the benchmarks."""
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("benchmark", choices=["parse", "construct", "schemes"], help="The benchmark to run")
+    parser.add_argument("project", help="The path to the xcodeproj, or xcscheme, to benchmark with")
+    parser.add_argument("-n", "--iterations", type=int, default=5, help="The number of runs for each measurement")
+    parser.add_argument(
+        "--synthetic-tests",
+        type=int,
+        help="For the schemes benchmark, write a scheme with this many tests to the path first",
+    )
+    args = parser.parse_args()
+
+    if args.benchmark == "parse":
+        benchmark_parse(args.project, args.iterations)
+    elif args.benchmark == "construct":
+        benchmark_construct(args.project, args.iterations)
+    elif args.benchmark == "schemes":
+        if args.synthetic_tests is not None:
+            write_synthetic_scheme(args.project, args.synthetic_tests)
+
+        benchmark_schemes(args.project, args.iterations)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,12 @@
 """Tests for the package."""
 
 import os
+import pathlib
 import pickle
+import shutil
 import tempfile
+from collections.abc import Iterable
+from typing import Any, cast
 
 import pytest
 
@@ -64,21 +68,15 @@ def test_targets(one: xcodeproj.XcodeProject) -> None:
     targets = one.targets()
     assert len(targets) == 4
 
-    watch_extension = targets[0]
-    assert watch_extension.product_name == "wat WatchKit Extension"
-    assert watch_extension.object_key == "DD624D2E25B05EEE0081F68F"
-
-    cljtest = targets[1]
-    assert cljtest.product_name == "CLJTest"
-    assert cljtest.object_key == "DD74C32525AF302A00C4A922"
-
-    watch_app = targets[2]
-    assert watch_app.product_name == "wat WatchKit App"
-    assert watch_app.object_key == "DD624D1F25B05EED0081F68F"
+    expected = {
+        "DD624D2E25B05EEE0081F68F": "wat WatchKit Extension",
+        "DD74C32525AF302A00C4A922": "CLJTest",
+        "DD624D1F25B05EED0081F68F": "wat WatchKit App",
+        "DD624D1C25B05EED0081F68F": "wat",
+    }
 
-    watch_container = targets[3]
-    assert watch_container.product_name == "wat"
-    assert watch_container.object_key == "DD624D1C25B05EED0081F68F"
+    for target in targets:
+        assert target.product_name == expected[target.object_key]
 
 
 def test_target_by_name(one: xcodeproj.XcodeProject) -> None:
@@ -102,77 +100,82 @@ def test_get_paths(one: xcodeproj.XcodeProject, two: xcodeproj.XcodeProject) ->
     :param two: A different project
     """
 
-    expected = [
-        "wat WatchKit App/Info.plist",
-        "wat WatchKit Extension/ComplicationController.swift",
-        "wat WatchKit Extension/InterfaceController.swift",
-        "CLJTest/SceneDelegate.swift",
-        "CLJTest/Info.plist",
-        "CLJTest/CLJTest-Bridging-Header.h",
-        "wat WatchKit Extension/Info.plist",
-        "wat WatchKit App/Assets.xcassets",
-        "Carthage/Build/CocoaLumberjack.xcframework",
-        "wat WatchKit Extension/NotificationController.swift",
-        "CLJTest/AppDelegate.swift",
-        "wat WatchKit Extension.appex",
-        "CLJTest.app",
-        "CLJTest/Base.lproj/LaunchScreen.storyboard",
-        "wat WatchKit App/Base.lproj/Interface.storyboard",
-        "wat WatchKit Extension/Assets.xcassets",
-        "CLJTest/Assets.xcassets",
-        "CLJTest/test.m",
-        "wat WatchKit Extension/PushNotificationPayload.apns",
-        "CLJTest/ViewController.swift",
-        "wat WatchKit Extension/ExtensionDelegate.swift",
-        "wat.app",
-        "CLJTest/Base.lproj/Main.storyboard",
-        "wat WatchKit App.app",
-    ]
-
-    for index, item in enumerate(one.fetch_type(xcodeproj.PBXFileReference).values()):
-        assert item.relative_path() == expected[index]
+    expected = {
+        "DD62471C25AF30BD0081F68F": "CLJTest/CLJTest-Bridging-Header.h",
+        "DD62471D25AF30BE0081F68F": "CLJTest/test.m",
+        "DD624D1825B05ED30081F68F": "Carthage/Build/CocoaLumberjack.xcframework",
+        "DD624D1D25B05EED0081F68F": "wat.app",
+        "DD624D2025B05EED0081F68F": "wat WatchKit App.app",
+        "DD624D2625B05EED0081F68F": "wat WatchKit App/Base.lproj/Interface.storyboard",
+        "DD624D2825B05EEE0081F68F": "wat WatchKit App/Assets.xcassets",
+        "DD624D2A25B05EEE0081F68F": "wat WatchKit App/Info.plist",
+        "DD624D2F25B05EEE0081F68F": "wat WatchKit Extension.appex",
+        "DD624D3425B05EEE0081F68F": "wat WatchKit Extension/InterfaceController.swift",
+        "DD624D3625B05EEE0081F68F": "wat WatchKit Extension/ExtensionDelegate.swift",
+        "DD624D3825B05EEE0081F68F": "wat WatchKit Extension/NotificationController.swift",
+        "DD624D3A25B05EEE0081F68F": "wat WatchKit Extension/ComplicationController.swift",
+        "DD624D3C25B05EEE0081F68F": "wat WatchKit Extension/Assets.xcassets",
+        "DD624D3E25B05EEE0081F68F": "wat WatchKit Extension/Info.plist",
+        "DD624D3F25B05EEF0081F68F": "wat WatchKit Extension/PushNotificationPayload.apns",
+        "DD74C32625AF302A00C4A922": "CLJTest.app",
+        "DD74C32925AF302A00C4A922": "CLJTest/AppDelegate.swift",
+        "DD74C32B25AF302A00C4A922": "CLJTest/SceneDelegate.swift",
+        "DD74C32D25AF302A00C4A922": "CLJTest/ViewController.swift",
+        "DD74C33025AF302A00C4A922": "CLJTest/Base.lproj/Main.storyboard",
+        "DD74C33225AF302C00C4A922": "CLJTest/Assets.xcassets",
+        "DD74C33525AF302C00C4A922": "CLJTest/Base.lproj/LaunchScreen.storyboard",
+        "DD74C33725AF302C00C4A922": "CLJTest/Info.plist",
+    }
+
+    file_references = one.fetch_type(xcodeproj.PBXFileReference)
+    assert sorted(file_references.keys()) == sorted(expected.keys())
+
+    for key, item in file_references.items():
+        assert item.relative_path() == expected[key]
         absolute_path = item.absolute_path()
 
         assert absolute_path is not None
 
         if absolute_path.startswith("$(BUILT_PRODUCTS_DIR)/"):
-            assert absolute_path == "$(BUILT_PRODUCTS_DIR)/" + expected[index]
+            assert absolute_path == "$(BUILT_PRODUCTS_DIR)/" + expected[key]
         else:
-            assert absolute_path == os.path.join(COLLATERAL_PATH, expected[index])
+            assert absolute_path == os.path.join(COLLATERAL_PATH, expected[key])
 
     # Groups with no `path` attribute (only a `name`) are "virtual" and
     # transparent in the path chain — they contribute nothing, matching the
     # behaviour of the Ruby xcodeproj library.
-    groups = [
-        "wat WatchKit App",
-        "",
-        "CLJTest",
-        "CLJTest",
-        "wat WatchKit App",
-        "CLJTest",
-        "",
-        "",
-        "wat WatchKit Extension",
-    ]
-
-    for index, group in enumerate(one.fetch_type(xcodeproj.PBXGroup).values()):
-        value = groups[index]
+    groups = {
+        "DD62471925AF30980081F68F": "",
+        "DD624D2425B05EED0081F68F": "wat WatchKit App",
+        "DD624D3325B05EEE0081F68F": "wat WatchKit Extension",
+        "DD74C31D25AF302A00C4A922": "",
+        "DD74C32725AF302A00C4A922": "",
+        "DD74C32825AF302A00C4A922": "CLJTest",
+        "DD624D2525B05EED0081F68F": "wat WatchKit App",
+        "DD74C32F25AF302A00C4A922": "CLJTest",
+        "DD74C33425AF302C00C4A922": "CLJTest",
+    }
+
+    all_groups = one.fetch_type(xcodeproj.PBXGroup)
+    assert sorted(all_groups.keys()) == sorted(groups.keys())
+
+    for key, group in all_groups.items():
+        value = groups[key]
         assert group.relative_path() == value
-        if value is None:
-            continue
         assert group.absolute_path() == os.path.join(COLLATERAL_PATH, value)
 
-    version_groups = ["TestVersionGroup", "TestVersionGroup"]
+    version_groups = two.fetch_type(xcodeproj.XCVersionGroup)
+    assert sorted(version_groups.keys()) == ["X174C32825AF302A00C4A922", "XD74C32825AF302A00C4A922"]
 
-    for index, version_group in enumerate(two.fetch_type(xcodeproj.XCVersionGroup).values()):
-        if index == 0:
-            with pytest.raises(Exception):
-                _ = version_group.relative_path()
-            with pytest.raises(Exception):
-                _ = version_group.absolute_path()
-        else:
-            assert version_group.relative_path() == version_groups[index]
-            assert version_group.absolute_path() == os.path.join(COLLATERAL_PATH, version_groups[index])
+    # This group has an unknown source tree
+    with pytest.raises(Exception):
+        _ = version_groups["X174C32825AF302A00C4A922"].relative_path()
+    with pytest.raises(Exception):
+        _ = version_groups["X174C32825AF302A00C4A922"].absolute_path()
+
+    version_group = version_groups["XD74C32825AF302A00C4A922"]
+    assert version_group.relative_path() == "TestVersionGroup"
+    assert version_group.absolute_path() == os.path.join(COLLATERAL_PATH, "TestVersionGroup")
 
 
 def test_get_paths_prepopulated(one: xcodeproj.XcodeProject, two: xcodeproj.XcodeProject) -> None:
@@ -185,74 +188,79 @@ def test_get_paths_prepopulated(one: xcodeproj.XcodeProject, two: xcodeproj.Xcod
     one.populate_paths()
     two.populate_paths()
 
-    expected = [
-        "wat WatchKit App/Info.plist",
-        "wat WatchKit Extension/ComplicationController.swift",
-        "wat WatchKit Extension/InterfaceController.swift",
-        "CLJTest/SceneDelegate.swift",
-        "CLJTest/Info.plist",
-        "CLJTest/CLJTest-Bridging-Header.h",
-        "wat WatchKit Extension/Info.plist",
-        "wat WatchKit App/Assets.xcassets",
-        "Carthage/Build/CocoaLumberjack.xcframework",
-        "wat WatchKit Extension/NotificationController.swift",
-        "CLJTest/AppDelegate.swift",
-        "wat WatchKit Extension.appex",
-        "CLJTest.app",
-        "CLJTest/Base.lproj/LaunchScreen.storyboard",
-        "wat WatchKit App/Base.lproj/Interface.storyboard",
-        "wat WatchKit Extension/Assets.xcassets",
-        "CLJTest/Assets.xcassets",
-        "CLJTest/test.m",
-        "wat WatchKit Extension/PushNotificationPayload.apns",
-        "CLJTest/ViewController.swift",
-        "wat WatchKit Extension/ExtensionDelegate.swift",
-        "wat.app",
-        "CLJTest/Base.lproj/Main.storyboard",
-        "wat WatchKit App.app",
-    ]
-
-    for index, item in enumerate(one.fetch_type(xcodeproj.PBXFileReference).values()):
-        assert item.relative_path() == expected[index]
+    expected = {
+        "DD62471C25AF30BD0081F68F": "CLJTest/CLJTest-Bridging-Header.h",
+        "DD62471D25AF30BE0081F68F": "CLJTest/test.m",
+        "DD624D1825B05ED30081F68F": "Carthage/Build/CocoaLumberjack.xcframework",
+        "DD624D1D25B05EED0081F68F": "wat.app",
+        "DD624D2025B05EED0081F68F": "wat WatchKit App.app",
+        "DD624D2625B05EED0081F68F": "wat WatchKit App/Base.lproj/Interface.storyboard",
+        "DD624D2825B05EEE0081F68F": "wat WatchKit App/Assets.xcassets",
+        "DD624D2A25B05EEE0081F68F": "wat WatchKit App/Info.plist",
+        "DD624D2F25B05EEE0081F68F": "wat WatchKit Extension.appex",
+        "DD624D3425B05EEE0081F68F": "wat WatchKit Extension/InterfaceController.swift",
+        "DD624D3625B05EEE0081F68F": "wat WatchKit Extension/ExtensionDelegate.swift",
+        "DD624D3825B05EEE0081F68F": "wat WatchKit Extension/NotificationController.swift",
+        "DD624D3A25B05EEE0081F68F": "wat WatchKit Extension/ComplicationController.swift",
+        "DD624D3C25B05EEE0081F68F": "wat WatchKit Extension/Assets.xcassets",
+        "DD624D3E25B05EEE0081F68F": "wat WatchKit Extension/Info.plist",
+        "DD624D3F25B05EEF0081F68F": "wat WatchKit Extension/PushNotificationPayload.apns",
+        "DD74C32625AF302A00C4A922": "CLJTest.app",
+        "DD74C32925AF302A00C4A922": "CLJTest/AppDelegate.swift",
+        "DD74C32B25AF302A00C4A922": "CLJTest/SceneDelegate.swift",
+        "DD74C32D25AF302A00C4A922": "CLJTest/ViewController.swift",
+        "DD74C33025AF302A00C4A922": "CLJTest/Base.lproj/Main.storyboard",
+        "DD74C33225AF302C00C4A922": "CLJTest/Assets.xcassets",
+        "DD74C33525AF302C00C4A922": "CLJTest/Base.lproj/LaunchScreen.storyboard",
+        "DD74C33725AF302C00C4A922": "CLJTest/Info.plist",
+    }
+
+    file_references = one.fetch_type(xcodeproj.PBXFileReference)
+    assert sorted(file_references.keys()) == sorted(expected.keys())
+
+    for key, item in file_references.items():
+        assert item.relative_path() == expected[key]
         absolute_path = item.absolute_path()
 
         assert absolute_path is not None
 
         if absolute_path.startswith("$(BUILT_PRODUCTS_DIR)/"):
-            assert absolute_path == "$(BUILT_PRODUCTS_DIR)/" + expected[index]
+            assert absolute_path == "$(BUILT_PRODUCTS_DIR)/" + expected[key]
         else:
-            assert absolute_path == os.path.join(COLLATERAL_PATH, expected[index])
-
-    groups = [
-        "wat WatchKit App",
-        "",
-        "CLJTest",
-        "CLJTest",
-        "wat WatchKit App",
-        "CLJTest",
-        "",
-        "",
-        "wat WatchKit Extension",
-    ]
-
-    for index, group in enumerate(one.fetch_type(xcodeproj.PBXGroup).values()):
-        value = groups[index]
+            assert absolute_path == os.path.join(COLLATERAL_PATH, expected[key])
+
+    groups = {
+        "DD62471925AF30980081F68F": "",
+        "DD624D2425B05EED0081F68F": "wat WatchKit App",
+        "DD624D3325B05EEE0081F68F": "wat WatchKit Extension",
+        "DD74C31D25AF302A00C4A922": "",
+        "DD74C32725AF302A00C4A922": "",
+        "DD74C32825AF302A00C4A922": "CLJTest",
+        "DD624D2525B05EED0081F68F": "wat WatchKit App",
+        "DD74C32F25AF302A00C4A922": "CLJTest",
+        "DD74C33425AF302C00C4A922": "CLJTest",
+    }
+
+    all_groups = one.fetch_type(xcodeproj.PBXGroup)
+    assert sorted(all_groups.keys()) == sorted(groups.keys())
+
+    for key, group in all_groups.items():
+        value = groups[key]
         assert group.relative_path() == value
-        if value is None:
-            continue
         assert group.absolute_path() == os.path.join(COLLATERAL_PATH, value)
 
-    version_groups = ["TestVersionGroup", "TestVersionGroup"]
+    version_groups = two.fetch_type(xcodeproj.XCVersionGroup)
+    assert sorted(version_groups.keys()) == ["X174C32825AF302A00C4A922", "XD74C32825AF302A00C4A922"]
 
-    for index, version_group in enumerate(two.fetch_type(xcodeproj.XCVersionGroup).values()):
-        if index == 0:
-            with pytest.raises(Exception):
-                _ = version_group.relative_path()
-            with pytest.raises(Exception):
-                _ = version_group.absolute_path()
-        else:
-            assert version_group.relative_path() == version_groups[index]
-            assert version_group.absolute_path() == os.path.join(COLLATERAL_PATH, version_groups[index])
+    # This group has an unknown source tree
+    with pytest.raises(Exception):
+        _ = version_groups["X174C32825AF302A00C4A922"].relative_path()
+    with pytest.raises(Exception):
+        _ = version_groups["X174C32825AF302A00C4A922"].absolute_path()
+
+    version_group = version_groups["XD74C32825AF302A00C4A922"]
+    assert version_group.relative_path() == "TestVersionGroup"
+    assert version_group.absolute_path() == os.path.join(COLLATERAL_PATH, "TestVersionGroup")
 
     reference_proxy_expectations = [("BUILT_PRODUCTS_DIR", "SomeTest.framework")]
 
@@ -275,6 +283,97 @@ def test_get_parents(two: xcodeproj.XcodeProject) -> None:
     assert scene_delegate_parent.object_key == "DD74C32825AF302A00C4A922"
 
 
+def test_get_all_parents() -> None:
+    """Test that every parent of a reference in multiple groups is found."""
+
+    project = xcodeproj.XcodeProject(os.path.join(COLLATERAL_PATH, "Two.xcodeproj"))
+    scene_delegate = cast(xcodeproj.PBXPathObject, project.objects["DD74C32B25AF302A00C4A922"])
+    main_group = project.project.main_group
+    main_group.children_ids.append(scene_delegate.object_key)
+
+    parent_keys = project.parent_group_keys(scene_delegate.object_key)
+
+    assert sorted(parent_keys) == sorted(["DD74C32825AF302A00C4A922", main_group.object_key])
+    assert [group.object_key for group in scene_delegate.parent_groups()] == parent_keys
+    assert project.parent_group_keys("missing") == []
+
+    parent = scene_delegate.parent_group()
+
+    assert parent is not None
+    assert parent.object_key == parent_keys[0]
+    assert main_group.parent_group() is None
+
+
+def test_absolute_paths(one: xcodeproj.XcodeProject, two: xcodeproj.XcodeProject) -> None:
+    """Test that the bulk paths match the paths of each object.
+
+    :param one: The project
+    :param two: A different project
+    """
+
+    for project in [one, two]:
+        paths = project.absolute_paths()
+        path_objects = project.fetch_type(xcodeproj.PBXPathObject)
+
+        for object_key, path in paths.items():
+            assert path_objects[object_key].absolute_path() == path
+
+        assert paths["DD74C32925AF302A00C4A922"] == os.path.join(project.source_root, "CLJTest", "AppDelegate.swift")
+
+
+def test_populate_deep_groups(tmp_path: pathlib.Path) -> None:
+    """Test that deeply nested groups don't hit the recursion limit.
+
+    :param tmp_path: A temporary directory
+    """
+
+    depth = 3000
+    project_path = os.path.join(tmp_path, "One.xcodeproj")
+    shutil.copytree(os.path.join(COLLATERAL_PATH, "One.xcodeproj"), project_path)
+    pbxproj_path = os.path.join(project_path, "project.pbxproj")
+
+    def key(prefix: str, index: int) -> str:
+        return f"{prefix}{index:022X}"
+
+    # A chain of folders, then a chain of virtual groups, with a file at the bottom
+    groups = []
+
+    for index in range(depth):
+        child = key("AA", index + 1) if index + 1 < depth else key("BB", 0)
+        groups.append(
+            f'{key("AA", index)} = {{isa = PBXGroup; children = ({child}); path = d; sourceTree = "<group>";}};'
+        )
+
+    for index in range(depth):
+        child = key("BB", index + 1) if index + 1 < depth else key("CC", 0)
+        groups.append(f'{key("BB", index)} = {{isa = PBXGroup; children = ({child}); sourceTree = "<group>";}};')
+
+    groups.append(f'{key("CC", 0)} = {{isa = PBXFileReference; path = a.swift; sourceTree = "<group>";}};')
+
+    with open(pbxproj_path, encoding="utf-8") as pbxproj_file:
+        contents = pbxproj_file.read()
+
+    contents = contents.replace("/* Begin PBXGroup section */", "/* Begin PBXGroup section */\n" + "\n".join(groups))
+    contents = contents.replace(
+        "DD74C32825AF302A00C4A922 /* CLJTest */,",
+        f"DD74C32825AF302A00C4A922 /* CLJTest */, {key('AA', 0)},",
+        1,
+    )
+
+    with open(pbxproj_path, "w", encoding="utf-8") as pbxproj_file:
+        pbxproj_file.write(contents)
+
+    project = xcodeproj.XcodeProject(project_path)
+    project.populate_paths()
+
+    expected = os.path.join(*(["d"] * depth), "a.swift")
+    file_reference = project.objects[key("CC", 0)]
+
+    assert isinstance(file_reference, xcodeproj.PBXFileReference)
+    assert file_reference.relative_path() == expected
+    assert project.absolute_paths()[key("CC", 0)] == os.path.join(project.source_root, expected)
+
+
 def test_build_configuration(one: xcodeproj.XcodeProject) -> None:
     """Test that build configuration works
 
@@ -359,6 +458,217 @@ def test_target_containing_phase(one: xcodeproj.XcodeProject) -> None:
     assert target2 is None
 
 
+def test_target_index(two: xcodeproj.XcodeProject) -> None:
+    """Check that the target index agrees with the linear lookups.
+
+    :param two: The project
+    """
+
+    targets = two.targets()
+
+    assert two.targets_by_name([target.name for target in targets] + ["hodor"]) == {
+        **{target.name: target for target in targets},
+        "hodor": None,
+    }
+
+    phase_keys = [phase_id for target in targets for phase_id in target.build_phases_ids]
+    owners = two.targets_containing_phases(phase_keys + ["hodor"])
+
+    assert owners["hodor"] is None
+
+    for target in targets:
+        for phase_id in target.build_phases_ids:
+            assert owners[phase_id] is target
+
+    assert two.duplicate_target_names() == {}
+    assert two.build_configuration_list_for_target("hodor") is None
+
+
+def test_target_index_aggregates(tmp_path: pathlib.Path) -> None:
+    """Check that aggregate targets are indexed and duplicate names are reported.
+
+    :param tmp_path: A temporary directory
+    """
+
+    project_path = os.path.join(tmp_path, "Two.xcodeproj")
+    shutil.copytree(os.path.join(COLLATERAL_PATH, "Two.xcodeproj"), project_path)
+    pbxproj_path = os.path.join(project_path, "project.pbxproj")
+
+    with open(pbxproj_path, encoding="utf-8") as pbxproj_file:
+        contents = pbxproj_file.read()
+
+    aggregate = """
+/* Begin PBXAggregateTarget section */
+\t\tAA0000000000000000000001 /* wat */ = {
+\t\t\tisa = PBXAggregateTarget;
+\t\t\tbuildConfigurationList = DD624D4825B05EEF0081F68F;
+\t\t\tbuildPhases = (
+\t\t\t\tDD74C32225AF302A00C4A922,
+\t\t\t\tAA0000000000000000000002,
+\t\t\t);
+\t\t\tdependencies = (
+\t\t\t);
+\t\t\tname = wat;
+\t\t\tproductName = wat;
+\t\t};
+/* End PBXAggregateTarget section */
+"""
+
+    with open(pbxproj_path, "w", encoding="utf-8") as pbxproj_file:
+        pbxproj_file.write(
+            contents.replace(
+                "\n/* Begin PBXNativeTarget section */", aggregate + "\n/* Begin PBXNativeTarget section */"
+            )
+        )
+
+    project = xcodeproj.XcodeProject(project_path)
+
+    named = project.targets_named("wat")
+    assert [type(target) for target in named] == [xcodeproj.PBXAggregateTarget, xcodeproj.PBXNativeTarget]
+    assert project.duplicate_target_names() == {"wat": named}
+
+    # The singular lookups only return native targets
+    native = project.target_by_name("wat")
+    assert native is named[1]
+    assert project.build_configuration_list_for_target("wat") is native.build_configuration_list
+
+    cljtest = project.target_by_name("CLJTest")
+    assert project.target_containing_phase("DD74C32225AF302A00C4A922") is cljtest
+    assert project.target_containing_phase("AA0000000000000000000002") is None
+    assert project.target_index().target_containing_phase("AA0000000000000000000002", xcodeproj.PBXTarget) is named[0]
+
+
+def test_membership_index(two: xcodeproj.XcodeProject) -> None:
+    """Check that the membership index agrees with walking the targets.
+
+    :param two: The project
+    """
+
+    expected_targets: dict[str, list[xcodeproj.PBXTarget]] = {}
+    expected_phases: dict[str, list[xcodeproj.PBXBuildPhase]] = {}
+
+    for target in two.fetch_type(xcodeproj.PBXTarget).values():
+        files_by_phase_type: dict[type[xcodeproj.PBXBuildPhase], list[xcodeproj.PBXPathObject]] = {}
+
+        for build_phase in target.build_phases:
+            phase_files = files_by_phase_type.setdefault(type(build_phase), [])
+
+            for build_file in build_phase.files:
+                if build_file.file_ref_id is None:
+                    continue
+
+                phase_files.append(build_file.file_ref)
+                expected_phases.setdefault(build_file.file_ref_id, []).append(build_phase)
+                file_targets = expected_targets.setdefault(build_file.file_ref_id, [])
+
+                if target not in file_targets:
+                    file_targets.append(target)
+
+        assert two.target_files_by_phase_type(target) == files_by_phase_type
+
+    assert expected_targets
+    assert two.targets_containing_files(list(expected_targets)) == expected_targets
+
+    for file_ref_key, build_phases in expected_phases.items():
+        assert sorted(phase.object_key for phase in two.build_phases_containing_file(file_ref_key)) == sorted(
+            phase.object_key for phase in build_phases
+        )
+
+    assert two.targets_containing_file("hodor") == []
+    assert two.build_phases_containing_file("hodor") == []
+
+
+def test_path_index(two: xcodeproj.XcodeProject) -> None:
+    """Check looking up file references by path.
+
+    :param two: The project
+    """
+
+    expected = {
+        os.path.abspath(path): file_reference
+        for file_reference in two.fetch_type(xcodeproj.PBXFileReference).values()
+        if (path := file_reference.absolute_path()) is not None and not path.startswith("$(")
+    }
+
+    for path, file_reference in expected.items():
+        assert two.file_references_for_path(path) == [file_reference]
+
+    swift_path = os.path.join(COLLATERAL_PATH, "CLJTest", "AppDelegate.swift")
+    app_delegate = two.file_references_for_path(swift_path)
+
+    assert [file_reference.path for file_reference in app_delegate] == ["AppDelegate.swift"]
+    assert two.file_references_for_path(os.path.relpath(swift_path)) == app_delegate
+    assert two.file_references_for_path(swift_path.upper()) == []
+    assert two.file_references_for_path(swift_path.upper(), case_sensitive=False) == app_delegate
+    assert two.file_references_for_path(os.path.join(COLLATERAL_PATH, "hodor")) == []
+
+    cljtest_folder = os.path.join(COLLATERAL_PATH, "CLJTest")
+    under = two.file_references_under(cljtest_folder)
+
+    assert sorted(under, key=lambda file_reference: file_reference.object_key) == sorted(
+        (
+            file_reference
+            for path, file_reference in expected.items()
+            if path.startswith(os.path.abspath(cljtest_folder) + os.sep)
+        ),
+        key=lambda file_reference: file_reference.object_key,
+    )
+    assert two.file_references_under(cljtest_folder.lower()) == []
+    assert {file_reference.object_key for file_reference in under} == {
+        file_reference.object_key
+        for file_reference in two.file_references_under(cljtest_folder.lower(), case_sensitive=False)
+    }
+
+    # Sibling folders which share a prefix aren't included
+    assert two.file_references_under(cljtest_folder[:-1]) == []
+
+
+def test_reference_graph(two: xcodeproj.XcodeProject) -> None:
+    """Check the references between objects.
+
+    :param two: The project
+    """
+
+    graph = two.reference_graph()
+
+    for group in two.fetch_type(xcodeproj.PBXGroup).values():
+        assert graph.references_from(group.object_key) == group.children_ids
+
+        for child_id in group.children_ids:
+            assert group in two.referrers(child_id)
+
+    target = two.target_by_name("CLJTest")
+    assert target is not None
+    assert two.referrers(target.object_key) == [two.project]
+
+    build_file = next(
+        build_file
+        for build_file in two.fetch_type(xcodeproj.PBXBuildFile).values()
+        if build_file.file_ref_id is not None
+    )
+    impacted = graph.transitive_references_to(build_file.file_ref_id or "")
+
+    assert build_file.object_key in impacted
+    assert two.project.object_key in impacted
+
+    assert two.dangling_references() == {
+        "07231F3E207DA2FF007D566D": ["NOTAREALREFERENCE"],
+        "XD74C32825AF302A00C4A922": ["4"],
+        "X174C32825AF302A00C4A922": ["4"],
+    }
+    assert not graph.is_referenced("XD74C33725AF302C00C4A922")
+    assert "XD74C33725AF302C00C4A922" in graph.unreferenced()
+
+    # Proxies for objects in the project refer to them, but others only to their portal
+    assert graph.references_from("DD624D2225B05EED0081F68F") == ["DD74C31E25AF302A00C4A922", "DD624D1F25B05EED0081F68F"]
+    assert graph.references_from("07231F3E207DA2FF007D566D") == ["NOTAREALREFERENCE"]
+
+    # Objects whose project has gone can still build a graph
+    objects = xcodeproj.XcodeProject(os.path.join(COLLATERAL_PATH, "Two.xcodeproj")).objects
+    detached = xcodeproj.ReferenceGraph((key, value.referenced_keys()) for key, value in objects.items())
+    assert detached.references_from("DD624D2225B05EED0081F68F") == ["DD74C31E25AF302A00C4A922"]
+
+
 def test_pickling(one: xcodeproj.XcodeProject) -> None:
     """Test that pickling works.
 
@@ -382,6 +692,149 @@ def test_pickling(one: xcodeproj.XcodeProject) -> None:
         os.remove(temp)
 
 
+def test_lazy_loading(one: xcodeproj.XcodeProject) -> None:
+    """Test that lazily loaded projects only deserialize what is accessed.
+
+    :param one: The project
+    """
+
+    project = xcodeproj.XcodeProject(one.path, lazy=True)
+    objects = project.objects
+
+    assert isinstance(objects, xcodeproj.LazyObjects)
+    assert not objects.is_materialized("DD74C32525AF302A00C4A922")
+
+    targets = project.targets()
+
+    assert targets == one.targets()
+    assert objects.is_materialized("DD74C32525AF302A00C4A922")
+    assert not objects.is_materialized(targets[0].build_phases_ids[0])
+    assert isinstance(objects.peek(targets[0].build_phases_ids[0]), dict)
+
+    assert targets[0].build_phases[0].objects() is objects
+    assert targets[0].project() is project
+    assert objects.is_materialized(targets[0].build_phases_ids[0])
+
+
+def test_lazy_matches_eager(two: xcodeproj.XcodeProject) -> None:
+    """Test that lazily loaded projects are the same as eagerly loaded ones.
+
+    :param two: The project
+    """
+
+    project = xcodeproj.XcodeProject(two.path, lazy=True)
+    project.populate_paths()
+    two.populate_paths()
+
+    file_references = project.fetch_type(xcodeproj.PBXFileReference)
+
+    assert set(file_references) == set(two.fetch_type(xcodeproj.PBXFileReference))
+    assert {key: value.relative_path() for key, value in file_references.items()} == {
+        key: value.relative_path() for key, value in two.fetch_type(xcodeproj.PBXFileReference).items()
+    }
+    assert dict(project.objects.items()) == dict(two.objects.items())
+
+
+def test_lazy_pickling() -> None:
+    """Test that pickling a lazily loaded project stores all of its objects."""
+
+    project = xcodeproj.XcodeProject(os.path.join(COLLATERAL_PATH, "One.xcodeproj"), lazy=True)
+    loaded = pickle.loads(pickle.dumps(project))
+
+    assert type(loaded.objects) is xcodeproj.Objects
+    assert loaded.objects == project.objects
+    assert all(value.objects() is loaded.objects for value in loaded.objects.values())
+
+
+def test_lazy_copies(one: xcodeproj.XcodeProject) -> None:
+    """Test that every way of copying or comparing lazily loaded objects converts them.
+
+    :param one: The project
+    """
+
+    # Objects only hold weak references to their project, so the projects are kept alive here
+    projects: list[xcodeproj.XcodeProject] = []
+
+    def lazy_objects() -> xcodeproj.LazyObjects:
+        projects.append(xcodeproj.XcodeProject(one.path, lazy=True))
+        return cast(xcodeproj.LazyObjects, projects[-1].objects)
+
+    def is_converted(values: Iterable[Any]) -> bool:
+        return all(isinstance(value, xcodeproj.PBXObject) for value in values)
+
+    assert is_converted(dict(lazy_objects()).values())
+    assert is_converted({**lazy_objects()}.values())
+    assert is_converted(lazy_objects().copy().values())
+    assert is_converted((lazy_objects() | {}).values())
+    assert is_converted(({} | lazy_objects()).values())
+
+    updated: dict[str, Any] = {}
+    updated.update(lazy_objects())
+    assert is_converted(updated.values())
+
+    objects = lazy_objects()
+    assert isinstance(objects.setdefault("DD74C32525AF302A00C4A922"), xcodeproj.PBXNativeTarget)
+    assert isinstance(objects.popitem()[1], xcodeproj.PBXObject)
+
+    assert lazy_objects() == one.objects
+    assert one.objects == lazy_objects()
+    assert (lazy_objects() != one.objects) is False
+
+
+def test_type_index(two: xcodeproj.XcodeProject) -> None:
+    """Test that the type index matches a scan of the objects.
+
+    :param two: The project
+    """
+
+    for object_type in [
+        xcodeproj.PBXObject,
+        xcodeproj.PBXPathObject,
+        xcodeproj.PBXGroup,
+        xcodeproj.PBXVariantGroup,
+        xcodeproj.PBXFileReference,
+        xcodeproj.PBXBuildPhase,
+        xcodeproj.PBXTarget,
+    ]:
+        expected = [key for key, value in two.objects.items() if isinstance(value, object_type)]
+        assert list(two.fetch_type(object_type)) == expected
+
+    counts = two.object_counts()
+
+    assert sum(counts.values()) == len(two.objects)
+    assert counts["PBXProject"] == 1
+    assert counts["PBXFileReference"] == len(two.fetch_type(xcodeproj.PBXFileReference))
+
+
+def test_type_index_sees_new_objects() -> None:
+    """Test that objects added after the type index is built are found for types fetched later."""
+
+    project = xcodeproj.XcodeProject(os.path.join(COLLATERAL_PATH, "One.xcodeproj"))
+    assert project.object_counts()["PBXNativeTarget"] == 4
+
+    target = project.target_by_name("CLJTest")
+    assert target is not None
+    project.objects["EE0000000000000000000001"] = target
+    del project.objects[target.object_key]
+
+    assert project.object_counts()["PBXNativeTarget"] == 4
+    assert "EE0000000000000000000001" in project.fetch_type(xcodeproj.PBXNativeTarget)
+    assert target.object_key not in project.fetch_type(xcodeproj.PBXNativeTarget)
+
+    project.objects.pop("EE0000000000000000000001")
+    assert project.object_counts()["PBXNativeTarget"] == 3
+
+
+def test_lazy_object_counts() -> None:
+    """Test that counting objects doesn't deserialize them."""
+
+    project = xcodeproj.XcodeProject(os.path.join(COLLATERAL_PATH, "Two.xcodeproj"), lazy=True)
+    objects = cast(xcodeproj.LazyObjects, project.objects)
+
+    assert project.object_counts() == xcodeproj.XcodeProject(project.path).object_counts()
+    assert sum(objects.is_materialized(key) for key in objects) == 1
+
+
 def test_find_target_by_id(one: xcodeproj.XcodeProject) -> None:
     """Test that find_target by id works.
 
@@ -0,0 +1,266 @@
+"""Tests for build settings resolution."""
+
+import os
+import pathlib
+import shutil
+
+import pytest
+
+import xcodeproj
+
+COLLATERAL_PATH = os.path.join(os.path.abspath(os.path.join(os.path.abspath(__file__), "..")), "collateral")
+
+PROJECT_DEBUG_KEY = "DD74C33825AF302C00C4A922"
+TARGET_DEBUG_KEY = "DD74C33B25AF302C00C4A922"
+
+
+def _write(path: pathlib.Path, contents: str) -> None:
+    """Write a text file.
+
+    :param path: The path of the file
+    :param contents: The contents of the file
+    """
+
+    path.write_text(contents, encoding="utf-8")
+
+
+@pytest.fixture(name="project_path")
+def fixture_project_path(tmp_path: pathlib.Path) -> str:
+    """Copy a project and base its Debug configurations on xcconfig files.
+
+    :param tmp_path: A temporary directory
+
+    :returns: The path to the copied project
+    """
+
+    project_path = tmp_path / "One.xcodeproj"
+    shutil.copytree(os.path.join(COLLATERAL_PATH, "One.xcodeproj"), project_path)
+    pbxproj_path = project_path / "project.pbxproj"
+    contents = pbxproj_path.read_text(encoding="utf-8")
+
+    file_references = """/* Begin PBXFileReference section */
+\t\tCC0000000000000000000001 = {isa = PBXFileReference; path = Project.xcconfig; sourceTree = SOURCE_ROOT; };
+\t\tCC0000000000000000000002 = {isa = PBXFileReference; path = Configs/Target.xcconfig; sourceTree = SOURCE_ROOT; };"""
+    contents = contents.replace("/* Begin PBXFileReference section */", file_references)
+
+    for configuration_key, file_reference_key in [
+        (PROJECT_DEBUG_KEY, "CC0000000000000000000001"),
+        (TARGET_DEBUG_KEY, "CC0000000000000000000002"),
+    ]:
+        contents = contents.replace(
+            f"{configuration_key} /* Debug */ = {{\n\t\t\tisa = XCBuildConfiguration;",
+            f"{configuration_key} /* Debug */ = {{\n\t\t\tisa = XCBuildConfiguration;\n"
+            f"\t\t\tbaseConfigurationReference = {file_reference_key};",
+        )
+
+    pbxproj_path.write_text(contents, encoding="utf-8")
+
+    _write(
+        tmp_path / "Project.xcconfig",
+        "// Settings for every target\n"
+        "SDKROOT = macosx\n"
+        "PROJECT_ONLY = project // trailing comment\n"
+        "SWIFT_VERSION = 4.0;\n",
+    )
+    (tmp_path / "Configs").mkdir()
+    _write(tmp_path / "Configs" / "Shared.xcconfig", "SHARED = shared\nSWIFT_VERSION = 4.2\n")
+    _write(
+        tmp_path / "Configs" / "Target.xcconfig",
+        '#include "Shared.xcconfig"\n'
+        '#include? "Missing.xcconfig"\n'
+        "OTHER_LDFLAGS[sdk=iphoneos*] = -ObjC\n"
+        "TARGET_XCCONFIG = yes\n"
+        "IPHONEOS_DEPLOYMENT_TARGET = 13.0\n",
+    )
+
+    return str(project_path)
+
+
+def test_layers(project_path: str) -> None:
+    """Test that the layers are in order of precedence.
+
+    :param project_path: The path to the project
+    """
+
+    project = xcodeproj.XcodeProject(project_path)
+    target = project.target_by_name("CLJTest")
+    assert target is not None
+
+    layers = project.build_settings_resolver().layers(target, "Debug")
+
+    configurations = project.fetch_type(xcodeproj.XCBuildConfiguration)
+
+    assert [layer.get("SWIFT_VERSION") for layer in layers] == ["4.0", None, "4.2", "5.0"]
+    assert layers[1] == configurations[PROJECT_DEBUG_KEY].build_settings
+    assert layers[3] == configurations[TARGET_DEBUG_KEY].build_settings
+
+    settings = project.resolved_build_settings(target, "Debug")
+
+    assert settings["SDKROOT"] == "iphoneos"
+    assert settings["PROJECT_ONLY"] == "project"
+    assert settings["SHARED"] == "shared"
+    assert settings["OTHER_LDFLAGS[sdk=iphoneos*]"] == "-ObjC"
+    assert settings["IPHONEOS_DEPLOYMENT_TARGET"] == "13.0"
+    assert settings["SWIFT_VERSION"] == "5.0"
+    assert settings["PRODUCT_NAME"] == "$(TARGET_NAME)"
+
+    project_settings = project.resolved_build_settings(None, "Debug")
+
+    assert project_settings["SWIFT_VERSION"] == "4.0"
+    assert "SHARED" not in project_settings
+
+    # Release isn't based on any xcconfig files
+    assert "PROJECT_ONLY" not in project.resolved_build_settings(target, "Release")
+    assert project.resolved_build_settings(target, "Hodor") == {}
+
+
+def test_memoization(project_path: str) -> None:
+    """Test that parsed files and resolved settings are shared.
+
+    :param project_path: The path to the project
+    """
+
+    project = xcodeproj.XcodeProject(project_path)
+    resolver = project.build_settings_resolver()
+    target = project.target_by_name("CLJTest")
+    assert target is not None
+
+    assert resolver.resolved_settings(target, "Debug") is resolver.resolved_settings(target, "Debug")
+    assert resolver.layers(target, "Debug")[0] is resolver.layers(None, "Debug")[0]
+
+    other = xcodeproj.XcodeProject(project_path)
+    other_resolver = xcodeproj.BuildSettingsResolver(other.project, xcconfig_cache=resolver.xcconfig_cache)
+    assert other_resolver.layers(None, "Debug")[0] is resolver.layers(None, "Debug")[0]
+
+
+def test_memoization_revalidates(project_path: str) -> None:
+    """Test that resolved settings are worked out again when an xcconfig file changes.
+
+    :param project_path: The path to the project
+    """
+
+    project = xcodeproj.XcodeProject(project_path)
+    resolver = project.build_settings_resolver()
+    target = project.target_by_name("CLJTest")
+    assert target is not None
+
+    resolved = resolver.resolved_settings(target, "Debug")
+    expanded = resolver.expanded_settings(target, "Debug")
+    assert resolved["SHARED"] == "shared"
+
+    # A file included by the target's base xcconfig changes
+    _write(pathlib.Path(project_path).parent / "Configs" / "Shared.xcconfig", "SHARED = changed\nSWIFT_VERSION = 4.2\n")
+
+    assert resolver.resolved_settings(target, "Debug")["SHARED"] == "changed"
+    assert resolver.expanded_settings(target, "Debug")["SHARED"] == "changed"
+    assert expanded["SHARED"] == "shared"
+
+    # Configurations which don't use the file are still shared
+    assert resolver.resolved_settings(None, "Debug") is resolver.resolved_settings(None, "Debug")
+    assert resolver.resolved_settings(target, "Debug") is not resolved
+
+
+def test_xcconfig_cache(tmp_path: pathlib.Path) -> None:
+    """Test that changes to included files are picked up.
+
+    :param tmp_path: A temporary directory
+    """
+
+    _write(tmp_path / "Base.xcconfig", '#include "Included.xcconfig"\n#include? "Optional.xcconfig"\nA = 1\n')
+    _write(tmp_path / "Included.xcconfig", "B = 1\n")
+
+    xcconfig_cache = xcodeproj.XCConfigCache()
+    base_path = str(tmp_path / "Base.xcconfig")
+
+    first = xcconfig_cache.settings(base_path)
+    assert first == {"A": "1", "B": "1"}
+    assert xcconfig_cache.settings(base_path) is first
+
+    _write(tmp_path / "Included.xcconfig", "B = 22\n")
+    assert xcconfig_cache.settings(base_path) == {"A": "1", "B": "22"}
+
+    _write(tmp_path / "Optional.xcconfig", "A = 2\nC = 3\n")
+    assert xcconfig_cache.settings(base_path) == {"A": "1", "B": "22", "C": "3"}
+
+
+def test_xcconfig_inherited(tmp_path: pathlib.Path) -> None:
+    """Test that `$(inherited)` refers to the value from included files and earlier lines.
+
+    :param tmp_path: A temporary directory
+    """
+
+    _write(tmp_path / "Base.xcconfig", "OTHER_LDFLAGS = $(inherited) -lz\nOTHER_CFLAGS = -Wall\n")
+    _write(
+        tmp_path / "App.xcconfig",
+        '#include "Base.xcconfig"\n'
+        "OTHER_LDFLAGS = $(inherited) -ObjC\n"
+        "OTHER_CFLAGS = ${inherited} -Werror\n"
+        "OTHER_CFLAGS = $(inherited) -Wextra\n"
+        "GCC_OPTIMIZATION_LEVEL = $(inherited)\n",
+    )
+
+    settings = xcodeproj.XCConfigCache().settings(str(tmp_path / "App.xcconfig"))
+
+    assert settings["OTHER_LDFLAGS"] == "$(inherited) -lz -ObjC"
+    assert settings["OTHER_CFLAGS"] == "-Wall -Werror -Wextra"
+    assert settings["GCC_OPTIMIZATION_LEVEL"] == "$(inherited)"
+
+    expander = xcodeproj.MacroExpander([{"OTHER_LDFLAGS": "-lc++"}, settings])
+    assert expander.value("OTHER_LDFLAGS") == "-lc++ -lz -ObjC"
+
+
+def test_xcconfig_errors(tmp_path: pathlib.Path) -> None:
+    """Test that missing and recursive includes are reported.
+
+    :param tmp_path: A temporary directory
+    """
+
+    _write(tmp_path / "Missing.xcconfig", '#include "Hodor.xcconfig"\n')
+    _write(tmp_path / "Loop.xcconfig", '#include "Loop.xcconfig"\n')
+
+    xcconfig_cache = xcodeproj.XCConfigCache()
+
+    with pytest.raises(xcodeproj.XCConfigError) as missing:
+        xcconfig_cache.settings(str(tmp_path / "Missing.xcconfig"))
+
+    assert missing.value.path == str(tmp_path / "Hodor.xcconfig")
+
+    with pytest.raises(xcodeproj.XCConfigError, match="includes itself"):
+        xcconfig_cache.settings(str(tmp_path / "Loop.xcconfig"))
+
+
+def test_expanded_settings(project_path: str) -> None:
+    """Test that settings are expanded in the context of their configuration.
+
+    :param project_path: The path to the project
+    """
+
+    project = xcodeproj.XcodeProject(project_path)
+    target = project.target_by_name("CLJTest")
+    assert target is not None
+
+    settings = project.expanded_build_settings(target, "Debug")
+
+    assert settings["PRODUCT_NAME"] == "CLJTest"
+    assert settings["LD_RUNPATH_SEARCH_PATHS"] == "@executable_path/Frameworks"
+    assert project.expanded_build_settings(target, "Debug") is settings
+
+    resolver = xcodeproj.BuildSettingsResolver(project.project, defaults={"BUILT_PRODUCTS_DIR": "/build/Debug"})
+    expander = resolver.expander(target, "Debug")
+    product = target.product_reference
+    assert product is not None
+
+    assert expander.expand(product.absolute_path() or "") == "/build/Debug/CLJTest.app"
+    assert expander.value("SRCROOT") == os.path.dirname(project_path)
+    assert expander.value("CONFIGURATION") == "Debug"
+
+    everything = resolver.expand_all()
+
+    assert set(everything) == {
+        (scope, name)
+        for scope in [None, *(target.object_key for target in project.targets())]
+        for name in ["Debug", "Release"]
+    }
+    assert everything[(target.object_key, "Debug")] is resolver.expanded_settings(target, "Debug")
+    assert everything[(None, "Debug")]["SDKROOT"] == "iphoneos"
+    assert everything[(None, "Release")] == {}
@@ -0,0 +1,381 @@
+"""Tests for the project cache."""
+
+import json
+import os
+import pathlib
+import shutil
+
+import pytest
+
+import xcodeproj
+from xcodeproj import cache
+
+COLLATERAL_PATH = os.path.join(os.path.abspath(os.path.join(os.path.abspath(__file__), "..")), "collateral")
+
+
+@pytest.fixture(name="cache_folder")
+def fixture_cache_folder(tmp_path: pathlib.Path, monkeypatch: pytest.MonkeyPatch) -> str:
+    """Use a temporary cache folder.
+
+    :param tmp_path: A temporary directory
+    :param monkeypatch: The pytest monkeypatch fixture
+
+    :returns: The path to the cache folder
+    """
+
+    folder = str(tmp_path / "cache")
+    monkeypatch.setattr(cache, "cache_folder", lambda: folder)
+    monkeypatch.setattr(cache, "_RACY_INTERVAL_NS", 0)
+    return folder
+
+
+@pytest.fixture(name="project_path")
+def fixture_project_path(tmp_path: pathlib.Path) -> str:
+    """Copy a project so that it can be modified.
+
+    :param tmp_path: A temporary directory
+
+    :returns: The path to the copied project
+    """
+
+    project_path = str(tmp_path / "One.xcodeproj")
+    shutil.copytree(os.path.join(COLLATERAL_PATH, "One.xcodeproj"), project_path)
+    return project_path
+
+
+def test_index_skips_hashing(cache_folder: str, project_path: str, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test that unchanged files aren't hashed again.
+
+    :param cache_folder: The cache folder
+    :param project_path: The project
+    :param monkeypatch: The pytest monkeypatch fixture
+    """
+
+    cache_path = cache.project_cache_path(project_path)
+
+    assert os.path.exists(os.path.join(cache_folder, cache.INDEX_FILE_NAME))
+
+    def fail(path: str) -> str:
+        raise AssertionError(f"{path} was hashed")
+
+    monkeypatch.setattr(cache, "content_hash", fail)
+
+    assert cache.project_cache_path(project_path) == cache_path
+
+
+def test_index_detects_changes(cache_folder: str, project_path: str) -> None:
+    """Test that modified files are hashed again.
+
+    :param cache_folder: The cache folder
+    :param project_path: The project
+    """
+
+    cache_path = cache.project_cache_path(project_path)
+    pbxproj_path = os.path.join(project_path, "project.pbxproj")
+
+    with open(pbxproj_path, "a", encoding="utf-8") as pbxproj_file:
+        pbxproj_file.write("\n")
+
+    changed_path = cache.project_cache_path(project_path)
+
+    assert changed_path != cache_path
+    assert os.path.dirname(changed_path) == cache_folder
+    assert os.path.basename(changed_path) == f"{cache.content_hash(pbxproj_path)}.dat"
+
+
+def test_index_ignores_recent_changes(cache_folder: str, project_path: str, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test that files modified very recently aren't trusted to the index.
+
+    :param cache_folder: The cache folder
+    :param project_path: The project
+    :param monkeypatch: The pytest monkeypatch fixture
+    """
+
+    os.utime(os.path.join(project_path, "project.pbxproj"))
+    monkeypatch.setattr(cache, "_RACY_INTERVAL_NS", 3600 * 1_000_000_000)
+    cache.project_cache_path(project_path)
+
+    assert not os.path.exists(os.path.join(cache_folder, cache.INDEX_FILE_NAME))
+
+
+def test_from_cache(cache_folder: str, project_path: str) -> None:
+    """Test that projects are loaded from the cache once written.
+
+    :param cache_folder: The cache folder
+    :param project_path: The project
+    """
+
+    project = xcodeproj.XcodeProject(project_path)
+    project.write_cache()
+
+    assert os.path.exists(cache.project_cache_path(project_path, cache_folder))
+
+    cached = xcodeproj.XcodeProject.from_cache(project_path)
+
+    assert cached is not project
+    assert cached.objects == project.objects
+    assert cached.project.objects() is cached.objects
+
+
+def test_cache_round_trip(cache_folder: str, project_path: str) -> None:
+    """Test that cached projects are restored in full.
+
+    :param cache_folder: The cache folder
+    :param project_path: The project
+    """
+
+    project = xcodeproj.XcodeProject(project_path)
+    project.write_cache()
+
+    cached = xcodeproj.XcodeProject.from_cache(project_path)
+    file_references = cached.fetch_type(xcodeproj.PBXFileReference)
+
+    assert cached._is_populated
+    assert set(file_references) == set(project.fetch_type(xcodeproj.PBXFileReference))
+
+    for object_key, project_object in project.objects.items():
+        cached_object = cached.objects[object_key]
+        expected = {key: value for key, value in vars(project_object).items() if not key.endswith("_ref")}
+
+        assert type(cached_object) is type(project_object)
+        assert {key: value for key, value in vars(cached_object).items() if not key.endswith("_ref")} == expected
+        assert cached_object.objects() is cached.objects
+        assert cached_object.project() is cached
+
+    assert {key: value.relative_path() for key, value in file_references.items()} == {
+        key: value.relative_path() for key, value in project.fetch_type(xcodeproj.PBXFileReference).items()
+    }
+
+
+def test_stale_cache_rejected(cache_folder: str, project_path: str, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test that caches written by other versions of the library aren't loaded.
+
+    :param cache_folder: The cache folder
+    :param project_path: The project
+    :param monkeypatch: The pytest monkeypatch fixture
+    """
+
+    xcodeproj.XcodeProject(project_path).write_cache()
+    cache_path = cache.project_cache_path(project_path, cache_folder)
+
+    assert cache.read_payload(cache_path) is not None
+
+    monkeypatch.setattr(cache, "_library_version", lambda: "0.0.0-other")
+
+    with pytest.raises(cache.StaleCacheError):
+        cache.read_payload(cache_path)
+
+    monkeypatch.undo()
+    monkeypatch.setattr(cache, "cache_folder", lambda: cache_folder)
+    monkeypatch.setattr(cache, "schema_fingerprint", lambda: "other")
+
+    with pytest.raises(cache.StaleCacheError):
+        cache.read_payload(cache_path)
+
+    # The project is loaded from the pbxproj instead
+    assert not xcodeproj.XcodeProject.from_cache(project_path)._is_populated
+
+
+def test_invalid_cache_rejected(tmp_path: pathlib.Path) -> None:
+    """Test that files which aren't caches are rejected.
+
+    :param tmp_path: A temporary directory
+    """
+
+    cache_path = tmp_path / "invalid.dat"
+    cache_path.write_bytes(b"not a cache")
+
+    with pytest.raises(cache.StaleCacheError):
+        cache.read_payload(str(cache_path))
+
+
+def _write_entry(folder: str, name: str, size: int, last_used: float) -> str:
+    """Write a fake cache entry.
+
+    :param folder: The cache folder
+    :param name: The name of the entry
+    :param size: The size of the entry in bytes
+    :param last_used: When the entry was last used
+
+    :returns: The path to the entry
+    """
+
+    os.makedirs(folder, exist_ok=True)
+    path = os.path.join(folder, f"{name}{cache.CACHE_FILE_EXTENSION}")
+
+    with open(path, "wb") as entry_file:
+        entry_file.write(b"\0" * size)
+
+    os.utime(path, (last_used, last_used))
+    return path
+
+
+def test_cache_entries(cache_folder: str) -> None:
+    """Test that cache entries can be inspected.
+
+    :param cache_folder: The cache folder
+    """
+
+    assert not cache.cache_entries()
+
+    first = _write_entry(cache_folder, "first", 10, 1000)
+    second = _write_entry(cache_folder, "second", 20, 2000)
+
+    assert [(entry.path, entry.size) for entry in cache.cache_entries()] == [(second, 20), (first, 10)]
+    assert cache.cache_size() == 30
+
+
+def test_prune_cache(cache_folder: str) -> None:
+    """Test that the least recently used entries are evicted first.
+
+    :param cache_folder: The cache folder
+    """
+
+    paths = [_write_entry(cache_folder, f"entry{index}", 10, 1000 + index) for index in range(5)]
+
+    evicted = cache.prune_cache(max_entries=3, max_bytes=1000)
+
+    assert [entry.path for entry in evicted] == paths[:2]
+    assert [entry.path for entry in cache.cache_entries()] == paths[:1:-1]
+
+    evicted = cache.prune_cache(max_entries=3, max_bytes=15)
+
+    assert [entry.path for entry in evicted] == paths[2:4]
+    assert [entry.path for entry in cache.cache_entries()] == paths[4:]
+
+
+def test_prune_cache_schemes(cache_folder: str, project_path: str) -> None:
+    """Test that cached schemes count towards the limits and are evicted with projects.
+
+    :param cache_folder: The cache folder
+    :param project_path: The project
+    """
+
+    scheme_cache = cache.SchemeCache(project_path)
+    scheme_path = os.path.join(project_path, "project.pbxproj")
+    scheme_cache.put(scheme_path, (1000, 10), "scheme")
+    scheme_cache.save()
+    os.utime(scheme_cache.path, (1000, 1000))
+
+    project_entry = _write_entry(cache_folder, "project", 10, 2000)
+
+    assert [entry.path for entry in cache.cache_entries()] == [project_entry, scheme_cache.path]
+
+    # Reading the schemes marks them as used, so the project is evicted first
+    assert cache.SchemeCache(project_path).get(scheme_path, (1000, 10)) == "scheme"
+    assert [entry.path for entry in cache.prune_cache(max_entries=1)] == [project_entry]
+
+    os.utime(scheme_cache.path, (1000, 1000))
+    project_entry = _write_entry(cache_folder, "project", 10, 2000)
+
+    assert [entry.path for entry in cache.prune_cache(max_entries=1)] == [scheme_cache.path]
+    assert not os.path.exists(scheme_cache.path)
+    assert os.path.exists(project_entry)
+
+
+def _index_paths(cache_folder: str) -> list[str]:
+    """Get the paths of the files in the index.
+
+    :param cache_folder: The cache folder
+
+    :returns: The paths
+    """
+
+    with open(os.path.join(cache_folder, cache.INDEX_FILE_NAME), encoding="utf-8") as index_file:
+        return sorted(json.load(index_file)["entries"])
+
+
+def test_prune_cache_index(cache_folder: str, project_path: str, tmp_path: pathlib.Path) -> None:
+    """Test that index entries for projects which are no longer cached are removed.
+
+    :param cache_folder: The cache folder
+    :param project_path: The project
+    :param tmp_path: A temporary directory
+    """
+
+    pbxproj_path = os.path.realpath(os.path.join(project_path, "project.pbxproj"))
+    other_path = str(tmp_path / "Other.xcodeproj")
+    shutil.copytree(project_path, other_path)
+    other_pbxproj_path = os.path.realpath(os.path.join(other_path, "project.pbxproj"))
+
+    xcodeproj.XcodeProject(project_path).write_cache()
+    cache.project_cache_path(other_path)
+    assert _index_paths(cache_folder) == sorted([pbxproj_path, other_pbxproj_path])
+
+    # The other project shares the cache file, so is kept until its pbxproj is removed
+    shutil.rmtree(other_path)
+
+    with pytest.raises(FileNotFoundError):
+        cache.project_cache_path(other_path)
+
+    assert _index_paths(cache_folder) == [pbxproj_path]
+
+    cache.prune_cache(max_entries=0)
+    assert not _index_paths(cache_folder)
+
+
+def test_prune_cache_from_environment(cache_folder: str, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test that the limits can be set with environment variables.
+
+    :param cache_folder: The cache folder
+    :param monkeypatch: The pytest monkeypatch fixture
+    """
+
+    for index in range(3):
+        _write_entry(cache_folder, f"entry{index}", 10, 1000 + index)
+
+    monkeypatch.setenv("XCODEPROJ_CACHE_MAX_ENTRIES", "1")
+
+    assert len(cache.prune_cache()) == 2
+    assert len(cache.cache_entries()) == 1
+
+
+def test_write_cache_prunes(cache_folder: str, project_path: str, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test that writing to the cache keeps it within its limits.
+
+    :param cache_folder: The cache folder
+    :param project_path: The project
+    :param monkeypatch: The pytest monkeypatch fixture
+    """
+
+    old_entry = _write_entry(cache_folder, "old", 10, 1000)
+    monkeypatch.setenv("XCODEPROJ_CACHE_MAX_ENTRIES", "1")
+
+    xcodeproj.XcodeProject(project_path).write_cache()
+
+    assert not os.path.exists(old_entry)
+    assert [entry.path for entry in cache.cache_entries()] == [cache.project_cache_path(project_path)]
+
+
+def test_from_cache_marks_used(cache_folder: str, project_path: str) -> None:
+    """Test that loading from the cache keeps the entry from being evicted.
+
+    :param cache_folder: The cache folder
+    :param project_path: The project
+    """
+
+    xcodeproj.XcodeProject(project_path).write_cache()
+    cache_path = cache.project_cache_path(project_path)
+    os.utime(cache_path, (1000, 1000))
+    newer_entry = _write_entry(cache_folder, "newer", 10, 2000)
+
+    xcodeproj.XcodeProject.from_cache(project_path)
+    cache.prune_cache(max_entries=1)
+
+    assert os.path.exists(cache_path)
+    assert not os.path.exists(newer_entry)
+
+
+def test_clear_cache(cache_folder: str, project_path: str) -> None:
+    """Test that the cache can be cleared.
+
+    :param cache_folder: The cache folder
+    :param project_path: The project
+    """
+
+    xcodeproj.XcodeProject(project_path).write_cache()
+    _write_entry(cache_folder, "other", 10, 1000)
+
+    assert len(cache.clear_cache()) == 2
+    assert not cache.cache_entries()
+    assert not os.path.exists(os.path.join(cache_folder, cache.INDEX_FILE_NAME))
@@ -0,0 +1,97 @@
+"""Tests for the compiled constructors."""
+
+import os
+from typing import Any
+
+import deserialize
+import pytest
+
+import xcodeproj
+from xcodeproj.constructors import construct
+
+COLLATERAL_PATH = os.path.join(os.path.abspath(os.path.join(os.path.abspath(__file__), "..")), "collateral")
+
+PROJECT_PATHS = [
+    os.path.join(COLLATERAL_PATH, "One.xcodeproj"),
+    os.path.join(COLLATERAL_PATH, "Two.xcodeproj"),
+    os.path.join(COLLATERAL_PATH, "Synchronized", "Synchronized.xcodeproj"),
+]
+
+
+def _state(value: Any) -> Any:
+    """Get a comparable representation of a deserialized value.
+
+    :param value: The value
+
+    :returns: The type and attributes of objects, or the value itself
+    """
+
+    if isinstance(value, list):
+        return [_state(item) for item in value]
+
+    if not hasattr(value, "__dict__") or isinstance(value, xcodeproj.PBXProductType):
+        return value
+
+    return type(value), {key: _state(item) for key, item in vars(value).items()}
+
+
+@pytest.mark.parametrize("project_path", PROJECT_PATHS)
+def test_matches_deserialize(project_path: str) -> None:
+    """Test that the compiled constructors produce the same objects as the library.
+
+    :param project_path: The project to load
+    """
+
+    tree = xcodeproj.load_pbxproj(os.path.join(project_path, "project.pbxproj"))
+
+    for key, value in tree["objects"].items():
+        value["object_key"] = key
+
+        expected = deserialize.deserialize(
+            xcodeproj.PBXObject,
+            value,
+            throw_on_unhandled=True,
+            raw_storage_mode=deserialize.RawStorageMode.ALL,
+        )
+        constructed = construct(xcodeproj.PBXObject, value, throw_on_unhandled=True)
+
+        assert _state(constructed) == _state(expected)
+        assert constructed.__deserialize_raw__ is value  # type: ignore[attr-defined]
+
+
+def test_unhandled_keys() -> None:
+    """Test that unhandled keys are treated the same way as by the library."""
+
+    value = {
+        "isa": "PBXBuildFile",
+        "object_key": "A",
+        "fileRef": "B",
+        "unknownKey": "C",
+    }
+
+    with pytest.raises(deserialize.UnhandledFieldException):
+        construct(xcodeproj.PBXObject, value, throw_on_unhandled=True)
+
+    build_file = construct(xcodeproj.PBXObject, value)
+
+    assert isinstance(build_file, xcodeproj.PBXBuildFile)
+    assert build_file.file_ref_id == "B"
+    assert build_file.settings is None
+
+
+def test_invalid_values() -> None:
+    """Test that invalid values raise the same errors as the library."""
+
+    with pytest.raises(deserialize.DeserializeException):
+        construct(xcodeproj.PBXObject, {"isa": "PBXBuildFile", "object_key": "A", "fileRef": ["B"]})
+
+    with pytest.raises(deserialize.DeserializeException):
+        construct(xcodeproj.PBXObject, {"isa": "XCBuildConfiguration", "object_key": "A", "name": "Debug"})
+
+
+def test_unknown_isa() -> None:
+    """Test that unknown object types fall back to dictionaries like the library."""
+
+    value = {"isa": "PBXSomethingNew", "object_key": "A"}
+
+    assert construct(xcodeproj.PBXObject, value) == value
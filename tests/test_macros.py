@@ -0,0 +1,96 @@
+"""Tests for build setting macro expansion."""
+
+import pytest
+
+import xcodeproj
+
+
+def test_references() -> None:
+    """Test both styles of reference, nesting and undefined settings."""
+
+    expander = xcodeproj.MacroExpander(
+        [
+            {
+                "NAME": "Outlook",
+                "GREETING": "Hello ${NAME}",
+                "SUFFIX": "Debug",
+                "VALUE_Debug": "debug value",
+                "NESTED": "$(VALUE_$(SUFFIX))",
+                "UNDEFINED": "[$(HODOR)]",
+                "DOLLARS": "$ $$(NAME) $(NAME",
+            }
+        ],
+        defaults={"SRCROOT": "/source"},
+    )
+
+    assert expander.value("GREETING") == "Hello Outlook"
+    assert expander.value("NESTED") == "debug value"
+    assert expander.value("UNDEFINED") == "[]"
+    assert expander.value("DOLLARS") == "$ $Outlook $(NAME"
+    assert expander.value("SRCROOT") == "/source"
+    assert expander.expand("$(SRCROOT)/$(NAME).app") == "/source/Outlook.app"
+
+
+def test_inherited() -> None:
+    """Test that inherited values come from the layers below."""
+
+    expander = xcodeproj.MacroExpander(
+        [
+            {"FLAGS": "-a", "PATHS": ["$(inherited)", "one"]},
+            {"OTHER": "$(FLAGS)"},
+            {"FLAGS": "$(inherited) -b", "PATHS": ["$(inherited)", "two"]},
+        ],
+        defaults={"PATHS": "zero"},
+    )
+
+    assert expander.value("FLAGS") == "-a -b"
+    assert expander.value("OTHER") == "-a -b"
+    assert expander.value("PATHS") == "zero one two"
+    assert expander.expand("$(inherited)") == ""
+    assert expander.expand_all() == {"FLAGS": "-a -b", "PATHS": "zero one two", "OTHER": "-a -b"}
+
+
+@pytest.mark.parametrize(
+    ("reference", "expected"),
+    [
+        ("$(PATH:lower)", "/tmp/folder/my file.tar.gz"),
+        ("$(PATH:upper)", "/TMP/FOLDER/MY FILE.TAR.GZ"),
+        ("$(PATH:base)", "My File.tar"),
+        ("$(PATH:file)", "My File.tar.gz"),
+        ("$(PATH:dir)", "/tmp/Folder/"),
+        ("$(PATH:suffix)", ".gz"),
+        ("$(PATH:file:identifier)", "My_File_tar_gz"),
+        ("$(PATH:file:rfc1034identifier)", "My-File.tar.gz"),
+        ("$(PATH:file:quote)", "My\\ File.tar.gz"),
+        ("$(PATH:dir:standardizepath)", "/tmp/Folder"),
+        ("$(PATH:file:base:upper)", "MY FILE.TAR"),
+        ("$(HODOR:default=$(PATH:suffix))", ".gz"),
+        ("$(PATH:default=hodor:file)", "My File.tar.gz"),
+    ],
+)
+def test_operators(reference: str, expected: str) -> None:
+    """Test the operators.
+
+    :param reference: The reference to expand
+    :param expected: The expected expansion
+    """
+
+    expander = xcodeproj.MacroExpander([{"PATH": "/tmp/Folder/My File.tar.gz"}])
+    assert expander.expand(reference) == expected
+
+
+def test_cycles() -> None:
+    """Test that settings which refer to themselves are reported."""
+
+    expander = xcodeproj.MacroExpander([{"A": "$(B)", "B": "x $(C)", "C": "$(A:lower)", "D": "$(D)"}])
+
+    with pytest.raises(xcodeproj.MacroCycleError) as cycle:
+        expander.value("A")
+
+    assert cycle.value.names == ["A", "B", "C", "A"]
+
+    with pytest.raises(xcodeproj.MacroCycleError):
+        expander.value("D")
+
+    # Inheriting from the same setting isn't a cycle
+    assert xcodeproj.MacroExpander([{"A": "1"}, {"A": "$(inherited) 2"}]).value("A") == "1 2"
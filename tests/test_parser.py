@@ -0,0 +1,165 @@
+"""Tests for the pbxproj parser."""
+
+import json
+import os
+import pathlib
+import shutil
+import subprocess
+
+import pytest
+
+import xcodeproj
+
+COLLATERAL_PATH = os.path.join(os.path.abspath(os.path.join(os.path.abspath(__file__), "..")), "collateral")
+
+PROJECT_PATHS = [
+    os.path.join(COLLATERAL_PATH, "One.xcodeproj"),
+    os.path.join(COLLATERAL_PATH, "Two.xcodeproj"),
+    os.path.join(COLLATERAL_PATH, "Synchronized", "Synchronized.xcodeproj"),
+]
+
+
+def test_parse_values() -> None:
+    """Test that all value types are parsed."""
+
+    content = b"""// !$*UTF8*$!
+{
+    /* A comment */
+    key = value;
+    "quoted key" = "quoted value";
+    path = /bin/sh; // Line comment
+    number = 52;
+    list = (
+        one,
+        "two",
+    );
+    empty_list = ();
+    empty_dict = {};
+    nested = {child = {grandchild = (a, b);};};
+    data = <DEADbeef 00>;
+}
+"""
+
+    assert xcodeproj.parse_pbxproj(content) == {
+        "key": "value",
+        "quoted key": "quoted value",
+        "path": "/bin/sh",
+        "number": "52",
+        "list": ["one", "two"],
+        "empty_list": [],
+        "empty_dict": {},
+        "nested": {"child": {"grandchild": ["a", "b"]}},
+        "data": b"\xde\xad\xbe\xef\x00",
+    }
+
+
+def test_parse_escapes() -> None:
+    """Test that escape sequences in quoted strings are decoded."""
+
+    content = r'{ a = "line\nbreak\ttab \"quoted\" back\\slash"; b = "\U00e9\101"; c = "caf' + "é" + '"; }'
+
+    assert xcodeproj.parse_pbxproj(content.encode("utf-8")) == {
+        "a": 'line\nbreak\ttab "quoted" back\\slash',
+        "b": "éA",
+        "c": "café",
+    }
+
+
+@pytest.mark.parametrize(
+    "content",
+    [
+        "{ a = b }",
+        "{ a = b;",
+        "{ a b; }",
+        "{ a = (b c); }",
+        "{ a = b; } c",
+        "( a, b )",
+        '{ a = "unterminated; }',
+        "{ a = <abc>; }",
+    ],
+)
+def test_parse_errors(content: str) -> None:
+    """Test that malformed content is rejected.
+
+    :param content: The malformed content
+    """
+
+    with pytest.raises(xcodeproj.PBXProjParseError):
+        xcodeproj.parse_pbxproj(content)
+
+
+def test_parse_error_location() -> None:
+    """Test that errors report where the problem is."""
+
+    with pytest.raises(xcodeproj.PBXProjParseError) as context:
+        xcodeproj.parse_pbxproj("{\n  a = b;\n  c = d\n}")
+
+    assert context.value.line == 4
+    assert context.value.column == 1
+
+
+@pytest.mark.skipif(shutil.which("plutil") is None, reason="plutil is only available on macOS")
+@pytest.mark.parametrize("project_path", PROJECT_PATHS)
+def test_matches_plutil(project_path: str) -> None:
+    """Test that the parser produces the same tree as plutil.
+
+    :param project_path: The project to compare
+    """
+
+    pbxproj_path = os.path.join(project_path, "project.pbxproj")
+    content = subprocess.run(
+        ["plutil", "-convert", "json", pbxproj_path, "-o", "-"],
+        stdout=subprocess.PIPE,
+        check=True,
+    ).stdout
+
+    assert xcodeproj.load_pbxproj(pbxproj_path) == json.loads(content)
+
+
+def test_object_hook() -> None:
+    """Test that the object hook is applied to each entry of the objects dictionary."""
+
+    content = "{ objects = { A = { isa = X; }; B = { isa = Y; child = { isa = Z; }; }; }; rootObject = A; }"
+
+    assert xcodeproj.parse_pbxproj(content, object_hook=lambda key, value: (key, value["isa"])) == {
+        "objects": {"A": ("A", "X"), "B": ("B", "Y")},
+        "rootObject": "A",
+    }
+
+
+@pytest.mark.parametrize("project_path", PROJECT_PATHS)
+@pytest.mark.parametrize("block_size", [1, 7, 64, 4096])
+def test_load_in_blocks(project_path: str, block_size: int, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test that reading a file in blocks produces the same tree as parsing it whole.
+
+    :param project_path: The project to load
+    :param block_size: The number of bytes to read at a time
+    :param monkeypatch: The pytest monkeypatch fixture
+    """
+
+    pbxproj_path = os.path.join(project_path, "project.pbxproj")
+
+    with open(pbxproj_path, "rb") as pbxproj_file:
+        expected = xcodeproj.parse_pbxproj(pbxproj_file.read())
+
+    monkeypatch.setattr(xcodeproj.parser, "_BLOCK_SIZE", block_size)
+
+    assert xcodeproj.load_pbxproj(pbxproj_path) == expected
+
+
+def test_load_error_location(tmp_path: pathlib.Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test that errors report where the problem is when reading in blocks.
+
+    :param tmp_path: A temporary directory
+    :param monkeypatch: The pytest monkeypatch fixture
+    """
+
+    pbxproj_path = tmp_path / "project.pbxproj"
+    pbxproj_path.write_bytes(b'\xef\xbb\xbf{\n  a = "b\n  c";\n  /* comment */ d = e\n}\n')
+    monkeypatch.setattr(xcodeproj.parser, "_BLOCK_SIZE", 3)
+
+    with pytest.raises(xcodeproj.PBXProjParseError) as context:
+        xcodeproj.load_pbxproj(str(pbxproj_path))
+
+    assert context.value.line == 5
+    assert context.value.column == 1
@@ -0,0 +1,204 @@
+"""Tests for loading referenced projects."""
+
+import os
+import pathlib
+import pickle
+import shutil
+import threading
+from collections.abc import Callable
+
+import pytest
+
+import xcodeproj
+
+COLLATERAL_PATH = os.path.join(os.path.abspath(os.path.join(os.path.abspath(__file__), "..")), "collateral")
+
+ROOT_OBJECT_KEY = "DD74C31E25AF302A00C4A922"
+CLJTEST_KEY = "DD74C32525AF302A00C4A922"
+
+
+def _copy_project(destination: pathlib.Path, referenced_name: str) -> None:
+    """Copy a project and make it refer to another project.
+
+    The copy gets a file reference to the other project, a reference proxy
+    for its CLJTest product and a target dependency on its CLJTest target.
+
+    :param destination: The path of the copied project
+    :param referenced_name: The file name of the project to refer to
+    """
+
+    shutil.copytree(os.path.join(COLLATERAL_PATH, "One.xcodeproj"), destination)
+    pbxproj_path = destination / "project.pbxproj"
+    contents = pbxproj_path.read_text(encoding="utf-8")
+
+    insertions = {
+        "PBXContainerItemProxy": [
+            "EE0000000000000000000002 = {isa = PBXContainerItemProxy; containerPortal = EE0000000000000000000001; "
+            "proxyType = 2; remoteGlobalIDString = DD74C32625AF302A00C4A922; remoteInfo = CLJTest; };",
+            "EE0000000000000000000003 = {isa = PBXContainerItemProxy; containerPortal = EE0000000000000000000001; "
+            "proxyType = 1; remoteGlobalIDString = DD74C32525AF302A00C4A922; remoteInfo = CLJTest; };",
+        ],
+        "PBXFileReference": [
+            'EE0000000000000000000001 = {isa = PBXFileReference; lastKnownFileType = "wrapper.pb-project"; '
+            f"path = {referenced_name}; sourceTree = SOURCE_ROOT; }};",
+        ],
+        "PBXReferenceProxy": [
+            "EE0000000000000000000004 = {isa = PBXReferenceProxy; fileType = wrapper.application; "
+            "path = CLJTest.app; remoteRef = EE0000000000000000000002; sourceTree = BUILT_PRODUCTS_DIR; };",
+        ],
+        "PBXTargetDependency": [
+            "EE0000000000000000000005 = {isa = PBXTargetDependency; name = CLJTest; "
+            "targetProxy = EE0000000000000000000003; };",
+        ],
+    }
+
+    # One has no reference proxies, so that section is added before the groups
+    contents = contents.replace(
+        "/* Begin PBXGroup section */",
+        "/* Begin PBXReferenceProxy section */\n/* End PBXReferenceProxy section */\n\n/* Begin PBXGroup section */",
+    )
+
+    for section, lines in insertions.items():
+        header = f"/* Begin {section} section */"
+        contents = contents.replace(header, "\n\t\t".join([header, *lines]))
+
+    contents = contents.replace(
+        '\t\t\tprojectDirPath = "";',
+        '\t\t\tprojectDirPath = "";\n'
+        "\t\t\tprojectReferences = (\n"
+        "\t\t\t\t{\n"
+        "\t\t\t\t\tProductGroup = DD74C32725AF302A00C4A922;\n"
+        "\t\t\t\t\tProjectRef = EE0000000000000000000001;\n"
+        "\t\t\t\t},\n"
+        "\t\t\t);",
+    )
+
+    pbxproj_path.write_text(contents, encoding="utf-8")
+
+
+@pytest.fixture(name="project_paths")
+def fixture_project_paths(tmp_path: pathlib.Path) -> tuple[str, str]:
+    """Create two projects which refer to each other.
+
+    :param tmp_path: A temporary directory
+
+    :returns: The paths to the two projects
+    """
+
+    app_path = tmp_path / "App.xcodeproj"
+    library_path = tmp_path / "Library.xcodeproj"
+    _copy_project(app_path, "Library.xcodeproj")
+    _copy_project(library_path, "App.xcodeproj")
+    return str(app_path), str(library_path)
+
+
+def _counting_loader(loaded: list[str]) -> Callable[[str], xcodeproj.XcodeProject]:
+    """Create a loader which records the paths it loads.
+
+    :param loaded: The list to record the paths in
+
+    :returns: The loader
+    """
+
+    lock = threading.Lock()
+
+    def load(path: str) -> xcodeproj.XcodeProject:
+        with lock:
+            loaded.append(path)
+        return xcodeproj.XcodeProject(path)
+
+    return load
+
+
+def test_load_all(project_paths: tuple[str, str]) -> None:
+    """Test that every referenced project is loaded exactly once.
+
+    :param project_paths: The paths to the projects
+    """
+
+    app_path, library_path = project_paths
+    app = xcodeproj.XcodeProject(app_path)
+    loaded: list[str] = []
+
+    with xcodeproj.ProjectGraph(app, loader=_counting_loader(loaded), max_workers=4) as graph:
+        assert graph.referenced_project_paths(app) == [library_path]
+        assert graph.loaded_projects() == {os.path.realpath(app_path): app}
+
+        projects = graph.load_all()
+
+        assert set(projects) == {os.path.realpath(app_path), os.path.realpath(library_path)}
+        assert projects[os.path.realpath(app_path)] is app
+        assert loaded == [library_path]
+
+        # Loading again, or through the cycle back to the root, reuses the loaded projects
+        assert graph.project_at(library_path) is projects[os.path.realpath(library_path)]
+        assert graph.project_at(app_path) is app
+        assert graph.load_all() == projects
+        assert loaded == [library_path]
+
+
+def test_load_all_missing(tmp_path: pathlib.Path) -> None:
+    """Test that a reference to a project which doesn't exist doesn't stop the others loading.
+
+    :param tmp_path: A temporary directory
+    """
+
+    app_path = tmp_path / "App.xcodeproj"
+    library_path = tmp_path / "Library.xcodeproj"
+    _copy_project(app_path, "Library.xcodeproj")
+    _copy_project(library_path, "Missing.xcodeproj")
+    app = xcodeproj.XcodeProject(str(app_path))
+
+    with xcodeproj.ProjectGraph(app, loader=xcodeproj.XcodeProject) as graph:
+        projects = graph.load_all()
+
+        assert set(projects) == {os.path.realpath(app_path), os.path.realpath(library_path)}
+        assert graph.missing_project_paths == [str(tmp_path / "Missing.xcodeproj")]
+
+        with pytest.raises(FileNotFoundError):
+            graph.project_at(str(tmp_path / "Missing.xcodeproj"))
+
+
+def test_resolve_proxies(project_paths: tuple[str, str]) -> None:
+    """Test that proxies are resolved into objects in the referenced project.
+
+    :param project_paths: The paths to the projects
+    """
+
+    app_path, library_path = project_paths
+    app = xcodeproj.XcodeProject(app_path)
+    graph = app.project_graph()
+    assert app.project_graph() is graph
+
+    reference_proxy = app.objects["EE0000000000000000000004"]
+    assert isinstance(reference_proxy, xcodeproj.PBXReferenceProxy)
+
+    library, product = graph.resolve_reference_proxy(app, reference_proxy)
+
+    assert library.path == library_path
+    assert isinstance(product, xcodeproj.PBXFileReference)
+    assert product.path == "CLJTest.app"
+
+    dependency = app.objects["EE0000000000000000000005"]
+    assert isinstance(dependency, xcodeproj.PBXTargetDependency)
+
+    target_project, target = graph.resolve_target_dependency(app, dependency)
+
+    assert target_project is library
+    assert isinstance(target, xcodeproj.PBXNativeTarget)
+    assert target.name == "CLJTest"
+    assert target is not app.objects[CLJTEST_KEY]
+
+    # Proxies within a project resolve to the project itself
+    local_proxy = app.objects["DD624D2225B05EED0081F68F"]
+    assert isinstance(local_proxy, xcodeproj.PBXContainerItemProxy)
+    assert graph.resolve_proxy(app, local_proxy)[0] is app
+    assert graph.project_for_portal(app, ROOT_OBJECT_KEY) is app
+
+    with pytest.raises(KeyError):
+        graph.project_for_portal(app, CLJTEST_KEY)
+
+    graph.close()
+
+    # The graph isn't pickled with the project
+    assert pickle.loads(pickle.dumps(app)).project_graph() is not graph
@@ -2,18 +2,125 @@
 
 import base64
 import datetime
+import inspect
 import os
+import pathlib
+import re
+import shutil
 import time
+import xml.etree.ElementTree as ET
+from typing import Any
 
+import pytest
 import requests
 
 import xcodeproj
+from xcodeproj import cache
 
 # Fixtures work by redefining names, so we need to disable this
 
 COLLATERAL_PATH = os.path.join(os.path.abspath(os.path.join(os.path.abspath(__file__), "..")), "collateral")
 SCHEMES_PATH = os.path.join(COLLATERAL_PATH, "schemes")
 
+STREAMING_SCHEME = """<?xml version="1.0" encoding="UTF-8"?>
+<Scheme LastUpgradeVersion = "1500" version = "1.7">
+   <BuildAction parallelizeBuildables = "YES" buildImplicitDependencies = "YES">
+      <PreActions>
+         <ExecutionAction ActionType = "Xcode.IDEStandardExecutionActionsCore.ExecutionActionType.ShellScriptAction">
+            <ActionContent title = "Run Script" scriptText = "echo hello&#10;">
+               <EnvironmentBuildable>
+                  <BuildableReference BuildableIdentifier = "primary" BlueprintIdentifier = "AAAA"
+                     BuildableName = "App.app" BlueprintName = "App" ReferencedContainer = "container:App.xcodeproj">
+                  </BuildableReference>
+               </EnvironmentBuildable>
+            </ActionContent>
+         </ExecutionAction>
+      </PreActions>
+      <BuildActionEntries>
+         <BuildActionEntry buildForTesting = "YES" buildForRunning = "YES">
+            <BuildableReference BuildableIdentifier = "primary" BlueprintIdentifier = "AAAA"
+            BuildableName = "App.app" BlueprintName = "App" ReferencedContainer = "container:App.xcodeproj">
+         </BuildableReference>
+         </BuildActionEntry>
+      </BuildActionEntries>
+      <PostActions>
+         <ExecutionAction ActionType = "Xcode.IDEStandardExecutionActionsCore.ExecutionActionType.ShellScriptAction">
+            <ActionContent title = "Run Script" scriptText = "echo goodbye&#10;">
+            </ActionContent>
+         </ExecutionAction>
+      </PostActions>
+   </BuildAction>
+   <TestAction buildConfiguration = "Debug" shouldUseLaunchSchemeArgsEnv = "NO">
+      <MacroExpansion>
+         <BuildableReference BuildableIdentifier = "primary" BlueprintIdentifier = "AAAA"
+            BuildableName = "App.app" BlueprintName = "App" ReferencedContainer = "container:App.xcodeproj">
+         </BuildableReference>
+      </MacroExpansion>
+      <CodeCoverageTargets>
+         <BuildableReference BuildableIdentifier = "primary" BlueprintIdentifier = "AAAA"
+            BuildableName = "App.app" BlueprintName = "App" ReferencedContainer = "container:App.xcodeproj">
+         </BuildableReference>
+      </CodeCoverageTargets>
+      <EnvironmentVariables>
+         <EnvironmentVariable key = "DEBUG" value = "1" isEnabled = "YES">
+         </EnvironmentVariable>
+      </EnvironmentVariables>
+      <TestPlans>
+         <TestPlanReference reference = "container:App.xctestplan" default = "YES">
+         </TestPlanReference>
+      </TestPlans>
+      <CommandLineArguments>
+         <CommandLineArgument argument = "-verbose" isEnabled = "YES">
+         </CommandLineArgument>
+      </CommandLineArguments>
+      <Testables>
+         <TestableReference skipped = "NO" parallelizable = "YES">
+            <BuildableReference BuildableIdentifier = "primary" BlueprintIdentifier = "BBBB"
+               BuildableName = "AppTests.xctest" BlueprintName = "AppTests"
+               ReferencedContainer = "container:App.xcodeproj">
+            </BuildableReference>
+            <SelectedTests>
+{selected_tests}
+            </SelectedTests>
+            <SkippedTests>
+{skipped_tests}
+            </SkippedTests>
+            <LocationScenarioReference identifier = "NO" referenceType = "NO">
+               <Anything/>
+            </LocationScenarioReference>
+         </TestableReference>
+      </Testables>
+   </TestAction>
+   <LaunchAction buildConfiguration = "Debug">
+      <AdditionalOptions>
+         <AdditionalOption key = "MallocStackLogging" value = "" isEnabled = "YES">
+         </AdditionalOption>
+      </AdditionalOptions>
+      <BuildableProductRunnable runnableDebuggingMode = "0">
+         <BuildableReference BuildableIdentifier = "primary" BlueprintIdentifier = "AAAA"
+            BuildableName = "App.app" BlueprintName = "App" ReferencedContainer = "container:App.xcodeproj">
+         </BuildableReference>
+      </BuildableProductRunnable>
+      <RemoteRunnable runnableDebuggingMode = "2" BundleIdentifier = "com.apple.Carousel">
+         <BuildableReference BuildableIdentifier = "primary" BlueprintIdentifier = "AAAA"
+            BuildableName = "App.app" BlueprintName = "App" ReferencedContainer = "container:App.xcodeproj">
+         </BuildableReference>
+      </RemoteRunnable>
+   </LaunchAction>
+   <ProfileAction buildConfiguration = "Release">
+      <BuildableProductRunnable runnableDebuggingMode = "0">
+         <BuildableReference BuildableIdentifier = "primary" BlueprintIdentifier = "AAAA"
+            BuildableName = "App.app" BlueprintName = "App" ReferencedContainer = "container:App.xcodeproj">
+         </BuildableReference>
+      </BuildableProductRunnable>
+   </ProfileAction>
+   <AnalyzeAction buildConfiguration = "Debug">
+   </AnalyzeAction>
+   <ArchiveAction buildConfiguration = "Release" revealArchiveInOrganizer = "YES">
+   </ArchiveAction>
+</Scheme>
+"""
+
 
 def test_load_schemes() -> None:
     """Test that loading schemes works"""
@@ -23,6 +130,160 @@ def test_load_schemes() -> None:
         _ = xcodeproj.Scheme.from_file(scheme_path)
 
 
+def _scheme_state(value: Any) -> Any:
+    """Convert a scheme, or anything in it, to plain values which can be compared.
+
+    :param value: The value to convert
+
+    :returns: The plain values
+    """
+
+    if isinstance(value, list):
+        return [_scheme_state(item) for item in value]
+
+    if hasattr(value, "__dict__"):
+        return (type(value).__name__, {key: _scheme_state(item) for key, item in vars(value).items()})
+
+    return value
+
+
+def _streaming_scheme(test_count: int) -> str:
+    """Create a scheme using every kind of element, with a large number of tests.
+
+    :param test_count: The number of selected tests and of skipped tests
+
+    :returns: The scheme's XML
+    """
+
+    def tests(prefix: str) -> str:
+        return "\n".join(f'<Test Identifier = "{prefix}{index}/test()"></Test>' for index in range(test_count))
+
+    return STREAMING_SCHEME.format(selected_tests=tests("Selected"), skipped_tests=tests("Skipped"))
+
+
+def test_streaming_parser(tmp_path: pathlib.Path) -> None:
+    """Test that the streaming parser builds the same schemes as the ElementTree one.
+
+    :param tmp_path: A temporary directory
+    """
+
+    scheme_paths = [os.path.join(SCHEMES_PATH, scheme_file) for scheme_file in sorted(os.listdir(SCHEMES_PATH))]
+    large_path = tmp_path / "Large.xcscheme"
+    large_path.write_text(_streaming_scheme(5000), encoding="utf-8")
+
+    for scheme_path in [*scheme_paths, str(large_path)]:
+        expected = xcodeproj.Scheme.from_file(scheme_path)
+        assert _scheme_state(xcodeproj.parse_scheme_file(scheme_path)) == _scheme_state(expected)
+
+    large = xcodeproj.parse_scheme_string(large_path.read_text(encoding="utf-8"), "Large")
+    assert large.name == "Large"
+    assert large.test_action is not None
+    assert len(large.test_action.testables[0].selected_tests) == 5000
+    assert large.test_action.testables[0].skipped_tests[-1].identifier == "Skipped4999/test()"
+
+
+@pytest.mark.parametrize(
+    "old, new",
+    [
+        ('<Test Identifier = "Selected1/test()">', '<Test Identifier = "Selected1/test()" Hodor = "YES">'),
+        ('<Test Identifier = "Selected1/test()"></Test>', '<Test Identifier = "Selected1/test()"><Hodor/></Test>'),
+        ("<SelectedTests>", '<SelectedTests Hodor = "YES">'),
+        ("</SkippedTests>", "<Hodor></Hodor></SkippedTests>"),
+        ("</TestAction>", "<Hodor></Hodor></TestAction>"),
+        ("</Scheme>", "<Hodor></Hodor></Scheme>"),
+        ("</BuildActionEntries>", "<Hodor></Hodor></BuildActionEntries>"),
+        ("</ExecutionAction>", "<ActionContent></ActionContent></ExecutionAction>"),
+        ('<BuildAction parallelizeBuildables = "YES"', '<BuildAction hodor = "YES"'),
+    ],
+)
+def test_streaming_parser_strict(old: str, new: str) -> None:
+    """Test that the streaming parser rejects the same schemes as the ElementTree one.
+
+    :param old: The part of the scheme to replace
+    :param new: What to replace it with
+    """
+
+    contents = _streaming_scheme(2)
+    assert old in contents
+    contents = contents.replace(old, new, 1)
+
+    with pytest.raises(AssertionError):
+        xcodeproj.Scheme.from_string(contents, "Strict")
+
+    with pytest.raises(AssertionError):
+        xcodeproj.parse_scheme_string(contents, "Strict")
+
+
+def _parse_outcome(parse: Any, contents: str) -> Any:
+    """Parse a scheme, and describe what happened in a way which can be compared.
+
+    :param parse: The function to parse the scheme with
+    :param contents: The XML of the scheme
+
+    :returns: The state of the parsed scheme, or the type of the exception raised
+    """
+
+    try:
+        return _scheme_state(parse(contents, "Parity"))
+    except Exception as ex:
+        return type(ex)
+
+
+def _scheme_classes(value: Any, found: set[type[Any]]) -> None:
+    """Find the classes of a scheme and everything in it.
+
+    :param value: The scheme, or anything in it
+    :param found: The classes found so far
+    """
+
+    if isinstance(value, list):
+        for item in value:
+            _scheme_classes(item, found)
+    elif hasattr(value, "__dict__"):
+        found.add(type(value))
+
+        for item in vars(value).values():
+            _scheme_classes(item, found)
+
+
+def test_streaming_parser_parity() -> None:
+    """Test that both parsers accept and reject the same children in every element of a scheme.
+
+    Every tag the scheme classes mention is added in turn to every element of
+    a scheme using every scheme class, so a rule which the streaming parser's
+    tables are missing, or have which the constructors don't, fails here.
+    """
+
+    contents = _streaming_scheme(1)
+    scheme = xcodeproj.Scheme.from_string(contents, "Parity")
+
+    found: set[type[Any]] = set()
+    _scheme_classes(scheme, found)
+    scheme_classes = {
+        class_reference
+        for _, class_reference in inspect.getmembers(xcodeproj.schemes, inspect.isclass)
+        if class_reference.__module__ == xcodeproj.schemes.__name__
+        and "node" in inspect.signature(class_reference).parameters
+        and not class_reference.__subclasses__()
+    }
+    assert found == scheme_classes
+    assert _scheme_state(xcodeproj.parse_scheme_string(contents, "Parity")) == _scheme_state(scheme)
+
+    tags = sorted({*re.findall(r'"([A-Z][A-Za-z]*)"', inspect.getsource(xcodeproj.schemes)), "Hodor"})
+    root = ET.fromstring(contents)
+
+    for element in list(root.iter()):
+        for tag in tags:
+            child = ET.SubElement(element, tag)
+            modified_contents = ET.tostring(root, encoding="unicode")
+            element.remove(child)
+
+            expected = _parse_outcome(xcodeproj.Scheme.from_string, modified_contents)
+            actual = _parse_outcome(xcodeproj.parse_scheme_string, modified_contents)
+
+            assert actual == expected, f"{tag} in {element.tag}"
+
+
 def test_remote_schemes() -> None:
     """Test schemes from some popular repositories."""
 
@@ -107,3 +368,261 @@ def test_remote_schemes() -> None:
                 content, os.path.basename(scheme_file["path"]).replace(".xcscheme", "")
             )
             assert parsed is not None
+            streamed = xcodeproj.parse_scheme_string(
+                content, os.path.basename(scheme_file["path"]).replace(".xcscheme", "")
+            )
+            assert _scheme_state(streamed) == _scheme_state(parsed)
+
+
+def _project_with_schemes(tmp_path: pathlib.Path) -> str:
+    """Copy a project and give it shared and user schemes.
+
+    :param tmp_path: A temporary directory
+
+    :returns: The path to the copied project
+    """
+
+    project_path = tmp_path / "One.xcodeproj"
+    shutil.copytree(os.path.join(COLLATERAL_PATH, "One.xcodeproj"), project_path)
+
+    scheme_folders = {
+        "xcshareddata/xcschemes": ["CalendarColors", "CalendarUpNext"],
+        "xcuserdata/bob.xcuserdatad/xcschemes": ["CalendarUpNext"],
+        "xcuserdata/alice.xcuserdatad/xcschemes": ["CalendarMeetNow", "CalendarUpNext"],
+        "project.xcworkspace/xcshareddata/xcschemes": ["CalendarWidgetExt"],
+    }
+
+    for folder, names in scheme_folders.items():
+        os.makedirs(project_path / folder)
+
+        for name in names:
+            shutil.copy(os.path.join(SCHEMES_PATH, f"{name}.xcscheme"), project_path / folder)
+
+    return str(project_path)
+
+
+def test_scheme_discovery(tmp_path: pathlib.Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test that schemes are found without parsing and only parsed when needed.
+
+    :param tmp_path: A temporary directory
+    :param monkeypatch: The pytest monkeypatch fixture
+    """
+
+    project = xcodeproj.XcodeProject(_project_with_schemes(tmp_path))
+    parsed: list[str] = []
+    from_file = xcodeproj.Scheme.from_file
+
+    def recording_from_file(path: str) -> xcodeproj.Scheme:
+        parsed.append(os.path.basename(os.path.dirname(os.path.dirname(path))) + "/" + os.path.basename(path))
+        return from_file(path)
+
+    monkeypatch.setattr(xcodeproj.Scheme, "from_file", recording_from_file)
+
+    assert [(scheme_file.name, scheme_file.user) for scheme_file in project.scheme_files()] == [
+        ("CalendarColors", None),
+        ("CalendarUpNext", None),
+        ("CalendarMeetNow", "alice"),
+        ("CalendarUpNext", "alice"),
+        ("CalendarUpNext", "bob"),
+    ]
+    assert project.scheme_files()[0].is_shared
+    assert not project.scheme_files()[2].is_shared
+    assert len(project.scheme_paths()["CalendarUpNext"]) == 3
+    assert "CalendarWidgetExt" not in project.scheme_paths()
+    assert parsed == []
+
+    scheme = project.scheme_by_name("CalendarUpNext")
+    assert scheme is not None
+    assert scheme.name == "CalendarUpNext"
+    assert parsed == ["xcshareddata/CalendarUpNext.xcscheme"]
+
+    assert project.scheme_by_name("CalendarUpNext") is scheme
+    assert project.scheme_by_name("CalendarUpNext", user="bob") is not scheme
+    assert project.scheme_by_name("CalendarUpNext", user="carol") is scheme
+    assert project.scheme_by_name("CalendarMeetNow", user="bob") is not None
+    assert project.scheme_by_name("Hodor") is None
+    assert parsed == [
+        "xcshareddata/CalendarUpNext.xcscheme",
+        "bob.xcuserdatad/CalendarUpNext.xcscheme",
+        "alice.xcuserdatad/CalendarMeetNow.xcscheme",
+    ]
+
+    # Loading every scheme reuses the ones already parsed
+    assert len(project.schemes) == 5
+    assert project.schemes[1] is scheme
+    assert len(parsed) == 5
+
+
+@pytest.mark.parametrize("use_processes", [False, True])
+def test_load_schemes_cached(tmp_path: pathlib.Path, monkeypatch: pytest.MonkeyPatch, use_processes: bool) -> None:
+    """Test that schemes are parsed in parallel and only parsed again once they change.
+
+    :param tmp_path: A temporary directory
+    :param monkeypatch: The pytest monkeypatch fixture
+    :param use_processes: Whether to parse on a process pool
+    """
+
+    cache_folder = str(tmp_path / "cache")
+    monkeypatch.setattr(cache, "cache_folder", lambda: cache_folder)
+    monkeypatch.setattr(cache, "_RACY_INTERVAL_NS", 0)
+
+    project_path = _project_with_schemes(tmp_path)
+    schemes = xcodeproj.XcodeProject(project_path).load_schemes(max_workers=2, use_processes=use_processes)
+
+    assert [scheme.name for scheme in schemes] == [
+        "CalendarColors",
+        "CalendarUpNext",
+        "CalendarMeetNow",
+        "CalendarUpNext",
+        "CalendarUpNext",
+    ]
+    assert os.path.exists(cache.scheme_cache_path(project_path))
+
+    parsed: list[str] = []
+    from_file = xcodeproj.Scheme.from_file
+
+    def recording_from_file(path: str) -> xcodeproj.Scheme:
+        parsed.append(path)
+        return from_file(path)
+
+    monkeypatch.setattr(xcodeproj.Scheme, "from_file", recording_from_file)
+
+    project = xcodeproj.XcodeProject(project_path)
+    cached = project.load_schemes(use_processes=use_processes)
+
+    assert [scheme.name for scheme in cached] == [scheme.name for scheme in schemes]
+    assert cached[0].build_action is not None
+    assert parsed == []
+    assert project.scheme_by_name("CalendarColors") is cached[0]
+
+    # Only the scheme which changed is parsed again
+    changed_path = project.scheme_files()[2].path
+
+    with open(changed_path, "a", encoding="utf-8") as scheme_file:
+        scheme_file.write("\n")
+
+    xcodeproj.XcodeProject(project_path).load_schemes(use_processes=use_processes)
+    assert parsed == [changed_path]
+
+    xcodeproj.XcodeProject(project_path).load_schemes(use_cache=False, max_workers=1)
+    assert len(parsed) == 6
+
+    # Schemes cached with different scheme classes are parsed again
+    monkeypatch.setattr(cache, "scheme_schema_fingerprint", lambda: "other")
+    xcodeproj.XcodeProject(project_path).load_schemes(max_workers=1)
+    assert len(parsed) == 11
+
+    cache.clear_cache()
+    assert not os.path.exists(cache.scheme_cache_path(project_path))
+
+
+TARGETS_SCHEME = """<?xml version="1.0" encoding="UTF-8"?>
+<Scheme LastUpgradeVersion = "1500" version = "1.7">
+   <BuildAction>
+      <BuildActionEntries>
+         <BuildActionEntry buildForArchiving = "YES">
+            <BuildableReference BlueprintIdentifier = "DD74C32525AF302A00C4A922"
+               ReferencedContainer = "container:One.xcodeproj">
+            </BuildableReference>
+         </BuildActionEntry>
+         <BuildActionEntry buildForArchiving = "NO">
+            <BuildableReference BlueprintIdentifier = "DD624D1C25B05EED0081F68F"
+               ReferencedContainer = "container:One.xcodeproj">
+            </BuildableReference>
+         </BuildActionEntry>
+         <BuildActionEntry buildForArchiving = "NO">
+            <BuildableReference BlueprintIdentifier = "DD74C32525AF302A00C4A922"
+               ReferencedContainer = "container:Libraries/Two.xcodeproj">
+            </BuildableReference>
+         </BuildActionEntry>
+      </BuildActionEntries>
+   </BuildAction>
+   <TestAction>
+      <Testables>
+         <TestableReference skipped = "NO">
+            <BuildableReference BlueprintIdentifier = "DD624D2E25B05EEE0081F68F"
+               ReferencedContainer = "container:One.xcodeproj">
+            </BuildableReference>
+         </TestableReference>
+         <TestableReference skipped = "YES">
+            <BuildableReference BlueprintIdentifier = "DD624D1F25B05EED0081F68F"
+               ReferencedContainer = "container:One.xcodeproj">
+            </BuildableReference>
+         </TestableReference>
+      </Testables>
+   </TestAction>
+   <LaunchAction>
+      <BuildableProductRunnable>
+         <BuildableReference BlueprintIdentifier = "DD74C32525AF302A00C4A922"
+            ReferencedContainer = "container:One.xcodeproj">
+         </BuildableReference>
+      </BuildableProductRunnable>
+   </LaunchAction>
+</Scheme>
+"""
+
+
+def test_scheme_target_index(tmp_path: pathlib.Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test that schemes and the targets they use can be looked up from each other.
+
+    :param tmp_path: A temporary directory
+    :param monkeypatch: The pytest monkeypatch fixture
+    """
+
+    cache_folder = str(tmp_path / "cache")
+    monkeypatch.setattr(cache, "cache_folder", lambda: cache_folder)
+    monkeypatch.setattr(cache, "_RACY_INTERVAL_NS", 0)
+
+    project_path = _project_with_schemes(tmp_path)
+    scheme_folder = os.path.join(project_path, "xcshareddata", "xcschemes")
+
+    with open(os.path.join(scheme_folder, "App.xcscheme"), "w", encoding="utf-8") as scheme_file:
+        scheme_file.write(TARGETS_SCHEME)
+
+    project = xcodeproj.XcodeProject(project_path)
+    index = project.scheme_target_index()
+    assert project.scheme_target_index() is index
+
+    cljtest = project.target_by_name("CLJTest")
+    wat = project.target_by_name("wat")
+    assert cljtest is not None and wat is not None
+
+    assert [scheme.name for scheme in project.schemes_for_target(cljtest)] == ["App"]
+    assert [scheme.name for scheme in project.schemes_for_target(cljtest, action="archive")] == ["App"]
+    assert project.schemes_for_target(wat, action="archive") == []
+    assert project.schemes_for_target(wat, action="launch") == []
+
+    assert [target.name for target in project.targets_for_scheme("App")] == [
+        "CLJTest",
+        "wat",
+        "wat WatchKit Extension",
+    ]
+    assert [target.name for target in project.targets_for_scheme("App", action="test")] == ["wat WatchKit Extension"]
+    assert [target.name for target in project.targets_for_scheme("App", action="launch")] == ["CLJTest"]
+    assert project.targets_for_scheme("Hodor") == []
+
+    # References to other projects are resolved relative to the project's folder
+    app_path = os.path.join(scheme_folder, "App.xcscheme")
+    two_path = os.path.join(str(tmp_path), "Libraries", "Two.xcodeproj")
+    assert (two_path, "DD74C32525AF302A00C4A922") in index.targets_for_scheme(app_path, action="build")
+    assert [
+        scheme_file.name for scheme_file in index.schemes_for_target("DD74C32525AF302A00C4A922", project_path=two_path)
+    ] == ["App"]
+    assert index.schemes_for_target("DD74C32525AF302A00C4A922", project_path=two_path, action="launch") == []
+
+    with pytest.raises(ValueError):
+        index.schemes_for_target("DD74C32525AF302A00C4A922", action="hodor")
+
+    # The schemes the index is built from come from the scheme cache next time
+    parsed: list[str] = []
+    from_file = xcodeproj.Scheme.from_file
+
+    def recording_from_file(path: str) -> xcodeproj.Scheme:
+        parsed.append(path)
+        return from_file(path)
+
+    monkeypatch.setattr(xcodeproj.Scheme, "from_file", recording_from_file)
+
+    cached_index = xcodeproj.XcodeProject(project_path).scheme_target_index()
+    assert parsed == []
+    assert cached_index.targets_for_scheme(app_path) == index.targets_for_scheme(app_path)
@@ -0,0 +1,194 @@
+"""Tests for test sharding."""
+
+import json
+import pathlib
+
+import pytest
+
+import xcodeproj
+
+SCHEME = """<?xml version="1.0" encoding="UTF-8"?>
+<Scheme LastUpgradeVersion = "1500" version = "1.7">
+   <TestAction buildConfiguration = "Debug">
+      <Testables>
+         <TestableReference skipped = "NO" parallelizable = "YES">
+            <BuildableReference BuildableName = "UnitTests.xctest" BlueprintName = "UnitTests">
+            </BuildableReference>
+            <SkippedTests>
+               <Test Identifier = "Flaky/testFlaky()"></Test>
+            </SkippedTests>
+         </TestableReference>
+         <TestableReference skipped = "NO" parallelizable = "YES" useTestSelectionWhitelist = "YES">
+            <BuildableReference BuildableName = "SelectedTests.xctest">
+            </BuildableReference>
+            <SelectedTests>
+               <Test Identifier = "Chosen/testOne()"></Test>
+               <Test Identifier = "Chosen/testTwo()"></Test>
+            </SelectedTests>
+         </TestableReference>
+         <TestableReference skipped = "NO" parallelizable = "NO">
+            <BuildableReference BlueprintName = "SerialTests">
+            </BuildableReference>
+            <SkippedTests>
+               <Test Identifier = "Slow/testSlow()"></Test>
+            </SkippedTests>
+         </TestableReference>
+         <TestableReference skipped = "YES" parallelizable = "YES">
+            <BuildableReference BlueprintName = "DisabledTests">
+            </BuildableReference>
+         </TestableReference>
+      </Testables>
+   </TestAction>
+</Scheme>
+"""
+
+
+def test_plan_test_shards(tmp_path: pathlib.Path) -> None:
+    """Test that tests are split into balanced shards, longest first.
+
+    :param tmp_path: A temporary directory
+    """
+
+    durations_path = tmp_path / "durations.json"
+    durations_path.write_text(
+        json.dumps(
+            {
+                "UnitTests/Fast/testA()": 1,
+                "UnitTests/Fast/testB()": 2,
+                "UnitTests/Medium/testC()": 5,
+                "UnitTests/Flaky/testFlaky()": 50,
+                "SelectedTests/Chosen/testOne()": 4,
+                "SerialTests/Model/testD()": 3,
+                "SerialTests/Model/testE()": 4,
+                "DisabledTests/Disabled/testF()": 100,
+            }
+        ),
+        encoding="utf-8",
+    )
+    durations = xcodeproj.load_test_durations(str(durations_path))
+    scheme = xcodeproj.Scheme.from_string(SCHEME, "App")
+
+    shards = xcodeproj.plan_test_shards(scheme, 3, durations=durations)
+
+    # SerialTests isn't parallelizable, so is run whole and takes 3 + 4, while
+    # SelectedTests/Chosen/testTwo() has no duration, so takes the mean of 1, 2, 5, 4 and 7.
+    # UnitTests is split into suites using the durations, so the rest of it, which is
+    # any test added since, is run on the shard with the least work and takes the mean.
+    assert [shard.only_testing for shard in shards] == [
+        ["SerialTests", "UnitTests"],
+        ["UnitTests/Medium", "UnitTests/Fast"],
+        ["SelectedTests/Chosen/testOne()", "SelectedTests/Chosen/testTwo()"],
+    ]
+    assert [shard.duration for shard in shards] == pytest.approx([10.8, 8.0, 7.8])
+    assert shards[1].skip_testing == []
+    assert shards[2].skip_testing == []
+    assert shards[0].arguments() == [
+        "-only-testing:SerialTests",
+        "-only-testing:UnitTests",
+        "-skip-testing:SerialTests/Slow/testSlow()",
+        "-skip-testing:UnitTests/Fast",
+        "-skip-testing:UnitTests/Medium",
+        "-skip-testing:UnitTests/Flaky/testFlaky()",
+    ]
+
+    # Without durations, every unit takes the same time and testables without any are run whole
+    shards = xcodeproj.plan_test_shards(scheme, 2)
+    assert [shard.only_testing for shard in shards] == [
+        ["SelectedTests/Chosen/testOne()", "SerialTests"],
+        ["SelectedTests/Chosen/testTwo()", "UnitTests"],
+    ]
+    assert shards[1].skip_testing == ["UnitTests/Flaky/testFlaky()"]
+
+    assert [len(shard.only_testing) for shard in xcodeproj.plan_test_shards(scheme, 6)] == [1, 1, 1, 1, 0, 0]
+
+    with pytest.raises(ValueError):
+        xcodeproj.plan_test_shards(scheme, 0)
+
+    with pytest.raises(ValueError):
+        xcodeproj.plan_test_shards(xcodeproj.Scheme.from_string("<Scheme></Scheme>", "Empty"), 2)
+
+    durations_path.write_text(json.dumps({"UnitTests/Fast/testA()": "slow"}), encoding="utf-8")
+
+    with pytest.raises(ValueError):
+        xcodeproj.load_test_durations(str(durations_path))
+
+
+def test_plan_test_shards_large() -> None:
+    """Test that a scheme with tens of thousands of tests is split evenly."""
+
+    testables = "".join(
+        f'<TestableReference skipped = "NO" parallelizable = "YES"><BuildableReference BlueprintName = "Tests{index}">'
+        "</BuildableReference></TestableReference>"
+        for index in range(4)
+    )
+    scheme = xcodeproj.Scheme.from_string(
+        f"<Scheme><TestAction><Testables>{testables}</Testables></TestAction></Scheme>", "Big"
+    )
+    durations = {f"Tests{index % 4}/Suite{index // 100}/test{index}()": 1 + index % 7 for index in range(40000)}
+
+    shards = xcodeproj.plan_test_shards(scheme, 32, durations=durations)
+
+    # Each testable is split into 400 suites, and also has a catch-all for
+    # tests which aren't in the durations, taking the mean duration
+    mean_duration = sum(durations.values()) / len(durations)
+    assert sum(len(shard.only_testing) for shard in shards) == 1604
+    assert max(shard.duration for shard in shards) - min(shard.duration for shard in shards) <= 1 + mean_duration
+
+    for index in range(4):
+        (catch_all,) = [shard for shard in shards if f"Tests{index}" in shard.only_testing]
+        suites = {test.rpartition("/")[0] for test in durations if test.startswith(f"Tests{index}/")}
+        placed = suites.intersection(catch_all.only_testing)
+        assert placed.union(catch_all.skip_testing) == suites
+
+    # The arguments stay far below the limit on the length of a command line
+    assert max(len(" ".join(shard.arguments())) for shard in shards) < 16 * 1024
+
+    # Suites which are too long for an even split are split into tests, up to a limit
+    durations = {f"Tests{index % 4}/Suite{index // 3000}/test{index}()": 1 + index % 7 for index in range(40000)}
+    shards = xcodeproj.plan_test_shards(scheme, 32, durations=durations, max_split_tests=500)
+
+    assert max(len(shard.skip_testing) for shard in shards) <= 14 + 500
+    assert max(len(" ".join(shard.arguments())) for shard in shards) < 64 * 1024
+
+
+def test_plan_test_shards_splits_suites() -> None:
+    """Test that suites are split into tests when they are too long, and skipped suites are left out."""
+
+    scheme = xcodeproj.Scheme.from_string(
+        """<Scheme><TestAction><Testables>
+        <TestableReference skipped = "NO" parallelizable = "YES">
+            <BuildableReference BlueprintName = "UnitTests"></BuildableReference>
+            <SkippedTests><Test Identifier = "Flaky"></Test></SkippedTests>
+        </TestableReference>
+        </Testables></TestAction></Scheme>""",
+        "Split",
+    )
+    durations = {
+        "UnitTests/Long/testA()": 4,
+        "UnitTests/Long/testB()": 4,
+        "UnitTests/Long/testC()": 4,
+        "UnitTests/Short/testD()": 0.5,
+        "UnitTests/Short/testE()": 0.5,
+        "UnitTests/Flaky/testF()": 10,
+        "UnitTests/Flaky/testG()": 10,
+    }
+
+    shards = xcodeproj.plan_test_shards(scheme, 3, durations=durations)
+
+    # Long takes 12 of the 15.6 seconds, so is split into tests, while Short is kept whole.
+    # Flaky is skipped by the scheme, so isn't run, and the catch-all skips it too.
+    assert [shard.only_testing for shard in shards] == [
+        ["UnitTests/Long/testA()", "UnitTests/Short"],
+        ["UnitTests/Long/testB()", "UnitTests"],
+        ["UnitTests/Long/testC()"],
+    ]
+    assert shards[1].skip_testing == [
+        "UnitTests/Long/testA()",
+        "UnitTests/Long/testC()",
+        "UnitTests/Short",
+        "UnitTests/Flaky",
+    ]
+
+    # Without any tests to split out, Long is kept whole
+    shards = xcodeproj.plan_test_shards(scheme, 3, durations=durations, max_split_tests=0)
+    assert [shard.only_testing for shard in shards] == [["UnitTests/Long"], ["UnitTests/Short"], ["UnitTests"]]
@@ -0,0 +1,141 @@
+"""Tests for synchronized folders."""
+
+import os
+import pathlib
+import shutil
+
+import pytest
+
+import xcodeproj
+from xcodeproj import synchronized
+
+COLLATERAL_PATH = os.path.join(os.path.abspath(os.path.join(os.path.abspath(__file__), "..")), "collateral")
+
+TARGET_KEY = "B02CD864C5DF1A379D1FECBE"
+OTHER_TARGET_KEY = "EE00000000000000000000AA"
+
+
+@pytest.fixture(name="project_path")
+def fixture_project_path(tmp_path: pathlib.Path) -> str:
+    """Copy the synchronized project and add exceptions to its folder.
+
+    :param tmp_path: A temporary directory
+
+    :returns: The path to the copied project
+    """
+
+    shutil.copytree(os.path.join(COLLATERAL_PATH, "Synchronized"), tmp_path / "Synchronized")
+    project_path = tmp_path / "Synchronized" / "Synchronized.xcodeproj"
+    pbxproj_path = project_path / "project.pbxproj"
+    contents = pbxproj_path.read_text(encoding="utf-8")
+
+    contents = contents.replace(
+        "\t\t\tisa = PBXFileSystemSynchronizedRootGroup;\n",
+        "\t\t\tisa = PBXFileSystemSynchronizedRootGroup;\n"
+        "\t\t\texceptions = (EE0000000000000000000001, EE0000000000000000000002, );\n"
+        '\t\t\texplicitFileTypes = {"Generated/Model.swift" = sourcecode.swift; };\n'
+        "\t\t\texplicitFolders = (Data, );\n",
+    )
+    contents = contents.replace(
+        "/* Begin PBXFileSystemSynchronizedRootGroup section */",
+        "/* Begin PBXFileSystemSynchronizedBuildFileExceptionSet section */\n"
+        "\t\tEE0000000000000000000001 = {isa = PBXFileSystemSynchronizedBuildFileExceptionSet; "
+        f"membershipExceptions = (Generated, Info.plist, ); target = {TARGET_KEY}; }};\n"
+        "\t\tEE0000000000000000000002 = {isa = PBXFileSystemSynchronizedBuildFileExceptionSet; "
+        f"membershipExceptions = (Info.plist, ); target = {OTHER_TARGET_KEY}; }};\n"
+        "/* End PBXFileSystemSynchronizedBuildFileExceptionSet section */\n\n"
+        "/* Begin PBXFileSystemSynchronizedRootGroup section */",
+    )
+    pbxproj_path.write_text(contents, encoding="utf-8")
+
+    sources = tmp_path / "Synchronized" / "Sources"
+
+    for relative_path in [
+        "Info.plist",
+        ".DS_Store",
+        "Generated/Model.swift",
+        "Data/Nested/values.json",
+        "Assets.xcassets/Contents.json",
+        "Feature/Deeper/View.swift",
+    ]:
+        (sources / relative_path).parent.mkdir(parents=True, exist_ok=True)
+        (sources / relative_path).write_text("", encoding="utf-8")
+
+    return str(project_path)
+
+
+def test_membership(project_path: str) -> None:
+    """Test that folders are expanded and exceptions applied per target.
+
+    :param project_path: The path to the project
+    """
+
+    project = xcodeproj.XcodeProject(project_path)
+    sources = os.path.join(os.path.dirname(project_path), "Sources")
+    membership = project.synchronized_membership(max_workers=4)
+
+    def absolute(*relative_paths: str) -> list[str]:
+        return [os.path.join(sources, relative_path) for relative_path in relative_paths]
+
+    everything = absolute(
+        "Assets.xcassets",
+        "Data",
+        "Feature/Deeper/View.swift",
+        "Generated/Model.swift",
+        "Info.plist",
+        "Probe.swift",
+    )
+
+    assert membership.group_files("133F42F381B2B5DDEC115EEF") == everything
+    assert membership.files_for_target(TARGET_KEY) == absolute(
+        "Assets.xcassets", "Data", "Feature/Deeper/View.swift", "Probe.swift"
+    )
+    assert membership.files_for_target(OTHER_TARGET_KEY) == absolute("Info.plist")
+    assert membership.target_keys() == [TARGET_KEY, OTHER_TARGET_KEY]
+
+    assert membership.targets_for_file(os.path.join(sources, "Feature", "..", "Probe.swift")) == [TARGET_KEY]
+    assert membership.targets_for_file(os.path.join(sources, "Generated", "Model.swift")) == []
+    assert membership.file_type(os.path.join(sources, "Generated", "Model.swift")) == "sourcecode.swift"
+    assert membership.file_type(os.path.join(sources, "Probe.swift")) is None
+
+    target = project.target_by_name("Synchronized")
+    assert target is not None
+    assert project.synchronized_files(target) == membership.files_for_target(TARGET_KEY)
+
+
+def test_rescans_changed_directories(project_path: str, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test that only directories which have changed are listed again.
+
+    :param project_path: The path to the project
+    :param monkeypatch: The pytest monkeypatch fixture
+    """
+
+    project = xcodeproj.XcodeProject(project_path)
+    sources = os.path.join(os.path.dirname(project_path), "Sources")
+    project.synchronized_membership()
+
+    scanned: list[str] = []
+    scandir = os.scandir
+
+    def recording_scandir(path: str) -> "os._ScandirIterator[str]":
+        scanned.append(path)
+        return scandir(path)
+
+    monkeypatch.setattr(synchronized.os, "scandir", recording_scandir)
+
+    assert project.synchronized_membership().group_files("133F42F381B2B5DDEC115EEF")
+    assert scanned == []
+
+    new_file = os.path.join(sources, "Feature", "Deeper", "New.swift")
+
+    with open(new_file, "w", encoding="utf-8"):
+        pass
+
+    # Make sure the modification time changes, however coarse the file system's clock
+    stat_result = os.stat(os.path.dirname(new_file))
+    os.utime(os.path.dirname(new_file), ns=(stat_result.st_atime_ns, stat_result.st_mtime_ns + 1_000_000_000))
+
+    membership = project.synchronized_membership()
+
+    assert scanned == [os.path.join(sources, "Feature", "Deeper")]
+    assert membership.targets_for_file(new_file) == [TARGET_KEY]
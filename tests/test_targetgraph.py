@@ -0,0 +1,107 @@
+"""Tests for the target dependency graph."""
+
+import os
+
+import pytest
+
+import xcodeproj
+
+COLLATERAL_PATH = os.path.join(os.path.abspath(os.path.join(os.path.abspath(__file__), "..")), "collateral")
+
+
+def test_project_graph() -> None:
+    """Test that dependencies are followed through their proxies."""
+
+    project = xcodeproj.XcodeProject(os.path.join(COLLATERAL_PATH, "One.xcodeproj"))
+    graph = project.target_graph()
+
+    def named(name: str) -> xcodeproj.PBXTarget:
+        target = project.target_by_name(name)
+        assert target is not None
+        return target
+
+    app = named("wat")
+    watch_app = named("wat WatchKit App")
+    extension = named("wat WatchKit Extension")
+    cljtest = named("CLJTest")
+
+    assert len(graph) == 4
+    assert project.target_dependencies(app) == [watch_app]
+    assert project.target_dependencies(app, transitive=True) == [watch_app, extension]
+    assert project.target_dependents(extension, transitive=True) == [app, watch_app]
+    assert project.target_dependents(cljtest) == []
+    assert graph.levels() == [
+        [extension.object_key, cljtest.object_key],
+        [watch_app.object_key],
+        [app.object_key],
+    ]
+    assert graph.topological_order() == [
+        extension.object_key,
+        cljtest.object_key,
+        watch_app.object_key,
+        app.object_key,
+    ]
+    assert graph.cycles() == []
+
+
+def test_diamond() -> None:
+    """Test levels and closures for a diamond with a tail."""
+
+    graph = xcodeproj.TargetGraph(
+        [
+            ("app", ["left", "right", "missing"]),
+            ("left", ["base"]),
+            ("right", ["base", "base"]),
+            ("base", []),
+            ("tests", ["app"]),
+        ]
+    )
+
+    assert graph.dependencies("right") == ["base"]
+    assert graph.dependents("base") == ["left", "right"]
+    assert graph.levels() == [["base"], ["left", "right"], ["app"], ["tests"]]
+    assert graph.transitive_dependencies("tests") == ["app", "left", "right", "base"]
+    assert graph.transitive_dependents("base") == ["app", "left", "right", "tests"]
+    assert graph.transitive_dependencies("base") == []
+
+    # Closures are cached, but callers get their own copy
+    graph.transitive_dependencies("tests").clear()
+    assert graph.transitive_dependencies("tests") == ["app", "left", "right", "base"]
+
+
+def test_cycles() -> None:
+    """Test that cycles are found and stop the graph being ordered."""
+
+    graph = xcodeproj.TargetGraph(
+        [
+            ("a", ["b"]),
+            ("b", ["c"]),
+            ("c", ["a", "d"]),
+            ("d", []),
+            ("e", ["e"]),
+            ("f", ["a"]),
+        ]
+    )
+
+    assert graph.cycles() == [["a", "b", "c"], ["e"]]
+    assert graph.transitive_dependencies("a") == ["a", "b", "c", "d"]
+    assert graph.transitive_dependents("d") == ["a", "b", "c", "f"]
+    assert graph.transitive_dependencies("e") == ["e"]
+
+    with pytest.raises(xcodeproj.DependencyCycleError) as error:
+        graph.topological_order()
+
+    assert error.value.cycles == [["a", "b", "c"], ["e"]]
+
+
+def test_deep_chain() -> None:
+    """Test that long chains don't hit the recursion limit."""
+
+    count = 5000
+    graph = xcodeproj.TargetGraph(
+        (f"t{index}", [f"t{index + 1}"] if index + 1 < count else []) for index in range(count)
+    )
+
+    assert graph.topological_order()[0] == f"t{count - 1}"
+    assert len(graph.levels()) == count
+    assert len(graph.transitive_dependencies("t0")) == count - 1
@@ -0,0 +1,158 @@
+"""Tests for workspaces."""
+
+import os
+import pathlib
+import shutil
+
+import pytest
+
+import xcodeproj
+from xcodeproj import cache
+
+COLLATERAL_PATH = os.path.join(os.path.abspath(os.path.join(os.path.abspath(__file__), "..")), "collateral")
+
+WORKSPACE_DATA = """<?xml version="1.0" encoding="UTF-8"?>
+<Workspace
+   version = "1.0">
+   <FileRef
+      location = "group:One.xcodeproj">
+   </FileRef>
+   <Group
+      location = "container:Libraries"
+      name = "Libs">
+      <Group
+         location = "group:Nested">
+         <FileRef
+            location = "group:Two.xcodeproj">
+         </FileRef>
+      </Group>
+      <FileRef
+         location = "group:Missing.xcodeproj">
+      </FileRef>
+   </Group>
+   <FileRef
+      location = "container:One.xcodeproj">
+   </FileRef>
+   <FileRef
+      location = "container:README.md">
+   </FileRef>
+   <FileRef
+      location = "developer:Library/Xcode.xcodeproj">
+   </FileRef>
+</Workspace>
+"""
+
+
+@pytest.fixture(name="workspace_path")
+def fixture_workspace_path(tmp_path: pathlib.Path, monkeypatch: pytest.MonkeyPatch) -> str:
+    """Create a workspace containing copies of the collateral projects.
+
+    :param tmp_path: A temporary directory
+    :param monkeypatch: The pytest monkeypatch fixture
+
+    :returns: The path to the workspace
+    """
+
+    cache_folder = str(tmp_path / "cache")
+    monkeypatch.setattr(cache, "cache_folder", lambda: cache_folder)
+
+    shutil.copytree(os.path.join(COLLATERAL_PATH, "One.xcodeproj"), tmp_path / "One.xcodeproj")
+    shutil.copytree(
+        os.path.join(COLLATERAL_PATH, "Two.xcodeproj"),
+        tmp_path / "Libraries" / "Nested" / "Two.xcodeproj",
+    )
+
+    workspace_path = tmp_path / "App.xcworkspace"
+    workspace_path.mkdir()
+    (workspace_path / "contents.xcworkspacedata").write_text(WORKSPACE_DATA, encoding="utf-8")
+    return str(workspace_path)
+
+
+def test_read_workspace_data(workspace_path: str) -> None:
+    """Test that locations are resolved relative to their groups.
+
+    :param workspace_path: The path to the workspace
+    """
+
+    container = os.path.dirname(workspace_path)
+    file_refs = xcodeproj.read_workspace_data(workspace_path)
+
+    assert [(file_ref.path, file_ref.groups) for file_ref in file_refs] == [
+        (os.path.join(container, "One.xcodeproj"), []),
+        (os.path.join(container, "Libraries", "Nested", "Two.xcodeproj"), ["Libs", "Nested"]),
+        (os.path.join(container, "Libraries", "Missing.xcodeproj"), ["Libs"]),
+        (os.path.join(container, "One.xcodeproj"), []),
+        (os.path.join(container, "README.md"), []),
+        (None, []),
+    ]
+    assert [file_ref.is_project for file_ref in file_refs] == [True, True, True, True, False, False]
+
+    # A workspace embedded in a project refers to the project as self
+    embedded_path = os.path.join(container, "One.xcodeproj", "project.xcworkspace")
+    os.makedirs(embedded_path)
+
+    with open(os.path.join(embedded_path, "contents.xcworkspacedata"), "w", encoding="utf-8") as embedded_file:
+        embedded_file.write('<Workspace version = "1.0"><FileRef location = "self:"></FileRef></Workspace>')
+
+    assert [file_ref.path for file_ref in xcodeproj.read_workspace_data(embedded_path)] == [
+        os.path.join(container, "One.xcodeproj")
+    ]
+
+    with pytest.raises(xcodeproj.WorkspaceParseError):
+        xcodeproj.read_workspace_data(os.path.join(container, "Hodor.xcworkspace"))
+
+
+def test_resolve_location() -> None:
+    """Test that each kind of location is resolved relative to the right folder."""
+
+    folders = {"group_folder": "/Group", "container_folder": "/Container", "self_folder": "/Container/App.xcodeproj"}
+
+    assert xcodeproj.resolve_location("group:Lib/Lib.xcodeproj", **folders) == "/Group/Lib/Lib.xcodeproj"
+    assert xcodeproj.resolve_location("container:../Lib.xcodeproj", **folders) == "/Lib.xcodeproj"
+    assert xcodeproj.resolve_location("self:", **folders) == "/Container/App.xcodeproj"
+    assert xcodeproj.resolve_location("absolute:/Lib.xcodeproj", **folders) == "/Lib.xcodeproj"
+    assert xcodeproj.resolve_location("developer:Platforms", **folders) is None
+
+
+@pytest.mark.parametrize("max_workers", [1, 2])
+def test_workspace(workspace_path: str, max_workers: int) -> None:
+    """Test that the projects in a workspace are loaded and can be searched together.
+
+    :param workspace_path: The path to the workspace
+    :param max_workers: The number of processes to load with
+    """
+
+    container = os.path.dirname(workspace_path)
+    one_path = os.path.join(container, "One.xcodeproj")
+    two_path = os.path.join(container, "Libraries", "Nested", "Two.xcodeproj")
+
+    workspace = xcodeproj.XcodeWorkspace(workspace_path, max_workers=max_workers, write_cache=True)
+
+    assert list(workspace.projects) == [one_path, two_path]
+    assert workspace.missing_project_paths == [os.path.join(container, "Libraries", "Missing.xcodeproj")]
+
+    one = workspace.projects[one_path]
+    assert one.path == one_path
+    assert len(one.objects) == len(xcodeproj.XcodeProject(one_path).objects)
+
+    matches = workspace.targets_named("CLJTest")
+    assert [(project.path, target.name) for project, target in matches] == [
+        (one_path, "CLJTest"),
+        (two_path, "CLJTest"),
+    ]
+
+    found = workspace.target_by_name("wat")
+    assert found is not None
+    assert found[0] is one
+    assert workspace.target_by_name("Hodor") is None
+
+    app_delegate = os.path.join(one_path, "..", "CLJTest", "AppDelegate.swift")
+    references = workspace.file_references_for_path(app_delegate)
+    assert [project for project, _ in references] == [one]
+
+    containing = workspace.targets_containing_path(app_delegate)
+    assert [(project, target.name) for project, target in containing] == [(one, "CLJTest")]
+
+    # The projects were cached, so loading again reads them from the cache
+    assert len(cache.cache_entries()) == 2
+    assert list(xcodeproj.XcodeWorkspace(workspace_path, max_workers=max_workers).projects) == [one_path, two_path]
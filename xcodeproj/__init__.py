@@ -1,12 +1,12 @@
 """Xcode project file management."""
 
-import hashlib
+import contextlib
+import functools
 import json
 import os
-import pathlib
-import pickle
 import subprocess
 import weakref
+from collections.abc import Callable, Iterable, Iterator, Mapping
 from importlib.metadata import PackageNotFoundError
 from importlib.metadata import version as _version
 from typing import (
@@ -16,8 +16,8 @@ from typing import (
 )
 
 import deserialize
-import platformdirs
 
+from . import cache
 from .buildphases import (
     PBXBuildPhase,
     PBXCopyFilesBuildPhase,
@@ -28,13 +28,18 @@ from .buildphases import (
     PBXSourcesBuildPhase,
 )
 from .buildrules import PBXBuildRule
+from .buildsettings import BuildSettingsResolver, XCConfigCache, XCConfigError
+from .constructors import construct
 from .files import PBXBuildFile
-from .objects import Objects
+from .indexes import MembershipIndex, PathIndex, ReferenceGraph, TargetIndex, TypeIndex
+from .macros import MacroCycleError, MacroExpander
+from .objects import LazyObjects, Objects
 from .other import (
     PBXContainerItemProxy,
     PBXFileSystemSynchronizedBuildFileExceptionSet,
     PBXTargetDependency,
 )
+from .parser import ObjectHook, PBXProjParseError, load_pbxproj, parse_pbxproj
 from .pathobjects import (
     PBXFileReference,
     PBXFileSystemSynchronizedRootGroup,
@@ -46,8 +51,22 @@ from .pathobjects import (
 )
 from .pbxobject import PBXObject
 from .pbxproject import PBXProject
-from .schemes import Scheme
+from .projectgraph import ProjectGraph
+from .schemeparser import parse_scheme_file, parse_scheme_string
+from .schemes import (
+    SCHEME_ACTIONS,
+    Scheme,
+    SchemeFile,
+    SchemeTargetIndex,
+    find_scheme_files,
+    parse_scheme_files,
+    scheme_buildable_references,
+)
+from .sharding import TestShard, load_test_durations, plan_test_shards
+from .synchronized import DirectoryListingCache, SynchronizedMembership, scan_folders
+from .targetgraph import DependencyCycleError, TargetGraph
 from .targets import PBXAggregateTarget, PBXNativeTarget, PBXProductType, PBXTarget
+from .workspace import WorkspaceFileRef, WorkspaceParseError, XcodeWorkspace, read_workspace_data, resolve_location
 from .xcobjects import XCBuildConfiguration, XCConfigurationList
 
 try:
@@ -56,6 +75,13 @@ except PackageNotFoundError:  # pragma: no cover
     __version__ = "0.0.0"
 
 __all__ = [
+    "BuildSettingsResolver",
+    "DirectoryListingCache",
+    "DependencyCycleError",
+    "LazyObjects",
+    "MacroCycleError",
+    "MacroExpander",
+    "MembershipIndex",
     "Objects",
     "PBXAggregateTarget",
     "PBXBuildFile",
@@ -73,6 +99,10 @@ __all__ = [
     "PBXObject",
     "PBXObjectType",
     "PBXPathObject",
+    "PathIndex",
+    "ProjectGraph",
+    "ReferenceGraph",
+    "PBXProjParseError",
     "PBXProductType",
     "PBXProject",
     "PBXReferenceProxy",
@@ -82,21 +112,74 @@ __all__ = [
     "PBXTarget",
     "PBXTargetDependency",
     "PBXVariantGroup",
+    "SCHEME_ACTIONS",
     "Scheme",
+    "SchemeFile",
+    "SchemeTargetIndex",
+    "SynchronizedMembership",
+    "TargetGraph",
+    "TargetIndex",
+    "TestShard",
+    "TypeIndex",
+    "WorkspaceFileRef",
+    "WorkspaceParseError",
     "XCBuildConfiguration",
+    "XCConfigCache",
+    "XCConfigError",
     "XCConfigurationList",
     "XCVersionGroup",
     "XcodeProject",
+    "XcodeWorkspace",
     "__version__",
+    "find_scheme_files",
+    "load_pbxproj",
+    "load_test_durations",
+    "parse_pbxproj",
+    "parse_scheme_file",
+    "parse_scheme_files",
+    "parse_scheme_string",
+    "plan_test_shards",
+    "read_workspace_data",
+    "resolve_location",
+    "scheme_buildable_references",
 ]
 
 PBXObjectType = TypeVar("PBXObjectType", bound=PBXObject)
 
 
+# The source trees which a path can be resolved for
+_SOURCE_TREES = frozenset(["<group>", "<absolute>", "SOURCE_ROOT", "BUILT_PRODUCTS_DIR", "SDKROOT", "DEVELOPER_DIR"])
+
+# The source trees which are relative to a build variable
+_BUILD_VARIABLE_SOURCE_TREES = frozenset(["BUILT_PRODUCTS_DIR", "SDKROOT", "DEVELOPER_DIR"])
+
+
+def _children_of(path_object: PBXPathObject, objects: Objects) -> list[PBXPathObject]:
+    """Get the children of a group of any kind.
+
+    :param path_object: The object to get the children of
+    :param objects: The objects in the project
+
+    :returns: The children, or an empty list if the object isn't a group
+    """
+
+    if isinstance(path_object, PBXGroup):
+        child_ids = path_object.children_ids
+    elif isinstance(path_object, XCVersionGroup):
+        child_ids = path_object.child_ids
+    else:
+        return []
+
+    return [cast(PBXPathObject, objects[child_id]) for child_id in child_ids if child_id in objects]
+
+
 def _load_pbxproj_as_json(path: str) -> dict[str, Any]:
-    """Load a pbxproj as JSON.
+    """Load a pbxproj as JSON using `plutil`.
+
+    This is only available on macOS and is kept as a fallback for the built-in
+    parser.
 
-    :param path: The path to the pbxproj
+    :param path: The path to the xcodeproj
 
     :returns: A deserialized representation of the pbxproj
     """
@@ -116,10 +199,91 @@ def _load_pbxproj_as_json(path: str) -> dict[str, Any]:
     return cast(dict[str, Any], json.loads(content))
 
 
+def _load_pbxproj(
+    path: str,
+    *,
+    use_plutil: bool = False,
+    object_hook: ObjectHook | None = None,
+) -> dict[str, Any]:
+    """Load the pbxproj inside an xcodeproj.
+
+    :param path: The path to the xcodeproj
+    :param use_plutil: Set to True to use `plutil` rather than the built-in parser
+    :param object_hook: Called with each entry of the `objects` dictionary, with
+        the result replacing the entry. The built-in parser calls this as each
+        object is read, so the full tree of raw objects is never built.
+
+    :returns: A deserialized representation of the pbxproj
+    """
+
+    if not use_plutil:
+        return load_pbxproj(os.path.join(path, "project.pbxproj"), object_hook=object_hook)
+
+    tree = _load_pbxproj_as_json(path)
+
+    if object_hook is not None:
+        objects = tree["objects"]
+        for key, value in objects.items():
+            objects[key] = object_hook(key, value)
+
+    return tree
+
+
+def _deserialize_object(key: str, value: dict[str, Any], *, throw_on_unhandled: bool) -> PBXObject:
+    """Deserialize a single entry of the `objects` dictionary.
+
+    The concrete type is chosen from the `isa` of the entry.
+
+    :param key: The key of the object
+    :param value: The raw values of the object
+    :param throw_on_unhandled: Set to True to raise if the object has keys that aren't understood
+
+    :raises DeserializeException: If the object can't be deserialized
+
+    :returns: The deserialized object
+    """
+
+    value["object_key"] = key
+
+    try:
+        return construct(PBXObject, value, throw_on_unhandled=throw_on_unhandled)
+    except deserialize.DeserializeException as ex:
+        raise type(ex)(f"Failed to deserialize object {key}: {ex}") from ex
+
+
+def _weakly_referenced(
+    project: "XcodeProject",
+    deserialize_object: Callable[[str, dict[str, Any]], PBXObject],
+) -> Callable[[str, dict[str, Any]], PBXObject]:
+    """Wrap an object deserializer so that it sets up the weak references.
+
+    :param project: The project the objects belong to
+    :param deserialize_object: The function which deserializes a single object
+
+    :returns: A function which deserializes an object and sets its references
+    """
+
+    project_ref = weakref.ref(project)
+
+    def deserialize_with_refs(key: str, value: dict[str, Any]) -> PBXObject:
+        project_object = deserialize_object(key, value)
+        project_object.objects_ref = weakref.ref(cast(XcodeProject, project_ref()).objects)
+        project_object.project_ref = project_ref
+        return project_object
+
+    return deserialize_with_refs
+
+
 class XcodeProject:
     """Represents an Xcodeproject.
 
     :param path: The path to the pbxproj file
+    :param ignore_deserialization_errors: Set to True to ignore unknown keys on objects
+    :param use_plutil: Set to True to parse the pbxproj with `plutil` (macOS only)
+        rather than the built-in parser
+    :param lazy: Set to True to only deserialize each object the first time it
+        is accessed. Deserialization errors are then raised on that access
+        rather than here.
     """
 
     path: str
@@ -128,89 +292,215 @@ class XcodeProject:
     project: PBXProject
     _cached_items: dict[str, dict[str, PBXObject]]
     _schemes: list[Scheme] | None
+    _scheme_files: list[SchemeFile] | None
+    _parsed_schemes: dict[str, Scheme]
+    _scheme_target_index: SchemeTargetIndex | None
     _is_populated: bool
-
-    def __init__(self, path: str, *, ignore_deserialization_errors: bool = False) -> None:
+    _parent_index: dict[str, list[str]] | None
+    _type_index: TypeIndex | None
+    _target_index: TargetIndex | None
+    _membership_index: MembershipIndex | None
+    _path_index: PathIndex | None
+    _reference_graph: ReferenceGraph | None
+    _build_settings_resolver: BuildSettingsResolver | None
+    _target_graph: TargetGraph | None
+    _project_graph: ProjectGraph | None
+    _directory_listing_cache: DirectoryListingCache
+
+    def __init__(
+        self,
+        path: str,
+        *,
+        ignore_deserialization_errors: bool = False,
+        use_plutil: bool = False,
+        lazy: bool = False,
+    ) -> None:
         self.path = path
         self.source_root = os.path.dirname(path)
-        tree = _load_pbxproj_as_json(path)
-
-        for key, value in tree["objects"].items():
-            value["object_key"] = key
+        self._cached_items = {}
+        self._schemes = None
+        self._scheme_files = None
+        self._parsed_schemes = {}
+        self._scheme_target_index = None
+        self._is_populated = False
+        self._reset_indexes()
 
-        self.objects = Objects(
-            **deserialize.deserialize(
-                dict[str, PBXObject],
-                tree["objects"],
-                throw_on_unhandled=not ignore_deserialization_errors,
-                raw_storage_mode=deserialize.RawStorageMode.ALL,
-            )
+        deserialize_object = functools.partial(
+            _deserialize_object,
+            throw_on_unhandled=not ignore_deserialization_errors,
         )
 
+        if lazy:
+            tree = _load_pbxproj(path, use_plutil=use_plutil)
+            self.objects = LazyObjects(tree["objects"], _weakly_referenced(self, deserialize_object))
+            self.project = cast(PBXProject, self.objects[tree["rootObject"]])
+            return
+
+        tree = _load_pbxproj(path, use_plutil=use_plutil, object_hook=deserialize_object)
+        self.objects = Objects(tree["objects"])
         self.project = cast(PBXProject, self.objects[tree["rootObject"]])
-        self._cached_items = {}
-        self._schemes = None
-        self._is_populated = False
 
         self._set_weak_refs()
 
     @staticmethod
-    def from_cache(project_path: str, *, ignore_deserialization_errors: bool = False) -> "XcodeProject":
+    def from_cache(
+        project_path: str,
+        *,
+        ignore_deserialization_errors: bool = False,
+        use_plutil: bool = False,
+        lazy: bool = False,
+    ) -> "XcodeProject":
         """Attempt to load the project from a cached folder if possible.
 
         :param project_path: The path to the actual project (in case it's a cache miss)
+        :param ignore_deserialization_errors: Set to True to ignore unknown keys on objects
+        :param use_plutil: Set to True to parse the pbxproj with `plutil` on a cache miss
+        :param lazy: Set to True to deserialize objects on first access on a cache miss
 
         :returns: The loaded XcodeProj
         """
 
-        cache_folder = platformdirs.user_cache_dir("xcodeproj")
-
         try:
-            project_hash = hashlib.md5(
-                pathlib.Path(os.path.join(project_path, "project.pbxproj")).read_bytes(),
-                usedforsecurity=False,
-            ).hexdigest()
-
-            with open(os.path.join(cache_folder, f"{project_hash}.dat"), "rb") as cached_file:
-                return pickle.load(cached_file)
+            cache_path = cache.project_cache_path(project_path)
+            project = XcodeProject._from_cache_payload(project_path, cache.read_payload(cache_path))
+            cache.mark_used(cache_path)
+            return project
         except Exception:
             return XcodeProject(
                 project_path,
                 ignore_deserialization_errors=ignore_deserialization_errors,
+                use_plutil=use_plutil,
+                lazy=lazy,
             )
 
     def write_cache(self) -> None:
         """Write out this file to a cache
 
-        :param cache_folder: The folder to store the cached project in.
+        The least recently used projects are evicted if the cache grows beyond
+        its limits. See `xcodeproj.cache.prune_cache`.
         """
         self.populate_paths()
 
-        cache_folder = platformdirs.user_cache_dir("xcodeproj")
+        cache_folder = cache.cache_folder()
         os.makedirs(cache_folder, exist_ok=True)
 
-        project_hash = hashlib.md5(
-            pathlib.Path(os.path.join(self.path, "project.pbxproj")).read_bytes(), usedforsecurity=False
-        ).hexdigest()
+        cache.write_payload(cache.project_cache_path(self.path, cache_folder), self._cache_payload())
+        cache.prune_cache(folder=cache_folder)
+
+    def _cache_payload(self) -> dict[str, Any]:
+        """Get the state to store in the cache.
+
+        Schemes aren't stored, as they can change without the pbxproj changing.
+
+        :returns: The payload for the cache file
+        """
+
+        return {
+            "objects": cache.pack_objects(self.objects, frozenset(["objects_ref", "project_ref"])),
+            "root": self.project.object_key,
+            "cached_items": {name: list(items) for name, items in self._cached_items.items()},
+            "is_populated": self._is_populated,
+        }
 
-        with open(os.path.join(cache_folder, f"{project_hash}.dat"), "wb") as cached_file:
-            pickle.dump(self, cached_file)
+    @staticmethod
+    def _from_cache_payload(path: str, payload: dict[str, Any]) -> "XcodeProject":
+        """Restore a project from the state stored in the cache.
+
+        :param path: The path to the xcodeproj
+        :param payload: The payload from the cache file
+
+        :returns: The restored project
+        """
+
+        project = XcodeProject.__new__(XcodeProject)
+        project.path = path
+        project.source_root = os.path.dirname(path)
+        project.objects = Objects()
+        project.objects.update(
+            cache.unpack_objects(
+                payload["objects"],
+                {"objects_ref": weakref.ref(project.objects), "project_ref": weakref.ref(project)},
+            )
+        )
+        project.project = cast(PBXProject, project.objects[payload["root"]])
+        project._cached_items = {
+            name: {object_key: project.objects[object_key] for object_key in object_keys}
+            for name, object_keys in payload["cached_items"].items()
+        }
+        project._schemes = None
+        project._scheme_files = None
+        project._parsed_schemes = {}
+        project._scheme_target_index = None
+        project._is_populated = payload["is_populated"]
+        project._reset_indexes()
+        return project
+
+    def __getstate__(self) -> dict[str, Any]:
+        """Return state values to be pickled.
+
+        The project graph holds loading threads and the type index holds a
+        weak reference to the objects, so they are left out. They are rebuilt
+        on next use, as are the other indexes.
+        """
+        state = self.__dict__.copy()
+        state["_project_graph"] = None
+        state["_type_index"] = None
+        return state
 
     def __setstate__(self, state: dict[str, Any]) -> None:
         """Restore state from the unpickled state values."""
         self.__dict__ = state
+        self._reset_indexes()
         self._set_weak_refs()
 
+    def _reset_indexes(self) -> None:
+        """Clear the lookup indexes so that they are rebuilt on next use."""
+        self._parent_index = None
+        self._type_index = None
+        self._target_index = None
+        self._membership_index = None
+        self._path_index = None
+        self._reference_graph = None
+        self._build_settings_resolver = None
+        self._target_graph = None
+        self._project_graph = None
+        self._directory_listing_cache = DirectoryListingCache()
+
     def _set_weak_refs(self) -> None:
         """Setup the weak references."""
         for obj in self.objects.values():
             obj.objects_ref = weakref.ref(self.objects)
             obj.project_ref = weakref.ref(self)
 
+    def type_index(self) -> TypeIndex:
+        """Get the index of objects by type, building it on first use.
+
+        Unlike the other indexes, this is rebuilt once objects are added to,
+        replaced in or removed from `objects`, so that types which haven't
+        been fetched yet include them.
+
+        :returns: The type index
+        """
+
+        if self._type_index is None or not self._type_index.is_current(self.objects):
+            self._type_index = TypeIndex(self.objects)
+
+        return self._type_index
+
+    def object_counts(self) -> dict[str, int]:
+        """Get the number of objects of each isa.
+
+        This doesn't deserialize anything, even when the project is loaded lazily.
+
+        :returns: The counts keyed by isa
+        """
+
+        return self.type_index().counts()
+
     def _populate_cache(self, object_type: type[PBXObject]) -> None:
         """Populate the cache of items specified.
 
-        This just avoids a full dictionary scan
+        The keys come from the type index, so no scan of the objects is needed
 
         :param object_type: The type of objects to populate
         """
@@ -218,63 +508,326 @@ class XcodeProject:
         if object_type.__name__ in self._cached_items:
             return
 
-        cached_items: dict[str, PBXObject] = {}
+        objects = self.objects
+
+        self._cached_items[object_type.__name__] = {
+            object_key: objects[object_key] for object_key in self.type_index().keys_of_type(object_type)
+        }
+
+    def _populate(self, root_group: PBXPathObject) -> tuple[list[PBXPathObject], list[PBXPathObject]]:
+        """Set the relative paths of the objects which can be found from the top down.
+
+        The tree is walked with an explicit stack, in the same order as a
+        recursive walk, so deep trees can't exceed the recursion limit and
+        objects in more than one group end up with the same path.
+
+        :param root_group: The group to start from
 
-        for object_key, project_object in self.objects.items():
-            if not isinstance(project_object, object_type):
+        :returns: The objects which need their parents to resolve their paths,
+            and the objects below them which haven't been visited yet
+        """
+
+        objects = self.objects
+        non_set: list[PBXPathObject] = []
+        unvisited: list[PBXPathObject] = []
+
+        # Each entry is an object, its path, and whether it is left for later
+        stack: list[tuple[PBXPathObject, str | None, bool]] = [(root_group, None, False)]
+
+        while stack:
+            group, path, deferred = stack.pop()
+
+            if deferred:
+                non_set.append(group)
+                unvisited.extend(_children_of(group, objects))
                 continue
 
-            cached_items[object_key] = project_object
+            if path is not None:
+                group._relative_path = path
 
-        self._cached_items[object_type.__name__] = cached_items
+            if not isinstance(group, PBXGroup):
+                unvisited.extend(_children_of(group, objects))
+                continue
 
-    def _populate(
-        self,
-        parent_group: PBXPathObject,
-        path: str | None,
-        non_set: list[PBXPathObject],
-    ) -> None:
-        if path is not None:
-            parent_group._relative_path = path
+            children: list[tuple[PBXPathObject, str | None, bool]] = []
 
-        if not isinstance(parent_group, PBXGroup):
-            return
+            for child_id in group.children_ids:
+                subgroup = cast(PBXPathObject, objects[child_id])
 
-        for subgroup in parent_group.children:
-            if subgroup.source_tree == "SOURCE_ROOT":
-                self._populate(subgroup, subgroup.path, non_set)
-            elif subgroup.source_tree == "<group>":
-                if subgroup.path is None:
-                    if path is None:
-                        self._populate(subgroup, path, non_set)
+                if subgroup.source_tree == "SOURCE_ROOT":
+                    children.append((subgroup, subgroup.path, False))
+                elif subgroup.source_tree == "<group>":
+                    if subgroup.path is None:
+                        children.append((subgroup, None, path is not None))
+                    elif path is not None:
+                        children.append((subgroup, os.path.join(path, subgroup.path), False))
                     else:
-                        non_set.append(subgroup)
-                elif path is not None:
-                    self._populate(subgroup, os.path.join(path, subgroup.path), non_set)
+                        children.append((subgroup, subgroup.path, False))
                 else:
-                    self._populate(subgroup, subgroup.path, non_set)
-            else:
-                non_set.append(subgroup)
+                    children.append((subgroup, None, True))
+
+            stack.extend(reversed(children))
+
+        return non_set, unvisited
+
+    def _resolve_from_parents(self, item: PBXPathObject) -> bool:
+        """Resolve the relative path of an object which depends on its parents.
+
+        The ancestors without a known path are resolved first, from the top
+        down, so `relative_path` never has to recurse more than a level or two.
+
+        :param item: The object to resolve
+
+        :returns: True if the path could be resolved, False if an ancestor has an unexpected source tree
+        """
+
+        objects = self.objects
+        chain: list[PBXPathObject] = []
+        seen: set[str] = set()
+        current: PBXPathObject | None = item
+
+        while current is not None and current.object_key not in seen:
+            if getattr(current, "_relative_path", None) is not None:
+                break
+
+            if current.source_tree not in _SOURCE_TREES:
+                return False
+
+            seen.add(current.object_key)
+            chain.append(current)
+
+            if current.source_tree != "<group>":
+                break
+
+            parent_keys = self.parent_group_keys(current.object_key)
+            current = cast(PBXPathObject, objects[parent_keys[0]]) if parent_keys else None
+
+        for ancestor in reversed(chain):
+            ancestor.relative_path()
+
+        return True
+
+    def _build_parent_index(self) -> dict[str, list[str]]:
+        """Build the index from each object key to the keys of the groups containing it.
+
+        Parents are listed in the order `PBXPathObject.parent_group` has always
+        searched them: groups (including variant groups), then version groups.
+
+        :returns: The index
+        """
+
+        parent_index: dict[str, list[str]] = {}
+
+        for group in self.fetch_type(PBXGroup).values():
+            for child_id in group.children_ids:
+                parent_index.setdefault(child_id, []).append(group.object_key)
+
+        for version_group in self.fetch_type(XCVersionGroup).values():
+            for child_id in version_group.child_ids:
+                parent_index.setdefault(child_id, []).append(version_group.object_key)
+
+        return parent_index
+
+    def parent_group_keys(self, object_key: str) -> list[str]:
+        """Get the keys of the groups which contain an object.
+
+        The index behind this is built on first use, so changes to group
+        children made after that aren't reflected.
+
+        :param object_key: The key of the object
+
+        :returns: The keys of the containing groups, which may be empty
+        """
+
+        if self._parent_index is None:
+            self._parent_index = self._build_parent_index()
+
+        return list(self._parent_index.get(object_key, ()))
 
     def populate_paths(self) -> None:
         """Pre-emptively populate group paths.
 
-        This method is from the top down so is much quicker.
+        This method is from the top down so is much quicker. Every object
+        which can be reached from the main group is resolved, including the
+        ones inside groups without a folder of their own.
         """
 
         if self._is_populated:
             return
 
-        non_set: list[PBXPathObject] = []
-
-        root_group = cast(PBXPathObject, self.objects[self.project.main_group_id])
-        self._populate(root_group, None, non_set)
+        objects = self.objects
+        root_group = cast(PBXPathObject, objects[self.project.main_group_id])
+        non_set, unvisited = self._populate(root_group)
 
         for item in non_set:
+            self._resolve_from_parents(item)
             _ = item.relative_path()
 
+        # Anything below the objects above is resolved as it would be on first use
+        seen: set[str] = set()
+
+        while unvisited:
+            item = unvisited.pop()
+
+            if item.object_key in seen:
+                continue
+
+            seen.add(item.object_key)
+
+            if self._resolve_from_parents(item):
+                unvisited.extend(_children_of(item, objects))
+
         self._is_populated = True
 
+    def absolute_paths(self) -> dict[str, str]:
+        """Get the absolute path of every path object in one go.
+
+        This gives the same results as calling `absolute_path` on each object,
+        but works from the paths set by `populate_paths`.
+
+        :returns: The absolute path for each object key. Objects without a
+            path, or with an unexpected source tree, aren't included.
+        """
+
+        self.populate_paths()
+
+        source_root = self.source_root
+        paths: dict[str, str] = {}
+
+        for object_key, path_object in self.fetch_type(PBXPathObject).items():
+            source_tree = path_object.source_tree
+            path = path_object.path
+
+            if source_tree in _BUILD_VARIABLE_SOURCE_TREES:
+                if path is None:
+                    continue
+                if not path.startswith("/"):
+                    path = os.path.join(f"$({source_tree})", path) if path else f"$({source_tree})"
+                paths[object_key] = path
+                continue
+
+            if source_tree != "<absolute>":
+                path = path_object.__dict__.get("_relative_path")
+
+                # Objects which couldn't be found from the main group are worked out on their own
+                if path is None and source_tree in _SOURCE_TREES:
+                    path = path_object.relative_path()
+
+            if path is None:
+                continue
+
+            paths[object_key] = path if path.startswith("/") else os.path.join(source_root, path)
+
+        return paths
+
+    def reference_graph(self) -> ReferenceGraph:
+        """Get the graph of references between objects, building it on first use.
+
+        The graph isn't updated by changes made after it is built.
+
+        :returns: The reference graph
+        """
+
+        if self._reference_graph is None:
+            root_key = self.project.object_key
+
+            def referenced_keys(value: Any) -> list[str]:
+                if not isinstance(value, PBXObject):
+                    return []
+
+                keys = value.referenced_keys()
+
+                # A proxy for an object in this project also refers to that object
+                if isinstance(value, PBXContainerItemProxy) and value.container_portal == root_key:
+                    keys.append(value.remote_global_id_string)
+
+                return keys
+
+            self._reference_graph = ReferenceGraph(
+                (object_key, referenced_keys(value)) for object_key, value in self.objects.items()
+            )
+
+        return self._reference_graph
+
+    def referrers(self, object_key: str) -> list[PBXObject]:
+        """Find the objects which refer to an object.
+
+        :param object_key: The key of the referenced object
+
+        :returns: The referring objects, in project order
+        """
+
+        return [
+            self.objects[referrer_key]
+            for referrer_key in dict.fromkeys(self.reference_graph().references_to(object_key))
+        ]
+
+    def dangling_references(self) -> dict[str, list[str]]:
+        """Find references to objects which aren't in the project.
+
+        :returns: The missing keys referred to by each object which has any
+        """
+
+        return self.reference_graph().dangling()
+
+    def _file_reference_paths(self) -> Iterator[tuple[str, str]]:
+        """Get the absolute path of each file reference which has one on disk.
+
+        :returns: An iterator of the absolute path and key of each file reference
+        """
+
+        paths = self.absolute_paths()
+
+        for object_key in self.type_index().keys_of_type(PBXFileReference):
+            path = paths.get(object_key)
+
+            # Paths relative to build variables don't exist on disk
+            if path is None or path.startswith("$("):
+                continue
+
+            yield os.path.abspath(path), object_key
+
+    def path_index(self) -> PathIndex:
+        """Get the index of file references by absolute path, building it on first use.
+
+        The index isn't updated by changes made after it is built.
+
+        :returns: The path index
+        """
+
+        if self._path_index is None:
+            self._path_index = PathIndex(self._file_reference_paths())
+
+        return self._path_index
+
+    def file_references_for_path(self, path: str, *, case_sensitive: bool = True) -> list[PBXFileReference]:
+        """Find the file references for a path on disk.
+
+        :param path: The path of the file. Relative paths are relative to the current directory.
+        :param case_sensitive: Set to False to match paths regardless of case, as APFS does
+
+        :returns: The file references, of which there is usually at most one
+        """
+
+        return [
+            cast(PBXFileReference, self.objects[object_key])
+            for object_key in self.path_index().keys_for_path(os.path.abspath(path), case_sensitive=case_sensitive)
+        ]
+
+    def file_references_under(self, directory: str, *, case_sensitive: bool = True) -> list[PBXFileReference]:
+        """Find the file references anywhere below a directory on disk.
+
+        :param directory: The path of the directory. Relative paths are relative to the current directory.
+        :param case_sensitive: Set to False to match paths regardless of case, as APFS does
+
+        :returns: The file references, ordered by path
+        """
+
+        return [
+            cast(PBXFileReference, self.objects[object_key])
+            for object_key in self.path_index().keys_under(os.path.abspath(directory), case_sensitive=case_sensitive)
+        ]
+
     def fetch_type(self, object_type: type[PBXObjectType]) -> dict[str, PBXObjectType]:
         """Load the items specified from the cache, populating the cache if required.
 
@@ -292,6 +845,19 @@ class XcodeProject:
         """
         return list(self.fetch_type(PBXNativeTarget).values())
 
+    def target_index(self) -> TargetIndex:
+        """Get the index of targets by name and build phase, building it on first use.
+
+        The index isn't updated by changes made after it is built.
+
+        :returns: The target index
+        """
+
+        if self._target_index is None:
+            self._target_index = TargetIndex(self.fetch_type(PBXTarget).values())
+
+        return self._target_index
+
     def target_by_name(self, name: str) -> PBXNativeTarget | None:
         """Get a target by name.
 
@@ -299,10 +865,33 @@ class XcodeProject:
 
         :returns: The target if found, else None
         """
-        for target in self.fetch_type(PBXNativeTarget).values():
-            if target.name == name:
-                return target
-        return None
+        return self.target_index().target_named(name, PBXNativeTarget)
+
+    def targets_by_name(self, names: Iterable[str]) -> dict[str, PBXNativeTarget | None]:
+        """Get many targets by name.
+
+        :param names: The names of the targets to find
+
+        :returns: The target for each name, or None if there isn't one
+        """
+        index = self.target_index()
+        return {name: index.target_named(name, PBXNativeTarget) for name in names}
+
+    def targets_named(self, name: str) -> list[PBXTarget]:
+        """Get all the targets with a name, including aggregate targets.
+
+        :param name: The name of the targets to find
+
+        :returns: The targets, in project order
+        """
+        return self.target_index().targets_named(name)
+
+    def duplicate_target_names(self) -> dict[str, list[PBXTarget]]:
+        """Find the target names which are used more than once.
+
+        :returns: The targets sharing each duplicated name, including aggregate targets
+        """
+        return self.target_index().duplicate_names()
 
     def target_containing_phase(self, source_build_phase_ref: str) -> PBXNativeTarget | None:
         """Find the target containing the Source Build Phase
@@ -310,11 +899,227 @@ class XcodeProject:
 
         :returns: The target containing the source build phase
         """
-        for native_target in self.fetch_type(PBXNativeTarget).values():
-            for build_phase in native_target.build_phases:
-                if build_phase.object_key == source_build_phase_ref:
-                    return native_target
-        return None
+        return self.target_index().target_containing_phase(source_build_phase_ref, PBXNativeTarget)
+
+    def targets_containing_phases(self, build_phase_refs: Iterable[str]) -> dict[str, PBXNativeTarget | None]:
+        """Find the targets containing many build phases.
+
+        :param build_phase_refs: The references of the build phases
+
+        :returns: The target containing each build phase, or None if there isn't one
+        """
+        index = self.target_index()
+        return {
+            build_phase_ref: index.target_containing_phase(build_phase_ref, PBXNativeTarget)
+            for build_phase_ref in build_phase_refs
+        }
+
+    def _target_dependency_keys(self) -> Iterator[tuple[str, list[str]]]:
+        """Get the keys of the targets in this project each target depends on.
+
+        Dependencies on targets in other projects are left out.
+
+        :returns: An iterator of the key of each target and the keys of its dependencies
+        """
+
+        objects = self.objects
+        root_key = self.project.object_key
+
+        for target in self.fetch_type(PBXTarget).values():
+            dependency_keys: list[str] = []
+
+            for dependency_id in target.dependency_ids:
+                dependency = objects.get(dependency_id)
+
+                if not isinstance(dependency, PBXTargetDependency):
+                    continue
+
+                if dependency.target is not None:
+                    dependency_keys.append(dependency.target)
+                    continue
+
+                # Without a target, the proxy says where the dependency is
+                proxy = objects.get(dependency.target_proxy)
+
+                if isinstance(proxy, PBXContainerItemProxy) and proxy.container_portal == root_key:
+                    dependency_keys.append(proxy.remote_global_id_string)
+
+            yield target.object_key, dependency_keys
+
+    def target_graph(self) -> TargetGraph:
+        """Get the graph of dependencies between targets, building it on first use.
+
+        The graph isn't updated by changes made after it is built.
+
+        :returns: The target graph
+        """
+
+        if self._target_graph is None:
+            self._target_graph = TargetGraph(self._target_dependency_keys())
+
+        return self._target_graph
+
+    def target_dependencies(self, target: PBXTarget, *, transitive: bool = False) -> list[PBXTarget]:
+        """Get the targets in this project which a target depends on.
+
+        :param target: The target
+        :param transitive: Set to True to include indirect dependencies
+
+        :returns: The dependencies
+        """
+
+        graph = self.target_graph()
+        keys = graph.transitive_dependencies(target.object_key) if transitive else graph.dependencies(target.object_key)
+        return [cast(PBXTarget, self.objects[key]) for key in keys]
+
+    def target_dependents(self, target: PBXTarget, *, transitive: bool = False) -> list[PBXTarget]:
+        """Get the targets in this project which depend on a target.
+
+        :param target: The target
+        :param transitive: Set to True to include indirect dependents
+
+        :returns: The dependents
+        """
+
+        graph = self.target_graph()
+        keys = graph.transitive_dependents(target.object_key) if transitive else graph.dependents(target.object_key)
+        return [cast(PBXTarget, self.objects[key]) for key in keys]
+
+    def project_graph(self) -> ProjectGraph:
+        """Get the graph of this project and the projects it refers to, creating it on first use.
+
+        Referenced projects are loaded with `XcodeProject.from_cache` as they
+        are needed, so each is only loaded once.
+
+        :returns: The project graph
+        """
+
+        if self._project_graph is None:
+            self._project_graph = ProjectGraph(self)
+
+        return self._project_graph
+
+    def membership_index(self) -> MembershipIndex:
+        """Get the index of the build phases and targets each file is in, building it on first use.
+
+        The index isn't updated by changes made after it is built.
+
+        :returns: The membership index
+        """
+
+        if self._membership_index is None:
+            self._membership_index = MembershipIndex(
+                self.fetch_type(PBXTarget).values(),
+                self.fetch_type(PBXBuildPhase).values(),
+                self.fetch_type(PBXBuildFile).values(),
+            )
+
+        return self._membership_index
+
+    def build_phases_containing_file(self, file_ref_key: str) -> list[PBXBuildPhase]:
+        """Find the build phases which contain a file.
+
+        :param file_ref_key: The key of the file reference
+
+        :returns: The build phases
+        """
+        return [
+            cast(PBXBuildPhase, self.objects[phase_key])
+            for phase_key in self.membership_index().build_phase_keys(file_ref_key)
+        ]
+
+    def targets_containing_file(self, file_ref_key: str) -> list[PBXTarget]:
+        """Find the targets which contain a file in any of their build phases.
+
+        :param file_ref_key: The key of the file reference
+
+        :returns: The targets
+        """
+        return [
+            cast(PBXTarget, self.objects[target_key])
+            for target_key in self.membership_index().target_keys(file_ref_key)
+        ]
+
+    def targets_containing_files(self, file_ref_keys: Iterable[str]) -> dict[str, list[PBXTarget]]:
+        """Find the targets which contain each of many files.
+
+        :param file_ref_keys: The keys of the file references
+
+        :returns: The targets containing each file
+        """
+        return {file_ref_key: self.targets_containing_file(file_ref_key) for file_ref_key in file_ref_keys}
+
+    def target_files_by_phase_type(self, target: PBXTarget) -> dict[type[PBXBuildPhase], list[PBXPathObject]]:
+        """Get the files built in a target, grouped by the type of build phase.
+
+        :param target: The target to get the files for
+
+        :returns: The files in each type of build phase
+        """
+        file_ref_keys_by_phase_type = self.membership_index().file_ref_keys_by_phase_type(target.object_key)
+
+        return {
+            phase_type: [cast(PBXPathObject, self.objects[file_ref_key]) for file_ref_key in file_ref_keys]
+            for phase_type, file_ref_keys in file_ref_keys_by_phase_type.items()
+        }
+
+    def synchronized_membership(self, *, max_workers: int | None = None) -> SynchronizedMembership:
+        """Find the files in synchronized folders and the targets which build them.
+
+        The folders are scanned every time this is called, but directories
+        which haven't changed since the last call aren't listed again.
+
+        :param max_workers: The maximum number of directories to list at the same time
+
+        :returns: The membership of the synchronized files
+        """
+
+        groups = self.fetch_type(PBXFileSystemSynchronizedRootGroup)
+        paths = self.absolute_paths()
+        roots = {
+            group_key: os.path.normpath(paths[group_key])
+            for group_key in groups
+            if group_key in paths and not paths[group_key].startswith("$(")
+        }
+
+        scanned = scan_folders(
+            [(root, groups[group_key].explicit_folders) for group_key, root in roots.items()],
+            listing_cache=self._directory_listing_cache,
+            max_workers=max_workers,
+        )
+
+        group_targets: dict[str, list[str]] = {}
+
+        for target_key, target in self.fetch_type(PBXTarget).items():
+            for group_key in target.file_system_synchronized_group_ids or []:
+                group_targets.setdefault(group_key, []).append(target_key)
+
+        exceptions: dict[str, dict[str, list[str]]] = {}
+
+        for group_key in roots:
+            for exception_id in groups[group_key].exception_ids:
+                exception_set = self.objects.get(exception_id)
+
+                if isinstance(exception_set, PBXFileSystemSynchronizedBuildFileExceptionSet):
+                    exceptions.setdefault(group_key, {}).setdefault(exception_set.target, []).extend(
+                        exception_set.membership_exceptions
+                    )
+
+        return SynchronizedMembership(
+            dict(zip(roots, zip(roots.values(), scanned, strict=True), strict=True)),
+            group_targets,
+            exceptions,
+            {group_key: groups[group_key].explicit_file_types for group_key in roots},
+        )
+
+    def synchronized_files(self, target: PBXTarget) -> list[str]:
+        """Get the files a target builds from synchronized folders.
+
+        :param target: The target to get the files for
+
+        :returns: The absolute paths of the files
+        """
+        return self.synchronized_membership().files_for_target(target.object_key)
 
     def build_configuration_list_for_target(self, native_target_name: str) -> XCConfigurationList | None:
         """Searches for build configuration via a target's name
@@ -324,36 +1129,267 @@ class XcodeProject:
         :returns: The build configuration
         """
 
-        for native_target in self.fetch_type(PBXNativeTarget).values():
-            if native_target_name != native_target.name:
-                continue
+        native_target = self.target_by_name(native_target_name)
 
-            return native_target.build_configuration_list
+        if native_target is None:
+            return None
+
+        return native_target.build_configuration_list
+
+    def build_settings_resolver(self) -> BuildSettingsResolver:
+        """Get the resolver for the project's build settings, creating it on first use.
+
+        :returns: The resolver
+        """
+
+        if self._build_settings_resolver is None:
+            self._build_settings_resolver = BuildSettingsResolver(self.project)
+
+        return self._build_settings_resolver
+
+    def resolved_build_settings(self, target: PBXTarget | None, configuration_name: str) -> Mapping[str, Any]:
+        """Get the build settings for a configuration, including those from the project and xcconfig files.
+
+        Values aren't expanded, so any `$(inherited)` is left as it is.
+
+        :param target: The target, or None for the project's own settings
+        :param configuration_name: The name of the configuration, such as "Debug"
+
+        :raises XCConfigError: If an xcconfig file can't be read
+
+        :returns: The settings
+        """
 
-        return None
+        return self.build_settings_resolver().resolved_settings(target, configuration_name)
+
+    def expanded_build_settings(self, target: PBXTarget | None, configuration_name: str) -> Mapping[str, str]:
+        """Get the build settings for a configuration with every reference expanded.
+
+        :param target: The target, or None for the project's own settings
+        :param configuration_name: The name of the configuration, such as "Debug"
+
+        :raises XCConfigError: If an xcconfig file can't be read
+        :raises MacroCycleError: If a setting refers to itself
+
+        :returns: The settings
+        """
+
+        return self.build_settings_resolver().expanded_settings(target, configuration_name)
+
+    def scheme_files(self) -> list[SchemeFile]:
+        """Find the schemes in the project without parsing them, on first use.
+
+        The list isn't updated by schemes added or removed after it is built.
+
+        :returns: The shared schemes, then the schemes of each user
+        """
+
+        if self._scheme_files is None:
+            self._scheme_files = find_scheme_files(self.path)
+
+        return self._scheme_files
+
+    def scheme_paths(self) -> dict[str, list[str]]:
+        """Get the paths of the schemes with each name, without parsing them.
+
+        :returns: The paths of the schemes with each name, with any shared scheme first
+        """
+
+        paths: dict[str, list[str]] = {}
+
+        for scheme_file in self.scheme_files():
+            paths.setdefault(scheme_file.name, []).append(scheme_file.path)
+
+        return paths
+
+    def scheme_by_name(self, name: str, *, user: str | None = None) -> Scheme | None:
+        """Get a scheme by name, parsing only that scheme.
+
+        A shared scheme and a user's scheme can have the same name. The shared
+        one is returned unless a user is given, in which case that user's
+        scheme is preferred.
+
+        :param name: The name of the scheme
+        :param user: The user whose scheme should be preferred
+
+        :returns: The scheme if found, else None
+        """
+
+        matches = [scheme_file for scheme_file in self.scheme_files() if scheme_file.name == name]
+
+        if not matches:
+            return None
+
+        preferred = next((scheme_file for scheme_file in matches if scheme_file.user == user), matches[0])
+        return self._parse_scheme(preferred)
+
+    def _parse_scheme(self, scheme_file: SchemeFile) -> Scheme:
+        """Parse a scheme, unless it has been already.
+
+        :param scheme_file: The scheme to parse
+
+        :returns: The parsed scheme
+        """
+
+        scheme = self._parsed_schemes.get(scheme_file.path)
+
+        if scheme is None:
+            scheme = Scheme.from_file(scheme_file.path)
+            self._parsed_schemes[scheme_file.path] = scheme
+
+        return scheme
 
     @property
     def schemes(self) -> list[Scheme]:
         """Load the schemes for the project.
 
-        :returns: A list of schemes
+        Every scheme is parsed. Use `scheme_by_name` to only parse the one
+        you need.
+
+        :returns: A list of schemes, with the shared schemes first
         """
         if self._schemes is not None:
             return self._schemes
 
-        scheme_paths: list[str] = []
+        self._schemes = [self._parse_scheme(scheme_file) for scheme_file in self.scheme_files()]
 
-        for path, _, files in os.walk(self.path):
-            for file_path in files:
-                if not file_path.endswith(".xcscheme"):
-                    continue
-                scheme_paths.append(os.path.join(path, file_path))
+        return self._schemes
+
+    def load_schemes(
+        self,
+        *,
+        max_workers: int | None = None,
+        use_processes: bool = False,
+        use_cache: bool = True,
+    ) -> list[Scheme]:
+        """Load every scheme in the project at once.
+
+        Schemes which haven't changed since they were last cached are read
+        from the cache, and the rest are parsed in parallel and cached. Only
+        the file's modification time and size are compared, so this is much
+        quicker than parsing when most schemes are unchanged.
+
+        :param max_workers: The maximum number of schemes to parse at the same time
+        :param use_processes: Set to True to parse on a process pool rather than a thread pool
+        :param use_cache: Set to False to parse every scheme without using the cache
+
+        :returns: A list of schemes, with the shared schemes first
+        """
+
+        scheme_files = self.scheme_files()
+        scheme_cache = cache.SchemeCache(self.path) if use_cache else None
+        pending: list[tuple[str, tuple[int, int] | None]] = []
+
+        for scheme_file in scheme_files:
+            if scheme_file.path in self._parsed_schemes:
+                continue
+
+            state = cache.SchemeCache.file_state(scheme_file.path)
+            cached = scheme_cache.get(scheme_file.path, state) if scheme_cache is not None and state else None
+
+            if cached is not None:
+                self._parsed_schemes[scheme_file.path] = cached
+            else:
+                pending.append((scheme_file.path, state))
+
+        parsed = parse_scheme_files(
+            [path for path, _ in pending],
+            max_workers=max_workers,
+            use_processes=use_processes,
+        )
 
-        all_schemes: list[Scheme] = []
+        for (path, state), scheme in zip(pending, parsed, strict=True):
+            self._parsed_schemes[path] = scheme
+
+            if scheme_cache is not None and state is not None:
+                scheme_cache.put(path, state, scheme)
+
+        if scheme_cache is not None:
+            # The cache is only an optimization, so failing to write it isn't an error
+            with contextlib.suppress(OSError):
+                scheme_cache.save()
+
+        self._schemes = [self._parsed_schemes[scheme_file.path] for scheme_file in scheme_files]
+
+        return self._schemes
+
+    def scheme_target_index(
+        self,
+        *,
+        max_workers: int | None = None,
+        use_processes: bool = False,
+        use_cache: bool = True,
+    ) -> SchemeTargetIndex:
+        """Get the index linking the schemes to the targets they use, building it on first use.
+
+        The schemes are loaded with `load_schemes`, so they come from the
+        scheme cache where they can. The index isn't updated by schemes added,
+        removed or changed after it is built.
+
+        :param max_workers: The maximum number of schemes to parse at the same time
+        :param use_processes: Set to True to parse on a process pool rather than a thread pool
+        :param use_cache: Set to False to parse every scheme without using the cache
+
+        :returns: The index
+        """
+
+        if self._scheme_target_index is None:
+            schemes = self.load_schemes(max_workers=max_workers, use_processes=use_processes, use_cache=use_cache)
+            self._scheme_target_index = SchemeTargetIndex(
+                self.path, list(zip(self.scheme_files(), schemes, strict=True))
+            )
+
+        return self._scheme_target_index
+
+    def schemes_for_target(self, target: PBXTarget, *, action: str | None = None) -> list[Scheme]:
+        """Get the schemes which use a target in this project.
+
+        :param target: The target
+        :param action: The action to limit the results to, one of `SCHEME_ACTIONS`,
+            or None for any action
+
+        :returns: The schemes, with the shared schemes first
+        """
+
+        scheme_files = self.scheme_target_index().schemes_for_target(target.object_key, action=action)
+        return [self._parse_scheme(scheme_file) for scheme_file in scheme_files]
+
+    def targets_for_scheme(
+        self,
+        name: str,
+        *,
+        action: str | None = None,
+        user: str | None = None,
+    ) -> list[PBXTarget]:
+        """Get the targets in this project which a scheme uses.
+
+        Targets in other projects are left out. Use
+        `scheme_target_index().targets_for_scheme` to get those too.
+
+        :param name: The name of the scheme
+        :param action: The action to limit the results to, one of `SCHEME_ACTIONS`,
+            or None for any action
+        :param user: The user whose scheme should be preferred, as for `scheme_by_name`
+
+        :returns: The targets, in the order the scheme lists them
+        """
+
+        matches = [scheme_file for scheme_file in self.scheme_files() if scheme_file.name == name]
+
+        if not matches:
+            return []
+
+        preferred = next((scheme_file for scheme_file in matches if scheme_file.user == user), matches[0])
+        index = self.scheme_target_index()
+        targets: list[PBXTarget] = []
+
+        for project_path, target_key in index.targets_for_scheme(preferred.path, action=action):
+            if project_path != index.project_path:
+                continue
 
-        for scheme_path in scheme_paths:
-            all_schemes.append(Scheme.from_file(scheme_path))
+            target = self.objects.get(target_key)
 
-        self._schemes = all_schemes
+            if isinstance(target, PBXTarget):
+                targets.append(target)
 
-        return all_schemes
+        return targets
@@ -20,6 +20,10 @@ class PBXBuildPhase(PBXObject):
     build_action_mask: str
     run_only_for_deployment_post_processing: bool
 
+    def referenced_keys(self) -> list[str]:
+        """Get the keys in `file_ids`."""
+        return list(self.file_ids)
+
     @property
     def files(self) -> list[PBXBuildFile]:
         """Get the files in the build phase."""
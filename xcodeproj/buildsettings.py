@@ -0,0 +1,440 @@
+"""Resolution of build settings.
+
+Xcode layers the settings for a target's configuration, from lowest to
+highest precedence:
+
+1. The base xcconfig of the project's configuration with the same name
+2. The project's configuration
+3. The base xcconfig of the target's configuration
+4. The target's configuration
+
+Each xcconfig file is parsed once, along with anything it includes, and the
+result is shared by every configuration based on it. The settings of each
+configuration can then be expanded with a `MacroExpander`.
+"""
+
+import os
+import re
+from collections.abc import Mapping
+from types import MappingProxyType
+from typing import Any, cast
+
+from .macros import MacroExpander
+from .pathobjects import PBXFileReference
+from .pbxproject import PBXProject
+from .targets import PBXTarget
+from .xcobjects import XCBuildConfiguration, XCConfigurationList
+
+# Matches an include directive. Optional includes don't fail if the file is missing.
+_INCLUDE_PATTERN = re.compile(r'#include(\??)\s*"([^"]*)"')
+
+# Matches a setting, which may have conditions such as `[sdk=iphoneos*]`
+_SETTING_PATTERN = re.compile(r"([A-Za-z_][A-Za-z0-9_]*(?:\[[^\]]*\])*)\s*=(.*)")
+
+# Matches a reference to the inherited value of a setting
+_INHERITED_PATTERN = re.compile(r"\$(?:\(inherited\)|\{inherited\})")
+
+
+class XCConfigError(Exception):
+    """Raised when an xcconfig file can't be read.
+
+    :param message: A description of the problem
+    :param path: The path of the file
+    """
+
+    def __init__(self, message: str, path: str) -> None:
+        super().__init__(f"{message}: {path}")
+        self.path = path
+
+
+class XCConfigCache:
+    """Parses xcconfig files, remembering the results.
+
+    A file is parsed again if its modification time or size changes, or that
+    of any file it includes. A cache can be shared between projects which use
+    the same files.
+    """
+
+    _entries: dict[str, tuple[tuple[tuple[str, tuple[int, int] | None], ...], Mapping[str, str]]]
+
+    def __init__(self) -> None:
+        self._entries = {}
+
+    def settings(self, path: str) -> Mapping[str, str]:
+        """Get the settings from an xcconfig file, including the files it includes.
+
+        :param path: The path of the file
+
+        :raises XCConfigError: If the file, or a file it requires, can't be read
+
+        :returns: The settings, with later assignments replacing earlier ones.
+            Where a later assignment uses `$(inherited)`, the earlier value is
+            substituted in, and any `$(inherited)` left refers to the layer below.
+        """
+
+        return self._load(os.path.abspath(path), [])[1]
+
+    def clear(self) -> None:
+        """Forget every parsed file."""
+
+        self._entries.clear()
+
+    def _load(
+        self, path: str, including: list[str]
+    ) -> tuple[tuple[tuple[str, tuple[int, int] | None], ...], Mapping[str, str]]:
+        """Load an xcconfig file.
+
+        :param path: The absolute path of the file
+        :param including: The files which are including this one, outermost first
+
+        :raises XCConfigError: If the file can't be read or includes itself
+
+        :returns: The state of every file the settings were read from, and the settings
+        """
+
+        if path in including:
+            raise XCConfigError("xcconfig file includes itself", path)
+
+        entry = self._entries.get(path)
+
+        if entry is not None and all(_file_state(dependency) == state for dependency, state in entry[0]):
+            return entry
+
+        state = _file_state(path)
+
+        try:
+            with open(path, encoding="utf-8-sig") as xcconfig_file:
+                contents = xcconfig_file.read()
+        except (OSError, UnicodeDecodeError) as ex:
+            raise XCConfigError("Unable to read xcconfig file", path) from ex
+
+        dependencies: dict[str, tuple[int, int] | None] = {path: state}
+        settings: dict[str, str] = {}
+        folder = os.path.dirname(path)
+
+        for raw_line in contents.splitlines():
+            line = raw_line.strip()
+
+            include = _INCLUDE_PATTERN.match(line)
+
+            if include is not None:
+                included_path = os.path.normpath(os.path.join(folder, include.group(2)))
+
+                if include.group(1) and not os.path.exists(included_path):
+                    # Remember the missing file, so that creating it is noticed
+                    dependencies[included_path] = None
+                    continue
+
+                included_dependencies, included_settings = self._load(included_path, [*including, path])
+                dependencies.update(included_dependencies)
+                settings.update(included_settings)
+                continue
+
+            # Everything after `//` is a comment, even inside a value
+            comment = line.find("//")
+            setting = _SETTING_PATTERN.match(line if comment == -1 else line[:comment])
+
+            if setting is None:
+                continue
+
+            name = setting.group(1)
+            value = setting.group(2).strip().removesuffix(";").rstrip()
+            previous = settings.get(name)
+
+            # Within a file, `$(inherited)` is whatever an earlier line or included file set
+            if previous is not None:
+                value = _INHERITED_PATTERN.sub(previous.replace("\\", "\\\\"), value)
+
+            settings[name] = value
+
+        entry = (tuple(dependencies.items()), MappingProxyType(settings))
+        self._entries[path] = entry
+        return entry
+
+
+def _file_state(path: str) -> tuple[int, int] | None:
+    """Get the modification time and size of a file.
+
+    :param path: The path of the file
+
+    :returns: The modification time in nanoseconds and the size, or None if the file doesn't exist
+    """
+
+    try:
+        stat_result = os.stat(path)
+    except OSError:
+        return None
+
+    return stat_result.st_mtime_ns, stat_result.st_size
+
+
+class BuildSettingsResolver:
+    """Works out the layered build settings of a project's configurations.
+
+    The layers for each configuration are worked out once and shared, as
+    are the expanded settings. They are worked out again when a base
+    xcconfig file, or a file it includes, changes on disk. Call `clear`
+    after changing the project itself.
+
+    :param project: The project object
+    :param xcconfig_cache: The cache to parse xcconfig files with, if it should be shared
+    :param defaults: Values for settings which only exist during a build, such as
+        `BUILT_PRODUCTS_DIR`. These take precedence over the ones worked out from the project.
+    """
+
+    _project: PBXProject
+    _xcconfig_cache: XCConfigCache
+    _defaults: Mapping[str, str]
+    _layers: dict[
+        tuple[str | None, str],
+        tuple[tuple[tuple[str, Mapping[str, str]], ...], tuple[Mapping[str, Any], ...]],
+    ]
+    _resolved: dict[tuple[str | None, str], Mapping[str, Any]]
+    _expanders: dict[tuple[str | None, str], MacroExpander]
+    _expanded: dict[tuple[str | None, str], Mapping[str, str]]
+
+    def __init__(
+        self,
+        project: PBXProject,
+        *,
+        xcconfig_cache: XCConfigCache | None = None,
+        defaults: Mapping[str, str] | None = None,
+    ) -> None:
+        self._project = project
+        self._xcconfig_cache = xcconfig_cache if xcconfig_cache is not None else XCConfigCache()
+        self._defaults = defaults if defaults is not None else {}
+        self._layers = {}
+        self._resolved = {}
+        self._expanders = {}
+        self._expanded = {}
+
+    @property
+    def xcconfig_cache(self) -> XCConfigCache:
+        """Get the cache xcconfig files are parsed with."""
+        return self._xcconfig_cache
+
+    def clear(self) -> None:
+        """Forget every resolved configuration and parsed file, for when the project changes."""
+
+        self._layers.clear()
+        self._resolved.clear()
+        self._expanders.clear()
+        self._expanded.clear()
+        self._xcconfig_cache.clear()
+
+    def layers(self, target: PBXTarget | None, configuration_name: str) -> tuple[Mapping[str, Any], ...]:
+        """Get the layers of settings for a configuration.
+
+        :param target: The target, or None for the project's own settings
+        :param configuration_name: The name of the configuration, such as "Debug"
+
+        :raises XCConfigError: If a base xcconfig file can't be read
+
+        :returns: The layers of settings, from lowest precedence to highest
+        """
+
+        cache_key = (None if target is None else target.object_key, configuration_name)
+        entry = self._layers.get(cache_key)
+
+        if entry is not None:
+            # The xcconfig cache returns the same settings for a file until it, or a file it includes, changes
+            if all(self._xcconfig_cache.settings(path) is settings for path, settings in entry[0]):
+                return entry[1]
+
+            self._resolved.pop(cache_key, None)
+            self._expanders.pop(cache_key, None)
+            self._expanded.pop(cache_key, None)
+
+        configuration_lists = [self._project.build_configuration_list]
+
+        if target is not None:
+            configuration_lists.append(target.build_configuration_list)
+
+        built: list[Mapping[str, Any]] = []
+        sources: list[tuple[str, Mapping[str, str]]] = []
+
+        for configuration_list in configuration_lists:
+            configuration = _configuration_named(configuration_list, configuration_name)
+
+            if configuration is None:
+                continue
+
+            base_path = self._base_xcconfig_path(configuration)
+
+            if base_path is not None:
+                xcconfig_settings = self._xcconfig_cache.settings(base_path)
+                sources.append((base_path, xcconfig_settings))
+                built.append(xcconfig_settings)
+
+            built.append(MappingProxyType(configuration.build_settings))
+
+        layers = tuple(built)
+        self._layers[cache_key] = (tuple(sources), layers)
+        return layers
+
+    def resolved_settings(self, target: PBXTarget | None, configuration_name: str) -> Mapping[str, Any]:
+        """Get the effective settings for a configuration.
+
+        :param target: The target, or None for the project's own settings
+        :param configuration_name: The name of the configuration, such as "Debug"
+
+        :raises XCConfigError: If a base xcconfig file can't be read
+
+        Values aren't expanded, so any `$(inherited)` is left as it is.
+
+        :returns: The settings, with each taken from the highest layer which sets it
+        """
+
+        layers = self.layers(target, configuration_name)
+        cache_key = (None if target is None else target.object_key, configuration_name)
+        resolved = self._resolved.get(cache_key)
+
+        if resolved is not None:
+            return resolved
+
+        settings: dict[str, Any] = {}
+
+        for layer in layers:
+            settings.update(layer)
+
+        resolved = MappingProxyType(settings)
+        self._resolved[cache_key] = resolved
+        return resolved
+
+    def expander(self, target: PBXTarget | None, configuration_name: str) -> MacroExpander:
+        """Get the expander for the settings of a configuration.
+
+        This can expand other values in the context of the configuration,
+        such as paths relative to `$(BUILT_PRODUCTS_DIR)`.
+
+        :param target: The target, or None for the project's own settings
+        :param configuration_name: The name of the configuration, such as "Debug"
+
+        :raises XCConfigError: If a base xcconfig file can't be read
+
+        :returns: The expander
+        """
+
+        layers = self.layers(target, configuration_name)
+        cache_key = (None if target is None else target.object_key, configuration_name)
+        expander = self._expanders.get(cache_key)
+
+        if expander is None:
+            expander = MacroExpander(
+                layers,
+                defaults={**self._implicit_settings(target, configuration_name), **self._defaults},
+            )
+            self._expanders[cache_key] = expander
+
+        return expander
+
+    def expanded_settings(self, target: PBXTarget | None, configuration_name: str) -> Mapping[str, str]:
+        """Get the effective settings for a configuration, with every reference expanded.
+
+        :param target: The target, or None for the project's own settings
+        :param configuration_name: The name of the configuration, such as "Debug"
+
+        :raises XCConfigError: If a base xcconfig file can't be read
+        :raises MacroCycleError: If a setting refers to itself
+
+        :returns: The expanded settings. List values are joined with spaces.
+        """
+
+        # Checks that the base xcconfig files haven't changed since the settings were expanded
+        self.layers(target, configuration_name)
+
+        cache_key = (None if target is None else target.object_key, configuration_name)
+        expanded = self._expanded.get(cache_key)
+
+        if expanded is None:
+            expanded = MappingProxyType(self.expander(target, configuration_name).expand_all())
+            self._expanded[cache_key] = expanded
+
+        return expanded
+
+    def expand_all(self) -> dict[tuple[str | None, str], Mapping[str, str]]:
+        """Expand the settings of every configuration of the project and its targets.
+
+        :raises XCConfigError: If a base xcconfig file can't be read
+        :raises MacroCycleError: If a setting refers to itself
+
+        :returns: The expanded settings, keyed by target key (None for the
+            project) and configuration name
+        """
+
+        scopes: list[PBXTarget | None] = [None, *self._project.targets]
+        expanded: dict[tuple[str | None, str], Mapping[str, str]] = {}
+
+        for target in scopes:
+            configuration_list = (
+                self._project.build_configuration_list if target is None else target.build_configuration_list
+            )
+
+            for configuration in configuration_list.build_configurations:
+                expanded[(None if target is None else target.object_key, configuration.name)] = self.expanded_settings(
+                    target, configuration.name
+                )
+
+        return expanded
+
+    def _implicit_settings(self, target: PBXTarget | None, configuration_name: str) -> dict[str, str]:
+        """Get the settings Xcode defines for every configuration.
+
+        :param target: The target, or None for the project's own settings
+        :param configuration_name: The name of the configuration
+
+        :returns: The settings
+        """
+
+        project_path = os.path.abspath(self._project.project().path)
+        project_folder = os.path.dirname(project_path)
+
+        settings = {
+            "CONFIGURATION": configuration_name,
+            "PROJECT_DIR": project_folder,
+            "PROJECT_FILE_PATH": project_path,
+            "PROJECT_NAME": os.path.splitext(os.path.basename(project_path))[0],
+            "SOURCE_ROOT": project_folder,
+            "SRCROOT": project_folder,
+        }
+
+        if target is not None:
+            settings["TARGET_NAME"] = target.name
+
+        return settings
+
+    def _base_xcconfig_path(self, configuration: XCBuildConfiguration) -> str | None:
+        """Get the path of the xcconfig file a configuration is based on.
+
+        :param configuration: The configuration
+
+        :returns: The path, or None if the configuration isn't based on a file on disk
+        """
+
+        if not configuration.base_configuration_reference_id:
+            return None
+
+        file_reference = cast(PBXFileReference, self._project.objects()[configuration.base_configuration_reference_id])
+        path = file_reference.absolute_path()
+
+        # Files relative to build variables can't be found without building
+        if path is None or path.startswith("$("):
+            return None
+
+        return path
+
+
+def _configuration_named(configuration_list: XCConfigurationList, name: str) -> XCBuildConfiguration | None:
+    """Find a configuration in a list by name.
+
+    :param configuration_list: The list to search
+    :param name: The name of the configuration
+
+    :returns: The configuration if found, None otherwise
+    """
+
+    for configuration in configuration_list.build_configurations:
+        if configuration.name == name:
+            return configuration
+
+    return None
@@ -0,0 +1,835 @@
+"""On-disk cache of loaded projects.
+
+Cache files start with a header recording the format version, the library
+version and a fingerprint of the classes in the payload, which are the object
+classes for projects and the scheme classes for schemes. Files written by any
+other version are rejected before their payload is read. The payload stores the
+objects grouped by class and attribute names, one column per attribute, so
+that loading is a loop over plain values rather than a pickle callback per
+object.
+"""
+
+import collections
+import contextlib
+import functools
+import gc
+import hashlib
+import importlib.metadata
+import itertools
+import json
+import os
+import pickle
+import shutil
+import tempfile
+import time
+import types
+import typing
+from collections.abc import Callable, Iterator, Mapping
+from typing import IO, Any, get_args
+
+import platformdirs
+
+from .pbxobject import PBXObject
+
+# The name of the index file in the cache folder
+INDEX_FILE_NAME = "index.json"
+
+# Bump this when the layout of the index changes
+_INDEX_VERSION = 1
+
+# The number of bytes to hash at a time
+_HASH_BLOCK_SIZE = 1 << 20
+
+# Identifies cache files
+_MAGIC = b"XCODEPROJ-CACHE\n"
+
+# Bump this when the layout of cache files changes
+_FORMAT_VERSION = 1
+
+# The extension of cached projects
+CACHE_FILE_EXTENSION = ".dat"
+
+# The folder within the cache folder which parsed schemes are kept in
+SCHEME_CACHE_FOLDER_NAME = "schemes"
+
+# The default limits on the size of the cache. These can be overridden with
+# the XCODEPROJ_CACHE_MAX_BYTES and XCODEPROJ_CACHE_MAX_ENTRIES environment
+# variables.
+DEFAULT_MAX_BYTES = 2 * 1024 * 1024 * 1024
+DEFAULT_MAX_ENTRIES = 64
+
+# Temporary files older than this were left behind by a writer that died
+_ABANDONED_TEMPORARY_FILE_AGE = 3600
+
+# Files modified this recently may be modified again within the resolution of
+# their timestamp, so their stat can't be trusted to detect the change
+_RACY_INTERVAL_NS = 2_000_000_000
+
+
+class StaleCacheError(Exception):
+    """Raised when a cache file was written by a different version of the library."""
+
+
+def cache_folder() -> str:
+    """Get the folder cached projects are stored in.
+
+    :returns: The path to the cache folder
+    """
+
+    return platformdirs.user_cache_dir("xcodeproj")
+
+
+def content_hash(path: str) -> str:
+    """Hash the contents of a file without reading it into memory in full.
+
+    :param path: The path to the file
+
+    :returns: The hex digest of the contents
+    """
+
+    digest = hashlib.blake2b(digest_size=16)
+
+    with open(path, "rb") as input_file:
+        while block := input_file.read(_HASH_BLOCK_SIZE):
+            digest.update(block)
+
+    return digest.hexdigest()
+
+
+def _stat_signature(stat: os.stat_result) -> list[int]:
+    """Get the parts of a stat result which identify a version of a file.
+
+    :param stat: The stat result
+
+    :returns: The size, modification time and inode
+    """
+
+    return [stat.st_size, stat.st_mtime_ns, stat.st_ino]
+
+
+@contextlib.contextmanager
+def _collection_paused() -> Iterator[None]:
+    """Pause garbage collection.
+
+    Loading a cache allocates a large number of containers, none of which are
+    garbage, so collecting while doing so is wasted work.
+
+    :returns: A context manager which pauses collection while it is active
+    """
+
+    was_enabled = gc.isenabled()
+    gc.disable()
+
+    try:
+        yield
+    finally:
+        if was_enabled:
+            gc.enable()
+
+
+def _write_atomically(path: str, write: Callable[[IO[bytes]], Any]) -> None:
+    """Write a file so that readers never see it partially written.
+
+    :param path: The path to write to
+    :param write: Writes the contents to the file it is passed
+    """
+
+    folder = os.path.dirname(path)
+    file_descriptor, temporary_path = tempfile.mkstemp(dir=folder, prefix=".", suffix=".tmp")
+
+    try:
+        with os.fdopen(file_descriptor, "wb") as output_file:
+            write(output_file)
+        os.replace(temporary_path, path)
+    except BaseException:
+        os.unlink(temporary_path)
+        raise
+
+
+class CacheIndex:
+    """Maps files to the hashes of their contents, validated with `os.stat`.
+
+    A file whose size, modification time and inode match the index is assumed
+    to be unchanged, so its contents only need to be hashed when it changes.
+
+    :param folder: The cache folder the index is stored in
+    """
+
+    folder: str
+    _entries: dict[str, dict[str, Any]]
+    _is_dirty: bool
+
+    def __init__(self, folder: str) -> None:
+        self.folder = folder
+        self._entries = self._load()
+        self._is_dirty = False
+
+    @property
+    def path(self) -> str:
+        """The path to the index file.
+
+        :returns: The path to the index file
+        """
+
+        return os.path.join(self.folder, INDEX_FILE_NAME)
+
+    def _load(self) -> dict[str, dict[str, Any]]:
+        """Load the entries from disk.
+
+        :returns: The entries, or an empty dictionary if the index is missing or unreadable
+        """
+
+        try:
+            with open(self.path, encoding="utf-8") as index_file:
+                contents = json.load(index_file)
+        except (OSError, ValueError):
+            return {}
+
+        if not isinstance(contents, dict) or contents.get("version") != _INDEX_VERSION:
+            return {}
+
+        entries = contents.get("entries")
+
+        if not isinstance(entries, dict):
+            return {}
+
+        return entries
+
+    def content_hash(self, path: str) -> str:
+        """Get the hash of the contents of a file.
+
+        :param path: The path to the file
+
+        :returns: The hex digest of the contents
+        """
+
+        resolved_path = os.path.realpath(path)
+
+        try:
+            signature = _stat_signature(os.stat(resolved_path))
+        except FileNotFoundError:
+            if self._entries.pop(resolved_path, None) is not None:
+                self._is_dirty = True
+            raise
+
+        entry = self._entries.get(resolved_path)
+
+        if entry is not None and entry.get("stat") == signature:
+            return str(entry["hash"])
+
+        digest = content_hash(resolved_path)
+
+        if time.time_ns() - signature[1] >= _RACY_INTERVAL_NS:
+            self._entries[resolved_path] = {"stat": signature, "hash": digest}
+            self._is_dirty = True
+        elif entry is not None:
+            del self._entries[resolved_path]
+            self._is_dirty = True
+
+        return digest
+
+    def remove_stale_entries(self) -> int:
+        """Remove the entries for files which no longer exist, or whose cache file has been evicted.
+
+        :returns: The number of entries removed
+        """
+
+        stale_paths = [
+            path
+            for path, entry in self._entries.items()
+            if not os.path.exists(os.path.join(self.folder, f"{entry.get('hash')}{CACHE_FILE_EXTENSION}"))
+            or not os.path.exists(path)
+        ]
+
+        for path in stale_paths:
+            del self._entries[path]
+
+        if stale_paths:
+            self._is_dirty = True
+
+        return len(stale_paths)
+
+    def save(self) -> None:
+        """Write the index to disk if it has changed."""
+
+        if not self._is_dirty:
+            return
+
+        os.makedirs(self.folder, exist_ok=True)
+
+        contents = json.dumps({"version": _INDEX_VERSION, "entries": self._entries}).encode("utf-8")
+        _write_atomically(self.path, lambda index_file: index_file.write(contents))
+
+        self._is_dirty = False
+
+
+def project_cache_path(project_path: str, folder: str | None = None) -> str:
+    """Get the path a project is cached at.
+
+    The path depends on the contents of the project's pbxproj, which is only
+    hashed if it has changed since it was last seen.
+
+    :param project_path: The path to the xcodeproj
+    :param folder: The cache folder to use. Defaults to `cache_folder()`.
+
+    :returns: The path to the cache file for the project
+    """
+
+    if folder is None:
+        folder = cache_folder()
+
+    index = CacheIndex(folder)
+
+    try:
+        project_hash = index.content_hash(os.path.join(project_path, "project.pbxproj"))
+    finally:
+        # The index is only an optimization, so failing to write it isn't an error
+        with contextlib.suppress(OSError):
+            index.save()
+
+    return os.path.join(folder, f"{project_hash}{CACHE_FILE_EXTENSION}")
+
+
+def scheme_cache_path(project_path: str, folder: str | None = None) -> str:
+    """Get the path the parsed schemes of a project are cached at.
+
+    Schemes can change without the pbxproj changing, so they are cached by
+    the path of the project rather than its contents.
+
+    :param project_path: The path to the xcodeproj
+    :param folder: The cache folder to use. Defaults to `cache_folder()`.
+
+    :returns: The path to the scheme cache file for the project
+    """
+
+    if folder is None:
+        folder = cache_folder()
+
+    path_hash = hashlib.blake2b(os.path.realpath(project_path).encode("utf-8"), digest_size=16).hexdigest()
+    return os.path.join(folder, SCHEME_CACHE_FOLDER_NAME, f"{path_hash}{CACHE_FILE_EXTENSION}")
+
+
+class SchemeCache:
+    """Parsed schemes, keyed by the path, modification time and size of their files.
+
+    A scheme is only parsed again once its file changes. The cache for a
+    project is kept in the cache folder, so that it lasts between runs.
+
+    :param project_path: The path to the xcodeproj the schemes are in
+    :param folder: The cache folder to use. Defaults to `cache_folder()`.
+    """
+
+    path: str
+    _entries: dict[str, tuple[int, int, Any]]
+    _is_dirty: bool
+
+    def __init__(self, project_path: str, folder: str | None = None) -> None:
+        self.path = scheme_cache_path(project_path, folder)
+        self._is_dirty = False
+
+        try:
+            entries = read_payload(self.path, schema=scheme_schema_fingerprint())
+        except Exception:
+            entries = {}
+        else:
+            mark_used(self.path)
+
+        self._entries = entries if isinstance(entries, dict) else {}
+
+    @staticmethod
+    def file_state(path: str) -> tuple[int, int] | None:
+        """Get the state of a scheme file which the cache is keyed on.
+
+        :param path: The path of the file
+
+        :returns: The modification time in nanoseconds and the size, or None if the file can't be read
+        """
+
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+
+        return stat.st_mtime_ns, stat.st_size
+
+    def get(self, path: str, state: tuple[int, int]) -> Any:
+        """Get the parsed scheme for a file, if it hasn't changed since it was cached.
+
+        :param path: The path of the file
+        :param state: The current state of the file, from `file_state`
+
+        :returns: The parsed scheme, or None if it isn't cached
+        """
+
+        entry = self._entries.get(path)
+
+        if entry is None or (entry[0], entry[1]) != state:
+            return None
+
+        return entry[2]
+
+    def put(self, path: str, state: tuple[int, int], scheme: Any) -> None:
+        """Cache a parsed scheme.
+
+        Files which were modified very recently aren't cached, as they could be
+        modified again without their state changing.
+
+        :param path: The path of the file
+        :param state: The state of the file before it was parsed, from `file_state`
+        :param scheme: The parsed scheme
+        """
+
+        if time.time_ns() - state[0] >= _RACY_INTERVAL_NS:
+            self._entries[path] = (state[0], state[1], scheme)
+        elif path in self._entries:
+            del self._entries[path]
+        else:
+            return
+
+        self._is_dirty = True
+
+    def save(self) -> None:
+        """Write the cache to disk if it has changed, leaving out schemes which no longer exist."""
+
+        if not self._is_dirty:
+            return
+
+        self._entries = {path: entry for path, entry in self._entries.items() if os.path.exists(path)}
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        write_payload(self.path, self._entries, schema=scheme_schema_fingerprint())
+        self._is_dirty = False
+
+
+class CacheEntry:
+    """A cached project.
+
+    :param path: The path to the cache file
+    :param size: The size of the cache file in bytes
+    :param last_used: When the entry was last written or read, in seconds since the epoch
+    """
+
+    path: str
+    size: int
+    last_used: float
+
+    def __init__(self, path: str, size: int, last_used: float) -> None:
+        self.path = path
+        self.size = size
+        self.last_used = last_used
+
+    def __repr__(self) -> str:
+        return f"CacheEntry(path={self.path!r}, size={self.size}, last_used={self.last_used})"
+
+
+def _limit_from_environment(name: str, default: int) -> int:
+    """Get a cache limit, allowing it to be overridden by the environment.
+
+    :param name: The name of the environment variable
+    :param default: The limit to use if the variable isn't set
+
+    :raises ValueError: If the variable isn't a non-negative integer
+
+    :returns: The limit
+    """
+
+    value = os.environ.get(name)
+
+    if not value:
+        return default
+
+    limit = int(value)
+
+    if limit < 0:
+        raise ValueError(f"{name} must not be negative")
+
+    return limit
+
+
+def mark_used(path: str) -> None:
+    """Record that a cache file has been used, so that it is evicted last.
+
+    :param path: The path to the cache file
+    """
+
+    # Another process may have evicted it in the meantime
+    with contextlib.suppress(OSError):
+        os.utime(path)
+
+
+def cache_entries(folder: str | None = None) -> list[CacheEntry]:
+    """Get the cached projects and cached schemes.
+
+    :param folder: The cache folder to use. Defaults to `cache_folder()`.
+
+    :returns: The entries, most recently used first
+    """
+
+    if folder is None:
+        folder = cache_folder()
+
+    entries: list[CacheEntry] = []
+    directory_entries: list[os.DirEntry[str]] = []
+
+    for directory in (folder, os.path.join(folder, SCHEME_CACHE_FOLDER_NAME)):
+        with contextlib.suppress(FileNotFoundError, NotADirectoryError):
+            directory_entries.extend(os.scandir(directory))
+
+    for directory_entry in directory_entries:
+        if not directory_entry.name.endswith(CACHE_FILE_EXTENSION) or directory_entry.name.startswith("."):
+            continue
+
+        try:
+            stat = directory_entry.stat()
+        except FileNotFoundError:
+            continue
+
+        entries.append(CacheEntry(directory_entry.path, stat.st_size, stat.st_mtime))
+
+    entries.sort(key=lambda entry: entry.last_used, reverse=True)
+    return entries
+
+
+def cache_size(folder: str | None = None) -> int:
+    """Get the total size of the cached projects and schemes.
+
+    :param folder: The cache folder to use. Defaults to `cache_folder()`.
+
+    :returns: The size in bytes
+    """
+
+    return sum(entry.size for entry in cache_entries(folder))
+
+
+def _remove_abandoned_temporary_files(folder: str) -> None:
+    """Remove temporary files left behind by writers which didn't finish.
+
+    :param folder: The cache folder
+    """
+
+    cutoff = time.time() - _ABANDONED_TEMPORARY_FILE_AGE
+
+    with contextlib.suppress(OSError), os.scandir(folder) as directory_entries:
+        for directory_entry in directory_entries:
+            if not directory_entry.name.startswith(".") or not directory_entry.name.endswith(".tmp"):
+                continue
+
+            with contextlib.suppress(OSError):
+                if directory_entry.stat().st_mtime < cutoff:
+                    os.unlink(directory_entry.path)
+
+
+def prune_cache(
+    *,
+    max_bytes: int | None = None,
+    max_entries: int | None = None,
+    folder: str | None = None,
+) -> list[CacheEntry]:
+    """Evict the least recently used projects and schemes until the cache is within its limits.
+
+    Entries in the index for projects which are no longer cached are removed too.
+
+    :param max_bytes: The maximum total size of the cached projects and schemes. Defaults to
+        XCODEPROJ_CACHE_MAX_BYTES if set, otherwise `DEFAULT_MAX_BYTES`.
+    :param max_entries: The maximum number of cached projects and schemes. Defaults to
+        XCODEPROJ_CACHE_MAX_ENTRIES if set, otherwise `DEFAULT_MAX_ENTRIES`.
+    :param folder: The cache folder to use. Defaults to `cache_folder()`.
+
+    :returns: The entries which were evicted
+    """
+
+    if folder is None:
+        folder = cache_folder()
+
+    if max_bytes is None:
+        max_bytes = _limit_from_environment("XCODEPROJ_CACHE_MAX_BYTES", DEFAULT_MAX_BYTES)
+
+    if max_entries is None:
+        max_entries = _limit_from_environment("XCODEPROJ_CACHE_MAX_ENTRIES", DEFAULT_MAX_ENTRIES)
+
+    _remove_abandoned_temporary_files(folder)
+    _remove_abandoned_temporary_files(os.path.join(folder, SCHEME_CACHE_FOLDER_NAME))
+
+    entries = cache_entries(folder)
+    total_size = sum(entry.size for entry in entries)
+    evicted: list[CacheEntry] = []
+
+    # Entries are most recently used first, so evict from the end
+    while entries and (len(entries) > max_entries or total_size > max_bytes):
+        entry = entries.pop()
+        total_size -= entry.size
+
+        try:
+            os.unlink(entry.path)
+        except OSError:
+            # Another process may have evicted it first, or on Windows it may
+            # be in use
+            continue
+
+        evicted.append(entry)
+
+    index = CacheIndex(folder)
+
+    with contextlib.suppress(OSError):
+        if index.remove_stale_entries():
+            index.save()
+
+    return evicted
+
+
+def clear_cache(folder: str | None = None) -> list[CacheEntry]:
+    """Remove every cached project and parsed scheme along with the index.
+
+    :param folder: The cache folder to use. Defaults to `cache_folder()`.
+
+    :returns: The project entries which were removed
+    """
+
+    if folder is None:
+        folder = cache_folder()
+
+    with contextlib.suppress(FileNotFoundError):
+        os.unlink(os.path.join(folder, INDEX_FILE_NAME))
+
+    shutil.rmtree(os.path.join(folder, SCHEME_CACHE_FOLDER_NAME), ignore_errors=True)
+
+    return prune_cache(max_bytes=0, max_entries=0, folder=folder)
+
+
+def _library_version() -> str:
+    """Get the version of the library.
+
+    :returns: The version string
+    """
+
+    try:
+        return importlib.metadata.version("xcodeproj")
+    except importlib.metadata.PackageNotFoundError:  # pragma: no cover
+        return "0.0.0"
+
+
+def _schema_classes(class_reference: type[Any], found: dict[str, type[Any]]) -> None:
+    """Find a class and the classes used by its fields.
+
+    :param class_reference: The class to start from
+    :param found: The classes found so far, keyed by qualified name
+    """
+
+    name = f"{class_reference.__module__}.{class_reference.__qualname__}"
+
+    if name in found:
+        return
+
+    found[name] = class_reference
+
+    for field_type in typing.get_type_hints(class_reference).values():
+        pending = [field_type]
+
+        while pending:
+            current = pending.pop()
+            pending.extend(get_args(current))
+
+            if isinstance(current, type) and current.__module__.startswith(__package__ or "xcodeproj"):
+                _schema_classes(current, found)
+
+
+@functools.cache
+def schema_fingerprint() -> str:
+    """Get a fingerprint of the fields of all object classes.
+
+    Any change to the classes, their fields or the types of those fields
+    changes the fingerprint.
+
+    :returns: The hex digest of the schema
+    """
+
+    found: dict[str, type[Any]] = {}
+
+    for class_reference in PBXObject.__deserialize_downcast_map__.values():  # type: ignore[attr-defined]
+        _schema_classes(class_reference, found)
+
+    schema = []
+
+    for name, class_reference in sorted(found.items()):
+        hints = typing.get_type_hints(class_reference)
+        schema.append([name, sorted([field_name, repr(field_type)] for field_name, field_type in hints.items())])
+
+    isa_map = sorted(
+        [isa, f"{class_reference.__module__}.{class_reference.__qualname__}"]
+        for isa, class_reference in PBXObject.__deserialize_downcast_map__.items()  # type: ignore[attr-defined]
+    )
+
+    encoded = json.dumps([schema, isa_map], separators=(",", ":")).encode("utf-8")
+    return hashlib.blake2b(encoded, digest_size=16).hexdigest()
+
+
+def _code_fingerprint(code: types.CodeType) -> list[Any]:
+    """Get the parts of a function's code which decide the objects it builds.
+
+    The file name and line numbers are left out, so that the fingerprint
+    doesn't depend on where the library is installed.
+
+    :param code: The code of the function
+
+    :returns: The bytecode, names and constants, with nested code expanded
+    """
+
+    constants: list[Any] = []
+
+    for constant in code.co_consts:
+        if isinstance(constant, types.CodeType):
+            constants.append(_code_fingerprint(constant))
+        elif isinstance(constant, frozenset):
+            # Sets of constants are in hash order, which changes between runs
+            constants.append(sorted(repr(item) for item in constant))
+        else:
+            constants.append(repr(constant))
+
+    return [code.co_code.hex(), list(code.co_names), list(code.co_varnames), constants]
+
+
+@functools.cache
+def scheme_schema_fingerprint() -> str:
+    """Get a fingerprint of the scheme classes.
+
+    Scheme classes set their attributes as they parse rather than declaring
+    them, so the fingerprint covers the code of each class's methods. Any
+    change to how a scheme is built from its XML changes the fingerprint.
+
+    :returns: The hex digest of the schema
+    """
+
+    # The schemes module imports the workspace module, which imports this one
+    from . import schemes  # noqa: PLC0415
+
+    schema = []
+
+    for name, class_reference in sorted(vars(schemes).items()):
+        if not isinstance(class_reference, type) or class_reference.__module__ != schemes.__name__:
+            continue
+
+        methods = sorted(
+            [method_name, _code_fingerprint(method.__code__)]
+            for method_name, method in vars(class_reference).items()
+            if isinstance(method, types.FunctionType)
+        )
+        schema.append([name, [base.__qualname__ for base in class_reference.__mro__], methods])
+
+    encoded = json.dumps(schema, separators=(",", ":")).encode("utf-8")
+    return hashlib.blake2b(encoded, digest_size=16).hexdigest()
+
+
+def _header(schema: str | None = None) -> dict[str, Any]:
+    """Get the header for cache files written by this version of the library.
+
+    :param schema: The fingerprint of the classes in the payload. Defaults to `schema_fingerprint()`.
+
+    :returns: The header
+    """
+
+    return {
+        "format": _FORMAT_VERSION,
+        "version": _library_version(),
+        "schema": schema_fingerprint() if schema is None else schema,
+    }
+
+
+def pack_objects(objects: Mapping[str, Any], excluded_attributes: frozenset[str]) -> list[Any]:
+    """Pack objects into columns.
+
+    Objects are grouped by their class and attribute names. Each group is stored
+    as the class, the attribute names and a column of values for each
+    attribute.
+
+    :param objects: The objects to pack
+    :param excluded_attributes: Attributes which shouldn't be stored
+
+    :returns: The packed groups
+    """
+
+    groups: dict[tuple[type[Any], tuple[str, ...]], list[list[Any]]] = {}
+
+    for project_object in objects.values():
+        attributes = vars(project_object)
+        names = tuple(name for name in attributes if name not in excluded_attributes)
+        group = (type(project_object), names)
+        columns = groups.get(group)
+
+        if columns is None:
+            columns = [[] for _ in names]
+            groups[group] = columns
+
+        for column, name in zip(columns, names, strict=True):
+            column.append(attributes[name])
+
+    return [[class_reference, names, columns] for (class_reference, names), columns in groups.items()]
+
+
+def unpack_objects(groups: list[Any], shared_attributes: dict[str, Any]) -> dict[str, Any]:
+    """Unpack objects packed with `pack_objects`.
+
+    :param groups: The packed groups
+    :param shared_attributes: Attributes to set to the same value on every object
+
+    :returns: The objects keyed by their `object_key`
+    """
+
+    objects: dict[str, Any] = {}
+    shared_names = tuple(shared_attributes)
+    shared_values = tuple(shared_attributes.values())
+
+    with _collection_paused():
+        for class_reference, names, columns in groups:
+            count = len(columns[0]) if columns else 0
+            all_names = tuple(names) + shared_names
+            rows = zip(*columns, *(itertools.repeat(value, count) for value in shared_values), strict=True)
+
+            # Build everything with C level iteration rather than a Python loop
+            attributes = map(dict, map(zip, itertools.repeat(all_names, count), rows))
+            instances = list(map(class_reference.__new__, itertools.repeat(class_reference, count)))
+            collections.deque(map(setattr, instances, itertools.repeat("__dict__", count), attributes), maxlen=0)
+            objects.update(zip(columns[names.index("object_key")], instances, strict=True))
+
+    return objects
+
+
+def write_payload(path: str, payload: Any, *, schema: str | None = None) -> None:
+    """Write a cache file.
+
+    :param path: The path to write to
+    :param payload: The payload to store. It must be picklable.
+    :param schema: The fingerprint of the classes in the payload. Defaults to `schema_fingerprint()`.
+    """
+
+    def write(output_file: IO[bytes]) -> None:
+        output_file.write(_MAGIC)
+        output_file.write(json.dumps(_header(schema)).encode("utf-8") + b"\n")
+        pickle.dump(payload, output_file, protocol=pickle.HIGHEST_PROTOCOL)
+
+    _write_atomically(path, write)
+
+
+def read_payload(path: str, *, schema: str | None = None) -> Any:
+    """Read a cache file.
+
+    :param path: The path to read from
+    :param schema: The fingerprint the classes in the payload must have. Defaults to `schema_fingerprint()`.
+
+    :raises StaleCacheError: If the file was written by a different version of the library
+
+    :returns: The stored payload
+    """
+
+    with open(path, "rb") as input_file:
+        if input_file.read(len(_MAGIC)) != _MAGIC:
+            raise StaleCacheError(f"{path} is not a cache file")
+
+        try:
+            header = json.loads(input_file.readline())
+        except ValueError as ex:
+            raise StaleCacheError(f"{path} has an invalid header") from ex
+
+        if header != _header(schema):
+            raise StaleCacheError(f"{path} was written by a different version of xcodeproj")
+
+        with _collection_paused():
+            return pickle.load(input_file)
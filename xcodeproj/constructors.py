@@ -0,0 +1,444 @@
+"""Fast constructors for deserializable classes.
+
+The `deserialize` library reflects over the type of every field of every
+object it builds. The objects in a pbxproj only use a handful of field types,
+so this module compiles a constructor for each class, once, from the same
+decorator metadata the library uses. Anything the compiled constructor can't
+handle is passed to the library, which also produces the canonical exception
+for invalid data.
+"""
+
+import enum
+import types
+from collections.abc import Callable
+from typing import Any, TypeVar, cast, get_args, get_origin
+
+import deserialize
+from deserialize.type_checks import is_typing_type, is_union, union_types
+
+T = TypeVar("T")
+
+Converter = Callable[[Any], Any]
+Constructor = Callable[[dict[str, Any], bool], Any]
+
+# The compiled constructor for each class
+_CONSTRUCTORS: dict[type[Any], Constructor] = {}
+
+
+class _MismatchError(Exception):
+    """Raised when a value can't be converted by a compiled constructor."""
+
+
+class _UnsupportedError(Exception):
+    """Raised when a type can't be compiled."""
+
+
+def _is_identity_parser(parser: Callable[[Any], Any]) -> bool:
+    """Check if a field parser is the default one, which does nothing.
+
+    :param parser: The parser from the field metadata
+
+    :returns: True if the parser can be skipped, False otherwise
+    """
+
+    return getattr(parser, "__qualname__", None) == "_get_parser.<locals>.identity_parser"
+
+
+def _instance_converter(class_reference: type[Any]) -> Converter:
+    """Create a converter which checks that a value is already of a type.
+
+    :param class_reference: The expected type
+
+    :returns: The converter
+    """
+
+    def convert(value: Any) -> Any:
+        if not isinstance(value, class_reference):
+            raise _MismatchError()
+        return value
+
+    return convert
+
+
+def _list_converter(item_type: Any) -> Converter:
+    """Create a converter for lists.
+
+    :param item_type: The type of the list items
+
+    :returns: The converter
+    """
+
+    if item_type in (str, int, bool):
+
+        def convert_simple(value: Any) -> Any:
+            if not isinstance(value, list):
+                raise _MismatchError()
+            for item in value:
+                if not isinstance(item, item_type):
+                    raise _MismatchError()
+            return list(value)
+
+        return convert_simple
+
+    convert_item = _compile_type(item_type)
+
+    def convert(value: Any) -> Any:
+        if not isinstance(value, list):
+            raise _MismatchError()
+        return [convert_item(item) for item in value]
+
+    return convert
+
+
+def _dict_converter(key_type: Any, value_type: Any) -> Converter:
+    """Create a converter for dictionaries.
+
+    :param key_type: The type of the dictionary keys
+    :param value_type: The type of the dictionary values
+
+    :returns: The converter
+    """
+
+    convert_value = None if value_type is Any else _compile_type(value_type)
+
+    def convert(value: Any) -> Any:
+        if not isinstance(value, dict):
+            raise _MismatchError()
+        if key_type is not Any:
+            for dict_key in value:
+                if not isinstance(dict_key, key_type):
+                    raise _MismatchError()
+        if convert_value is None:
+            return dict(value)
+        return {dict_key: convert_value(dict_value) for dict_key, dict_value in value.items()}
+
+    return convert
+
+
+def _union_converter(member_types: list[Any]) -> Converter:
+    """Create a converter for unions, trying each member in turn.
+
+    :param member_types: The types in the union
+
+    :returns: The converter
+    """
+
+    optional = type(None) in member_types
+    converters = [_compile_type(member_type) for member_type in member_types if member_type is not type(None)]
+
+    if len(converters) == 1:
+        convert_only = converters[0]
+
+        def convert_optional(value: Any) -> Any:
+            if value is None and optional:
+                return None
+            return convert_only(value)
+
+        return convert_optional
+
+    def convert(value: Any) -> Any:
+        if value is None and optional:
+            return None
+        for convert_member in converters:
+            try:
+                return convert_member(value)
+            except _MismatchError:
+                pass
+        raise _MismatchError()
+
+    return convert
+
+
+def _enum_converter(class_reference: type[enum.Enum]) -> Converter:
+    """Create a converter for enums.
+
+    :param class_reference: The enum type
+
+    :returns: The converter
+    """
+
+    def convert(value: Any) -> Any:
+        try:
+            return class_reference(value)
+        except ValueError as ex:
+            raise _MismatchError() from ex
+
+    return convert
+
+
+def _compile_type(field_type: Any) -> Converter:
+    """Create a converter for a field type.
+
+    The converters replicate the results of the `deserialize` library with
+    `RawStorageMode.ALL` for the types used in pbxproj files.
+
+    :param field_type: The type to convert to
+
+    :raises _UnsupportedError: If the type can't be compiled
+
+    :returns: The converter
+    """
+
+    if field_type is Any:
+        return lambda value: value
+
+    if is_union(field_type):
+        return _union_converter(list(union_types(field_type, "")))
+
+    origin = get_origin(field_type)
+
+    if origin is list:
+        return _list_converter(get_args(field_type)[0])
+
+    if origin is dict:
+        key_type, value_type = get_args(field_type)
+        return _dict_converter(key_type, value_type)
+
+    if field_type is type(None):
+        return _instance_converter(types.NoneType)
+
+    if is_typing_type(field_type) or not isinstance(field_type, type):
+        raise _UnsupportedError(field_type)
+
+    if issubclass(field_type, enum.Enum):
+        return _enum_converter(field_type)
+
+    if field_type in (str, int, bool, float):
+        return _instance_converter(field_type)
+
+    if issubclass(field_type, deserialize.CustomDeserializable) or hasattr(
+        field_type, "__deserialize_downcast_field__"
+    ):
+        raise _UnsupportedError(field_type)
+
+    compiled = _compiled_class(field_type)
+
+    def convert_instance(value: Any) -> Any:
+        if not isinstance(value, dict):
+            raise _MismatchError()
+        # Nested objects are always strict. If they have unhandled keys the
+        # whole object falls back to the library, which applies the caller's
+        # setting.
+        return compiled(value, True)
+
+    return convert_instance
+
+
+class _Field:
+    """A field of a compiled class.
+
+    :param name: The attribute name
+    :param keys: The keys to look the value up with, in order
+    :param parser: The parser to run on the raw value, or None if there isn't one
+    :param convert: The converter for the parsed value
+    :param default: The default value, if the field has one
+    :param has_default: True if the field has a default value
+    :param optional: True if a missing value should be passed to the parser as None
+    """
+
+    __slots__ = ("name", "keys", "parser", "convert", "default", "has_default", "optional")
+
+    def __init__(
+        self,
+        *,
+        name: str,
+        keys: tuple[str, ...],
+        parser: Callable[[Any], Any] | None,
+        convert: Converter,
+        default: Any,
+        has_default: bool,
+        optional: bool,
+    ) -> None:
+        self.name = name
+        self.keys = keys
+        self.parser = parser
+        self.convert = convert
+        self.default = default
+        self.has_default = has_default
+        self.optional = optional
+
+
+def _compile_fields(class_reference: type[Any]) -> tuple[list[_Field], frozenset[str], frozenset[str]]:
+    """Compile the fields of a class from its decorator metadata.
+
+    :param class_reference: The class to compile
+
+    :raises _UnsupportedError: If the class can't be compiled
+
+    :returns: The fields, the keys of any class variables, and the keys which may be unhandled
+    """
+
+    metadata = deserialize.get_class_metadata(class_reference)
+
+    # Values are stored straight into the instance dictionary
+    if len(metadata.hints) == 0 or class_reference.__dictoffset__ == 0:
+        raise _UnsupportedError(class_reference)
+
+    fields: list[_Field] = []
+    class_variable_keys: set[str] = set()
+
+    for attribute_name, field_metadata in metadata.fields.items():
+        if field_metadata.ignore:
+            continue
+
+        if field_metadata.is_classvar:
+            class_variable_keys.add(field_metadata.key)
+            continue
+
+        # Storing into the instance dictionary would bypass data descriptors
+        if hasattr(getattr(class_reference, attribute_name, None), "__set__"):
+            raise _UnsupportedError(class_reference)
+
+        keys = [field_metadata.key]
+
+        if metadata.auto_snake:
+            if attribute_name.lower() != attribute_name:
+                raise _UnsupportedError(class_reference)
+            keys.extend(key for key in (field_metadata.camel_key, field_metadata.pascal_key) if key)
+
+        fields.append(
+            _Field(
+                name=attribute_name,
+                keys=tuple(keys),
+                parser=None if _is_identity_parser(field_metadata.parser) else field_metadata.parser,
+                convert=_compile_type(field_metadata.type),
+                default=field_metadata.default_value,
+                has_default=field_metadata.has_default,
+                optional=bool(
+                    field_metadata.is_union and field_metadata.union_types and type(None) in field_metadata.union_types
+                ),
+            )
+        )
+
+    allowed_unhandled = getattr(class_reference, "__deserialize_allow_unhandled_map__", {})
+
+    return (
+        fields,
+        frozenset(class_variable_keys),
+        frozenset(key for key, allowed in allowed_unhandled.items() if allowed),
+    )
+
+
+def _unsupported_constructor(data: dict[str, Any], throw_on_unhandled: bool) -> Any:
+    """The constructor for classes which can't be compiled.
+
+    :param data: The raw data
+    :param throw_on_unhandled: Whether to raise on unhandled keys
+
+    :raises _UnsupportedError: Always
+    """
+
+    raise _UnsupportedError()
+
+
+def _compiled_class(class_reference: type[Any]) -> Constructor:
+    """Get the compiled constructor for a class, compiling it on first use.
+
+    :param class_reference: The class to construct
+
+    :raises _UnsupportedError: If the class can't be compiled
+
+    :returns: A function taking the raw data and whether to raise on unhandled keys
+    """
+
+    compiled = _CONSTRUCTORS.get(class_reference)
+
+    if compiled is not None:
+        return compiled
+
+    try:
+        fields, class_variable_keys, allowed_unhandled = _compile_fields(class_reference)
+    except _UnsupportedError:
+        # Remember the failure so that the class isn't compiled again
+        _CONSTRUCTORS[class_reference] = _unsupported_constructor
+        raise
+
+    constructed = getattr(class_reference, "__deserialize_constructed__", None)
+    new = cast(Callable[[type[Any]], Any], class_reference.__new__)
+
+    def construct_instance(data: dict[str, Any], throw_on_unhandled: bool) -> Any:
+        if class_variable_keys and not class_variable_keys.isdisjoint(data):
+            raise _MismatchError()
+
+        try:
+            instance = new(class_reference)
+        except TypeError as ex:
+            raise _MismatchError() from ex
+
+        attributes = instance.__dict__
+        handled: set[str] = set()
+
+        for field in fields:
+            for key in field.keys:
+                if key in data:
+                    handled.add(key)
+                    value = data[key]
+                    if field.parser is not None:
+                        value = field.parser(value)
+                    break
+            else:
+                if field.has_default:
+                    attributes[field.name] = field.default
+                    continue
+                if not field.optional:
+                    raise _MismatchError()
+                value = None if field.parser is None else field.parser(None)
+
+            attributes[field.name] = field.convert(value)
+
+        if throw_on_unhandled and len(handled) != len(data):
+            for key in data:
+                if key not in handled and key not in allowed_unhandled:
+                    raise _MismatchError()
+
+        if constructed is not None:
+            constructed(instance)
+
+        attributes["__deserialize_raw__"] = data
+        return instance
+
+    _CONSTRUCTORS[class_reference] = construct_instance
+    return construct_instance
+
+
+def construct(class_reference: type[T], data: dict[str, Any], *, throw_on_unhandled: bool = False) -> T:
+    """Construct an object from its raw data.
+
+    This produces the same result as
+    `deserialize.deserialize(class_reference, data, throw_on_unhandled=throw_on_unhandled,
+    raw_storage_mode=deserialize.RawStorageMode.ALL)` but without reflecting over
+    the class for every object. Downcasting is supported on the class passed in.
+
+    :param class_reference: The class to construct, or the base class to downcast from
+    :param data: The raw data
+    :param throw_on_unhandled: Set to True to raise if the data has keys that aren't understood
+
+    :raises DeserializeException: If the data can't be deserialized
+
+    :returns: The constructed object
+    """
+
+    try:
+        target_class: type[Any] = class_reference
+        downcast_field = getattr(class_reference, "__deserialize_downcast_field__", None)
+
+        if downcast_field is not None:
+            downcast_map = getattr(class_reference, "__deserialize_downcast_map__", {})
+            target_class = downcast_map.get(data.get(downcast_field), class_reference)
+
+            if target_class is class_reference:
+                raise _UnsupportedError(class_reference)
+
+        return cast(T, _compiled_class(target_class)(data, throw_on_unhandled))
+    except (_MismatchError, _UnsupportedError):
+        pass
+
+    return cast(
+        T,
+        deserialize.deserialize(
+            class_reference,
+            data,
+            throw_on_unhandled=throw_on_unhandled,
+            raw_storage_mode=deserialize.RawStorageMode.ALL,
+        ),
+    )
@@ -24,6 +24,10 @@ class PBXBuildFile(PBXObject):
     platform_filter: str | None
     settings: dict[str, Any] | None
 
+    def referenced_keys(self) -> list[str]:
+        """Get the keys in `file_ref_id` and `product_ref_id`."""
+        return [key for key in (self.file_ref_id, self.product_ref_id) if key is not None]
+
     @property
     def file_ref(self) -> PBXFileReference:
         """Get the file reference.
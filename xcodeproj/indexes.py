@@ -0,0 +1,525 @@
+"""Lookup indexes over the objects in a project."""
+
+import array
+import bisect
+import heapq
+import os
+import unicodedata
+import weakref
+from collections.abc import Iterable
+from typing import Any, TypeVar
+
+from .buildphases import PBXBuildPhase
+from .files import PBXBuildFile
+from .objects import Objects
+from .pbxobject import PBXObject
+from .targets import PBXTarget
+
+TargetType = TypeVar("TargetType", bound=PBXTarget)
+
+
+class TypeIndex:
+    """Buckets the objects of a project by isa, in a single pass.
+
+    Lazily loaded objects are bucketed by the isa of their raw entries, so
+    building the index doesn't deserialize anything.
+
+    :param objects: The objects to index
+    """
+
+    _objects_ref: "weakref.ref[Objects]"
+    _version: int
+    _keys: list[str]
+    _buckets: dict[str, "array.array[int]"]
+    _classes: dict[str, type[Any]]
+    _isas_by_type: dict[type[Any], list[str]]
+
+    def __init__(self, objects: Objects) -> None:
+        downcast_map: dict[str, type[Any]] = PBXObject.__deserialize_downcast_map__  # type: ignore[attr-defined]
+        isa_by_class = {class_reference: isa for isa, class_reference in downcast_map.items()}
+
+        self._objects_ref = weakref.ref(objects)
+        self._version = objects.version
+        self._keys = []
+        self._buckets = {}
+        self._classes = dict(downcast_map)
+        self._isas_by_type = {}
+
+        # Go through the dictionary directly so that lazy entries aren't converted
+        for position, (object_key, value) in enumerate(dict.items(objects)):
+            self._keys.append(object_key)
+
+            # Raw lazy entries and objects with an unknown isa are dictionaries
+            isa = value.get("isa") if isinstance(value, dict) else isa_by_class.get(type(value))
+
+            if not isinstance(isa, str):
+                continue
+
+            bucket = self._buckets.get(isa)
+
+            if bucket is None:
+                bucket = array.array("l")
+                self._buckets[isa] = bucket
+
+            bucket.append(position)
+
+    def is_current(self, objects: Objects) -> bool:
+        """Check if the index still matches some objects.
+
+        :param objects: The objects
+
+        :returns: True if the index was built from the objects and they haven't changed since, False otherwise
+        """
+
+        return self._objects_ref() is objects and self._version == objects.version
+
+    def counts(self) -> dict[str, int]:
+        """Get the number of objects of each isa.
+
+        :returns: The counts keyed by isa
+        """
+
+        return {isa: len(bucket) for isa, bucket in self._buckets.items()}
+
+    def isas_of_type(self, object_type: type[Any]) -> list[str]:
+        """Get the isa values of a type and all of its subclasses.
+
+        :param object_type: The type to get the isa values for
+
+        :returns: The isa values which deserialize to the type
+        """
+
+        isas = self._isas_by_type.get(object_type)
+
+        if isas is None:
+            isas = [isa for isa, class_reference in self._classes.items() if issubclass(class_reference, object_type)]
+            self._isas_by_type[object_type] = isas
+
+        return isas
+
+    def keys_of_type(self, object_type: type[Any]) -> list[str]:
+        """Get the keys of the objects of a type, including subclasses.
+
+        :param object_type: The type of objects to get
+
+        :returns: The keys, in the order the objects appear in the project
+        """
+
+        buckets = [self._buckets[isa] for isa in self.isas_of_type(object_type) if isa in self._buckets]
+
+        if not buckets:
+            return []
+
+        positions = buckets[0] if len(buckets) == 1 else heapq.merge(*buckets)
+        keys = self._keys
+        return [keys[position] for position in positions]
+
+
+class TargetIndex:
+    """Indexes targets by name and by the build phases they own.
+
+    Both native and aggregate targets are indexed. Build phases are indexed
+    by key, so they aren't deserialized when the project is loaded lazily.
+
+    :param targets: The targets to index, in project order
+    """
+
+    _by_name: dict[str, list[PBXTarget]]
+    _by_phase: dict[str, list[PBXTarget]]
+
+    def __init__(self, targets: Iterable[PBXTarget]) -> None:
+        self._by_name = {}
+        self._by_phase = {}
+
+        for target in targets:
+            self._by_name.setdefault(target.name, []).append(target)
+
+            for phase_id in target.build_phases_ids:
+                self._by_phase.setdefault(phase_id, []).append(target)
+
+    def targets_named(self, name: str) -> list[PBXTarget]:
+        """Get the targets with a name.
+
+        :param name: The name of the targets
+
+        :returns: The targets, in project order
+        """
+
+        return list(self._by_name.get(name, ()))
+
+    def target_named(self, name: str, target_type: type[TargetType]) -> TargetType | None:
+        """Get the first target of a type with a name.
+
+        :param name: The name of the target
+        :param target_type: The type of target to find
+
+        :returns: The target if found, None otherwise
+        """
+
+        for target in self._by_name.get(name, ()):
+            if isinstance(target, target_type):
+                return target
+
+        return None
+
+    def duplicate_names(self) -> dict[str, list[PBXTarget]]:
+        """Get the names which are used by more than one target.
+
+        :returns: The targets sharing each duplicated name
+        """
+
+        return {name: list(targets) for name, targets in self._by_name.items() if len(targets) > 1}
+
+    def target_containing_phase(self, phase_key: str, target_type: type[TargetType]) -> TargetType | None:
+        """Get the first target of a type which owns a build phase.
+
+        :param phase_key: The key of the build phase
+        :param target_type: The type of target to find
+
+        :returns: The owning target if found, None otherwise
+        """
+
+        for target in self._by_phase.get(phase_key, ()):
+            if isinstance(target, target_type):
+                return target
+
+        return None
+
+
+class MembershipIndex:
+    """Indexes which build phases and targets each file is built in.
+
+    A file reference is a member of a build phase through a build file, and
+    of a target through the phase. Each link is indexed by key in both
+    directions, so lookups don't go through the objects.
+
+    :param targets: The targets in the project
+    :param build_phases: The build phases in the project
+    :param build_files: The build files in the project
+    """
+
+    _build_files_by_file_ref: dict[str, list[str]]
+    _phases_by_build_file: dict[str, list[str]]
+    _targets_by_phase: dict[str, list[str]]
+    _phase_types: dict[str, type[PBXBuildPhase]]
+    _file_refs_by_target: dict[str, dict[type[PBXBuildPhase], list[str]]]
+    _targets_by_file_ref: dict[str, list[str]]
+
+    def __init__(
+        self,
+        targets: Iterable[PBXTarget],
+        build_phases: Iterable[PBXBuildPhase],
+        build_files: Iterable[PBXBuildFile],
+    ) -> None:
+        self._build_files_by_file_ref = {}
+        self._phases_by_build_file = {}
+        self._targets_by_phase = {}
+        self._phase_types = {}
+        self._file_refs_by_target = {}
+        self._targets_by_file_ref = {}
+
+        file_ref_by_build_file: dict[str, str] = {}
+
+        for build_file in build_files:
+            # Package products are built without a file reference
+            if build_file.file_ref_id is None:
+                continue
+
+            file_ref_by_build_file[build_file.object_key] = build_file.file_ref_id
+            self._build_files_by_file_ref.setdefault(build_file.file_ref_id, []).append(build_file.object_key)
+
+        file_refs_by_phase: dict[str, list[str]] = {}
+
+        for build_phase in build_phases:
+            self._phase_types[build_phase.object_key] = type(build_phase)
+            file_refs = file_refs_by_phase.setdefault(build_phase.object_key, [])
+
+            for build_file_id in build_phase.file_ids:
+                self._phases_by_build_file.setdefault(build_file_id, []).append(build_phase.object_key)
+
+                file_ref_id = file_ref_by_build_file.get(build_file_id)
+
+                if file_ref_id is not None:
+                    file_refs.append(file_ref_id)
+
+        for target in targets:
+            file_refs_by_type = self._file_refs_by_target.setdefault(target.object_key, {})
+
+            for phase_id in target.build_phases_ids:
+                self._targets_by_phase.setdefault(phase_id, []).append(target.object_key)
+
+                phase_type = self._phase_types.get(phase_id)
+
+                if phase_type is None:
+                    continue
+
+                file_refs_by_type.setdefault(phase_type, []).extend(file_refs_by_phase[phase_id])
+
+                for file_ref_id in file_refs_by_phase[phase_id]:
+                    target_keys = self._targets_by_file_ref.setdefault(file_ref_id, [])
+
+                    # A file is usually only in a handful of targets, so a list is cheap to check
+                    if target.object_key not in target_keys:
+                        target_keys.append(target.object_key)
+
+    def build_file_keys(self, file_ref_key: str) -> list[str]:
+        """Get the keys of the build files which refer to a file.
+
+        :param file_ref_key: The key of the file reference
+
+        :returns: The build file keys
+        """
+
+        return list(self._build_files_by_file_ref.get(file_ref_key, ()))
+
+    def build_phase_keys(self, file_ref_key: str) -> list[str]:
+        """Get the keys of the build phases which contain a file.
+
+        :param file_ref_key: The key of the file reference
+
+        :returns: The build phase keys
+        """
+
+        return [
+            phase_key
+            for build_file_key in self._build_files_by_file_ref.get(file_ref_key, ())
+            for phase_key in self._phases_by_build_file.get(build_file_key, ())
+        ]
+
+    def target_keys(self, file_ref_key: str) -> list[str]:
+        """Get the keys of the targets which contain a file in any build phase.
+
+        :param file_ref_key: The key of the file reference
+
+        :returns: The target keys, without duplicates
+        """
+
+        return list(self._targets_by_file_ref.get(file_ref_key, ()))
+
+    def file_ref_keys_by_phase_type(self, target_key: str) -> dict[type[PBXBuildPhase], list[str]]:
+        """Get the keys of the files in each type of build phase of a target.
+
+        :param target_key: The key of the target
+
+        :returns: The file reference keys for each type of phase in the target
+        """
+
+        return {
+            phase_type: list(file_ref_keys)
+            for phase_type, file_ref_keys in self._file_refs_by_target.get(target_key, {}).items()
+        }
+
+
+class PathIndex:
+    """Indexes objects by their absolute path.
+
+    Paths are normalized before they are indexed or looked up. Case
+    insensitive lookups also ignore differences in unicode normalization, the
+    same way APFS does by default.
+
+    The indexes for case insensitive and directory lookups are only built
+    when they are first needed.
+
+    :param paths: The absolute path and key of each object, in project order
+    """
+
+    _keys_by_path: dict[str, list[str]]
+    _keys_by_folded_path: dict[str, list[str]] | None
+    _sorted: list[tuple[str, str]] | None
+    _sorted_folded: list[tuple[str, str]] | None
+
+    def __init__(self, paths: Iterable[tuple[str, str]]) -> None:
+        self._keys_by_path = {}
+        self._keys_by_folded_path = None
+        self._sorted = None
+        self._sorted_folded = None
+
+        for path, object_key in paths:
+            self._keys_by_path.setdefault(os.path.normpath(path), []).append(object_key)
+
+    def __len__(self) -> int:
+        """Get the number of objects in the index.
+
+        :returns: The number of objects
+        """
+
+        return sum(len(object_keys) for object_keys in self._keys_by_path.values())
+
+    def _folded(self) -> dict[str, list[str]]:
+        """Get the index of keys by folded path, building it on first use.
+
+        :returns: The index
+        """
+
+        if self._keys_by_folded_path is None:
+            self._keys_by_folded_path = {}
+
+            for path, object_keys in self._keys_by_path.items():
+                self._keys_by_folded_path.setdefault(_fold_path(path), []).extend(object_keys)
+
+        return self._keys_by_folded_path
+
+    def keys_for_path(self, path: str, *, case_sensitive: bool = True) -> list[str]:
+        """Get the keys of the objects at a path.
+
+        :param path: The absolute path
+        :param case_sensitive: Set to False to match paths regardless of case
+
+        :returns: The keys, in project order for each distinct path
+        """
+
+        normalized = os.path.normpath(path)
+
+        if case_sensitive:
+            return list(self._keys_by_path.get(normalized, ()))
+
+        return list(self._folded().get(_fold_path(normalized), ()))
+
+    def keys_under(self, directory: str, *, case_sensitive: bool = True) -> list[str]:
+        """Get the keys of the objects anywhere below a directory.
+
+        The directory itself isn't included.
+
+        :param directory: The absolute path of the directory
+        :param case_sensitive: Set to False to match paths regardless of case
+
+        :returns: The keys, ordered by path
+        """
+
+        prefix = os.path.join(os.path.normpath(directory), "")
+
+        if case_sensitive:
+            if self._sorted is None:
+                self._sorted = sorted(
+                    (path, object_key) for path, object_keys in self._keys_by_path.items() for object_key in object_keys
+                )
+            entries = self._sorted
+        else:
+            prefix = _fold_path(prefix)
+            if self._sorted_folded is None:
+                self._sorted_folded = sorted(
+                    (path, object_key) for path, object_keys in self._folded().items() for object_key in object_keys
+                )
+            entries = self._sorted_folded
+
+        object_keys = []
+
+        # Everything below the directory sorts together, straight after the prefix
+        position = bisect.bisect_left(entries, (prefix,))
+
+        while position < len(entries) and entries[position][0].startswith(prefix):
+            object_keys.append(entries[position][1])
+            position += 1
+
+        return object_keys
+
+
+def _fold_path(path: str) -> str:
+    """Fold a path for case and normalization insensitive comparisons.
+
+    :param path: The path to fold
+
+    :returns: The folded path
+    """
+
+    return unicodedata.normalize("NFD", path).casefold()
+
+
+class ReferenceGraph:
+    """The references between the objects of a project, in both directions.
+
+    :param references: The key of each object and the keys it refers to
+    """
+
+    _outbound: dict[str, list[str]]
+    _inbound: dict[str, list[str]]
+
+    def __init__(self, references: Iterable[tuple[str, list[str]]]) -> None:
+        self._outbound = {}
+        self._inbound = {}
+
+        for object_key, referenced_keys in references:
+            self._outbound[object_key] = referenced_keys
+
+            for referenced_key in referenced_keys:
+                self._inbound.setdefault(referenced_key, []).append(object_key)
+
+    def references_from(self, object_key: str) -> list[str]:
+        """Get the keys an object refers to.
+
+        :param object_key: The key of the referring object
+
+        :returns: The referenced keys
+        """
+
+        return list(self._outbound.get(object_key, ()))
+
+    def references_to(self, object_key: str) -> list[str]:
+        """Get the keys of the objects which refer to an object.
+
+        An object which refers to the same key more than once is listed once
+        for each reference.
+
+        :param object_key: The key of the referenced object
+
+        :returns: The referring keys, in project order
+        """
+
+        return list(self._inbound.get(object_key, ()))
+
+    def is_referenced(self, object_key: str) -> bool:
+        """Check if any object refers to an object.
+
+        :param object_key: The key of the object
+
+        :returns: True if the object is referenced, False otherwise
+        """
+
+        return object_key in self._inbound
+
+    def transitive_references_to(self, object_key: str) -> set[str]:
+        """Get the keys of every object which refers to an object, directly or indirectly.
+
+        :param object_key: The key of the referenced object
+
+        :returns: The referring keys, not including the object itself
+        """
+
+        found: set[str] = set()
+        pending = [object_key]
+
+        while pending:
+            for referrer_key in self._inbound.get(pending.pop(), ()):
+                if referrer_key not in found:
+                    found.add(referrer_key)
+                    pending.append(referrer_key)
+
+        found.discard(object_key)
+        return found
+
+    def dangling(self) -> dict[str, list[str]]:
+        """Find references to objects which aren't in the graph.
+
+        :returns: The missing keys referred to by each object which has any
+        """
+
+        dangling: dict[str, list[str]] = {}
+
+        for object_key, referenced_keys in self._outbound.items():
+            missing = [referenced_key for referenced_key in referenced_keys if referenced_key not in self._outbound]
+
+            if missing:
+                dangling[object_key] = missing
+
+        return dangling
+
+    def unreferenced(self) -> list[str]:
+        """Find the objects which nothing refers to.
+
+        The root project object is only referred to by container item proxies,
+        so it is usually included.
+
+        :returns: The keys of the unreferenced objects, in project order
+        """
+
+        return [object_key for object_key in self._outbound if object_key not in self._inbound]
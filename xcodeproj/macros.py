@@ -0,0 +1,317 @@
+"""Expansion of build setting macros.
+
+References can be written as `$(NAME)` or `${NAME}`, can be nested, as in
+`$(SETTING_$(CONFIGURATION))`, and can have operators applied to them, as in
+`$(PRODUCT_NAME:lower)`. `$(inherited)` is the value of the setting being
+defined from the layers below the one defining it.
+"""
+
+import os
+import re
+from collections.abc import Callable, Mapping, Sequence
+from typing import Any
+
+# Characters which aren't allowed in a C identifier
+_NON_IDENTIFIER_PATTERN = re.compile(r"[^A-Za-z0-9_]")
+
+# Characters which aren't allowed in an RFC 1034 identifier
+_NON_RFC1034_PATTERN = re.compile(r"[^A-Za-z0-9\-.]")
+
+# Characters which need escaping for a shell
+_QUOTE_PATTERN = re.compile(r"([\\\s\"'$`])")
+
+
+class MacroCycleError(Exception):
+    """Raised when a setting refers to itself.
+
+    :param names: The names of the settings in the cycle, in the order they were referenced
+    """
+
+    def __init__(self, names: list[str]) -> None:
+        super().__init__("Build setting refers to itself: " + " -> ".join(names))
+        self.names = names
+
+
+def _base(value: str) -> str:
+    """Get the file name of a path without its suffix.
+
+    :param value: The path
+
+    :returns: The base name
+    """
+
+    return os.path.splitext(os.path.basename(value))[0]
+
+
+def _dir(value: str) -> str:
+    """Get the folder of a path, with a trailing separator.
+
+    :param value: The path
+
+    :returns: The folder, or an empty string if the path has no folder
+    """
+
+    folder = os.path.dirname(value)
+    return os.path.join(folder, "") if folder else ""
+
+
+def _identifier(value: str) -> str:
+    """Convert a value to a C identifier.
+
+    :param value: The value
+
+    :returns: The identifier
+    """
+
+    identifier = _NON_IDENTIFIER_PATTERN.sub("_", value)
+    return "_" + identifier if identifier[:1].isdigit() else identifier
+
+
+# The operators which take no argument
+_OPERATORS: dict[str, Callable[[str], str]] = {
+    "base": _base,
+    "c99extidentifier": _identifier,
+    "dir": _dir,
+    "file": os.path.basename,
+    "identifier": _identifier,
+    "lower": str.lower,
+    "quote": lambda value: _QUOTE_PATTERN.sub(r"\\\1", value),
+    "rfc1034identifier": lambda value: _NON_RFC1034_PATTERN.sub("-", value),
+    "standardizepath": lambda value: os.path.normpath(value) if value else value,
+    "suffix": lambda value: os.path.splitext(value)[1],
+    "upper": str.upper,
+}
+
+
+def _split_top_level(text: str, separator: str) -> list[str]:
+    """Split text on a separator which isn't inside a nested reference.
+
+    :param text: The text to split
+    :param separator: The separator character
+
+    :returns: The parts
+    """
+
+    parts: list[str] = []
+    depth = 0
+    start = 0
+
+    for position, character in enumerate(text):
+        if character in "({":
+            depth += 1
+        elif character in ")}":
+            depth -= 1
+        elif character == separator and depth == 0:
+            parts.append(text[start:position])
+            start = position + 1
+
+    parts.append(text[start:])
+    return parts
+
+
+class MacroExpander:
+    """Expands the build settings of a set of layers.
+
+    Every expanded value is remembered, so each setting is only expanded once
+    however many other settings refer to it. Settings which aren't defined
+    expand to an empty string, as they do in Xcode.
+
+    :param layers: The layers of settings, from lowest precedence to highest
+    :param defaults: Values to use for settings no layer defines, such as `SRCROOT`. These aren't expanded.
+    """
+
+    _layers: Sequence[Mapping[str, Any]]
+    _defaults: Mapping[str, str]
+    _values: dict[tuple[str, int], str]
+    _expanding: dict[tuple[str, int], None]
+
+    def __init__(self, layers: Sequence[Mapping[str, Any]], *, defaults: Mapping[str, str] | None = None) -> None:
+        self._layers = layers
+        self._defaults = defaults if defaults is not None else {}
+        self._values = {}
+        self._expanding = {}
+
+    def value(self, name: str) -> str:
+        """Get the expanded value of a setting.
+
+        :param name: The name of the setting
+
+        :raises MacroCycleError: If the setting refers to itself
+
+        :returns: The value, or an empty string if the setting isn't defined
+        """
+
+        return self._value(name, len(self._layers))
+
+    def expand(self, text: str) -> str:
+        """Expand the references in some text, such as a path.
+
+        :param text: The text to expand
+
+        :raises MacroCycleError: If a referenced setting refers to itself
+
+        :returns: The expanded text
+        """
+
+        return self._expand(text, None, 0)
+
+    def expand_all(self) -> dict[str, str]:
+        """Expand every setting defined by any layer.
+
+        List values, such as search paths, are joined with spaces.
+
+        :raises MacroCycleError: If a setting refers to itself
+
+        :returns: The expanded value of each setting
+        """
+
+        names = dict.fromkeys(name for layer in self._layers for name in layer)
+        return {name: self.value(name) for name in names}
+
+    def _value(self, name: str, below: int) -> str:
+        """Get the expanded value of a setting from the layers below a point.
+
+        :param name: The name of the setting
+        :param below: The number of layers to look in, starting from the lowest
+
+        :raises MacroCycleError: If the setting refers to itself
+
+        :returns: The value
+        """
+
+        cache_key = (name, below)
+        cached = self._values.get(cache_key)
+
+        if cached is not None:
+            return cached
+
+        if cache_key in self._expanding:
+            names = [expanding_name for expanding_name, _ in self._expanding]
+            raise MacroCycleError(names[names.index(name) :] + [name])
+
+        self._expanding[cache_key] = None
+
+        try:
+            for level in range(below - 1, -1, -1):
+                raw_value = self._layers[level].get(name)
+
+                if raw_value is None:
+                    continue
+
+                if isinstance(raw_value, list):
+                    items = (self._expand(str(item), name, level) for item in raw_value)
+                    value = " ".join(item for item in items if item)
+                else:
+                    value = self._expand(raw_value if isinstance(raw_value, str) else str(raw_value), name, level)
+
+                break
+            else:
+                value = self._defaults.get(name, "")
+        finally:
+            del self._expanding[cache_key]
+
+        self._values[cache_key] = value
+        return value
+
+    def _expand(self, text: str, name: str | None, level: int) -> str:
+        """Expand the references in a value.
+
+        :param text: The text to expand
+        :param name: The name of the setting the text is the value of, if any
+        :param level: The layer the value is from
+
+        :raises MacroCycleError: If a referenced setting refers to itself
+
+        :returns: The expanded text
+        """
+
+        if "$" not in text:
+            return text
+
+        parts: list[str] = []
+        position = 0
+
+        while True:
+            start = text.find("$", position)
+
+            if start == -1:
+                parts.append(text[position:])
+                break
+
+            if text[start + 1 : start + 2] not in ("(", "{"):
+                parts.append(text[position : start + 1])
+                position = start + 1
+                continue
+
+            end = self._matching_close(text, start + 1)
+
+            if end == -1:
+                # An unterminated reference is left as it is
+                parts.append(text[position:])
+                break
+
+            parts.append(text[position:start])
+            parts.append(self._reference(text[start + 2 : end], name, level))
+            position = end + 1
+
+        return "".join(parts)
+
+    @staticmethod
+    def _matching_close(text: str, open_position: int) -> int:
+        """Find the bracket which closes a reference.
+
+        :param text: The text containing the reference
+        :param open_position: The position of the opening bracket
+
+        :returns: The position of the closing bracket, or -1 if there isn't one
+        """
+
+        depth = 0
+
+        for position in range(open_position, len(text)):
+            character = text[position]
+
+            if character in "({":
+                depth += 1
+            elif character in ")}":
+                depth -= 1
+
+                if depth == 0:
+                    return position
+
+        return -1
+
+    def _reference(self, reference: str, name: str | None, level: int) -> str:
+        """Evaluate the inside of a reference.
+
+        :param reference: The reference, without the surrounding `$()`
+        :param name: The name of the setting the reference is in, if any
+        :param level: The layer the reference is from
+
+        :raises MacroCycleError: If a referenced setting refers to itself
+
+        :returns: The value of the reference
+        """
+
+        referenced_name, *operators = _split_top_level(reference, ":")
+        referenced_name = self._expand(referenced_name, name, level).strip()
+
+        if referenced_name == "inherited":
+            value = "" if name is None else self._value(name, level)
+        else:
+            value = self.value(referenced_name)
+
+        for operator in operators:
+            operator_name, has_argument, argument = operator.partition("=")
+
+            if has_argument:
+                if operator_name == "default" and not value:
+                    value = self._expand(argument, name, level)
+                continue
+
+            transform = _OPERATORS.get(operator_name)
+
+            if transform is not None:
+                value = transform(value)
+
+        return value
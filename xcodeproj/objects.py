@@ -1,11 +1,197 @@
 """Objects custom type for type hinting."""
 
-from collections.abc import MutableMapping
-from typing import TYPE_CHECKING
+from collections.abc import Callable, ItemsView, Iterable, Iterator, MutableMapping, ValuesView
+from typing import TYPE_CHECKING, Any
 
 if TYPE_CHECKING:
     from .pbxobject import PBXObject
 
 
 class Objects(dict[str, "PBXObject"], MutableMapping[str, "PBXObject"]):  # type: ignore
-    """Holds the objects in the pbxproj."""
+    """Holds the objects in the pbxproj.
+
+    `version` changes whenever objects are added, replaced or removed, so that
+    indexes built from the objects can tell when they are out of date.
+    """
+
+    version: int = 0
+
+    def __setitem__(self, key: str, value: "PBXObject") -> None:
+        super().__setitem__(key, value)
+        self.version += 1
+
+    def __delitem__(self, key: str) -> None:
+        super().__delitem__(key)
+        self.version += 1
+
+    def pop(self, key: str, *args: Any) -> Any:
+        self.version += 1
+        return super().pop(key, *args)
+
+    def popitem(self) -> tuple[str, "PBXObject"]:
+        self.version += 1
+        return super().popitem()
+
+    def setdefault(self, key: str, default: Any = None) -> Any:
+        if key not in self:
+            self.version += 1
+        return super().setdefault(key, default)
+
+    def update(self, *args: Any, **kwargs: Any) -> None:  # type: ignore[override]
+        super().update(*args, **kwargs)
+        self.version += 1
+
+    def clear(self) -> None:
+        super().clear()
+        self.version += 1
+
+    def __ior__(self, other: Any) -> "Objects":  # type: ignore[override,misc]
+        self.update(other)
+        return self
+
+
+class LazyObjects(Objects):
+    """Holds the objects in the pbxproj, deserializing each one on first access.
+
+    The entries are stored in their raw parsed form until they are read. Every
+    way of reading values converts them, including `copy`, `setdefault`,
+    comparisons, `dict(objects)` and `{**objects}`. Iterating the keys,
+    checking membership and taking the length never convert anything.
+
+    C code which reads the dictionary's storage directly, such as
+    `PyDict_GetItem` in extension modules, still sees raw entries. Call
+    `materialize_all` before passing the objects to such code.
+
+    :param raw_entries: The raw parsed entries, keyed by object key
+    :param materialize: Converts a raw entry to its object
+    """
+
+    _pending: set[str]
+    _materialize: Callable[[str, Any], "PBXObject"]
+
+    def __init__(self, raw_entries: dict[str, Any], materialize: Callable[[str, Any], "PBXObject"]) -> None:
+        super().__init__(raw_entries)
+        self._pending = set(raw_entries)
+        self._materialize = materialize
+
+    def _materialize_key(self, key: str) -> "PBXObject":
+        """Convert the raw entry for a key and store the result.
+
+        :param key: The key of the pending entry
+
+        :returns: The converted object
+        """
+
+        value = self._materialize(key, super().__getitem__(key))
+
+        # Converting an entry doesn't change the objects, so the version is left alone
+        dict.__setitem__(self, key, value)
+        self._pending.discard(key)
+        return value
+
+    def materialize_all(self) -> None:
+        """Convert every entry that hasn't been accessed yet."""
+
+        for key in list(self._pending):
+            self._materialize_key(key)
+
+    def is_materialized(self, key: str) -> bool:
+        """Check if an entry has been converted.
+
+        :param key: The key of the entry
+
+        :returns: True if the entry is no longer in its raw form, False otherwise
+        """
+
+        return key not in self._pending
+
+    def peek(self, key: str) -> Any:
+        """Get an entry without converting it.
+
+        :param key: The key of the entry
+
+        :returns: The raw entry if it hasn't been converted yet, otherwise the object
+        """
+
+        return super().__getitem__(key)
+
+    def __getitem__(self, key: str) -> "PBXObject":
+        if key in self._pending:
+            return self._materialize_key(key)
+        return super().__getitem__(key)
+
+    def __setitem__(self, key: str, value: "PBXObject") -> None:
+        self._pending.discard(key)
+        super().__setitem__(key, value)
+
+    def __delitem__(self, key: str) -> None:
+        self._pending.discard(key)
+        super().__delitem__(key)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        if key not in self:
+            return default
+        return self[key]
+
+    def pop(self, key: str, *args: Any) -> Any:
+        if key in self._pending:
+            self._materialize_key(key)
+        return super().pop(key, *args)
+
+    def popitem(self) -> tuple[str, "PBXObject"]:
+        key, value = super().popitem()
+
+        if key in self._pending:
+            self._pending.discard(key)
+            value = self._materialize(key, value)
+
+        return key, value
+
+    def setdefault(self, key: str, default: Any = None) -> Any:
+        if key in self:
+            return self[key]
+        self[key] = default
+        return default
+
+    def copy(self) -> Objects:  # type: ignore[override]
+        self.materialize_all()
+        return Objects(super().items())
+
+    def __iter__(self) -> Iterator[str]:
+        # Overriding this stops `dict(objects)`, `{**objects}` and `dict.update`
+        # from copying the storage directly, so they go through `__getitem__`
+        return super().__iter__()
+
+    def __eq__(self, other: object) -> bool:
+        self.materialize_all()
+
+        if isinstance(other, LazyObjects):
+            other.materialize_all()
+
+        return super().__eq__(other)
+
+    def __ne__(self, other: object) -> bool:
+        return not self == other
+
+    # Dictionaries can't be hashed, which defining __eq__ would otherwise hide from type checkers
+    __hash__ = None  # type: ignore[assignment]
+
+    def __or__(self, other: Any) -> Any:
+        self.materialize_all()
+        return Objects(super().items()) | other
+
+    def __ror__(self, other: Any) -> Any:
+        self.materialize_all()
+        return other | Objects(super().items())
+
+    def values(self) -> ValuesView["PBXObject"]:  # type: ignore[override]
+        self.materialize_all()
+        return super().values()
+
+    def items(self) -> ItemsView[str, "PBXObject"]:  # type: ignore[override]
+        self.materialize_all()
+        return super().items()
+
+    def __reduce_ex__(self, protocol: Any) -> tuple[type[Objects], tuple[Iterable[tuple[str, "PBXObject"]]]]:
+        # Pickle as plain objects so that the conversion function isn't stored
+        return Objects, (list(self.items()),)
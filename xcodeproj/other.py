@@ -18,6 +18,10 @@ class PBXTargetDependency(PBXObject):
     target: str | None
     target_proxy: str
 
+    def referenced_keys(self) -> list[str]:
+        """Get the keys in `target` and `target_proxy`."""
+        return [key for key in (self.target, self.target_proxy) if key is not None]
+
 
 @deserialize.key("remote_global_id_string", "remoteGlobalIDString")
 @deserialize.auto_snake()
@@ -34,6 +38,15 @@ class PBXContainerItemProxy(PBXObject):
     remote_global_id_string: str
     remote_info: str
 
+    def referenced_keys(self) -> list[str]:
+        """Get the key in `container_portal`.
+
+        The remote object is usually in the project the portal refers to, so
+        `remote_global_id_string` isn't included. `XcodeProject.reference_graph`
+        adds it when the portal is the project itself.
+        """
+        return [self.container_portal]
+
 
 @deserialize.auto_snake()
 class ProjectReference:
@@ -55,3 +68,7 @@ class PBXFileSystemSynchronizedBuildFileExceptionSet(PBXObject):
 
     membership_exceptions: list[str]
     target: str
+
+    def referenced_keys(self) -> list[str]:
+        """Get the key in `target`."""
+        return [self.target]
@@ -0,0 +1,431 @@
+"""Parser for the old-style (OpenStep) ASCII property list format used by pbxproj files."""
+
+import codecs
+import re
+from collections.abc import Callable, Iterator
+from typing import Any, cast
+
+__all__ = ["ObjectHook", "PBXProjParseError", "load_pbxproj", "parse_pbxproj"]
+
+ObjectHook = Callable[[str, dict[str, Any]], Any]
+
+
+class PBXProjParseError(ValueError):
+    """Raised when a pbxproj file cannot be parsed.
+
+    :param message: A description of the problem
+    :param line: The line the problem was found on
+    :param column: The column the problem was found at
+    """
+
+    line: int
+    column: int
+
+    def __init__(self, message: str, line: int, column: int) -> None:
+        self.line = line
+        self.column = column
+        super().__init__(f"{message} (line {line}, column {column})")
+
+
+# Whitespace and comments. The quantifiers are possessive to stop the engine
+# backtracking through long runs of whitespace when a token fails to match.
+_SKIP = r"(?:[ \t\r\n]++|/\*[^*]*+\*++(?:[^/*][^*]*+\*++)*+/|//[^\n]*+)*+"
+
+# A quoted or unquoted string. This produces two groups: the quoted contents
+# and the unquoted string. An unquoted string can't start a comment.
+_STRING = r'(?:"([^"\\]*+(?:\\.[^"\\]*+)*+)"|((?!/[*/])[A-Za-z0-9_$+/:.\-]++))'
+
+# Each match consumes any leading whitespace and comments, then one token. The
+# most common sequences (`key = value;`, `key = {` and `value,`) are matched as
+# a single token to minimize the number of matches, since that is what
+# dominates parsing time.
+_TOKEN_PATTERN = re.compile(
+    _SKIP
+    + "(?:"
+    + (_STRING + _SKIP + "=" + _SKIP + "(?:" + _STRING + _SKIP + ";" + "|" + r"([{(])" + ")")
+    + ("|" + _STRING + _SKIP + ",")
+    + ("|" + r"([})])" + _SKIP + "([;,])?")
+    + ("|" + _STRING)
+    + ("|" + r"([{(=;,])")
+    + ("|" + r"<([0-9A-Fa-f \t\r\n]*)>")
+    + ")",
+    re.DOTALL,
+)
+
+_TRAILING_PATTERN = re.compile(_SKIP, re.DOTALL)
+
+_ESCAPE_PATTERN = re.compile(r"\\(?:([0-7]{1,3})|[Uu]([0-9A-Fa-f]{4})|(.))", re.DOTALL)
+
+_SIMPLE_ESCAPES = {
+    "a": "\a",
+    "b": "\b",
+    "f": "\f",
+    "n": "\n",
+    "r": "\r",
+    "t": "\t",
+    "v": "\v",
+}
+
+# The value of `lastindex` for each kind of token
+_ENTRY_QUOTED_VALUE = 3
+_ENTRY_UNQUOTED_VALUE = 4
+_ENTRY_CONTAINER = 5
+_ITEM_QUOTED = 6
+_ITEM_UNQUOTED = 7
+_CLOSE = 8
+_CLOSE_SEPARATED = 9
+_STRING_QUOTED = 10
+_STRING_UNQUOTED = 11
+_PUNCTUATION = 12
+_DATA = 13
+
+# The number of bytes to read from a file at a time
+_BLOCK_SIZE = 1 << 20
+
+# Parser states
+_EXPECT_VALUE = 0
+_EXPECT_KEY_OR_DICT_END = 1
+_EXPECT_EQUALS = 2
+_EXPECT_SEMICOLON = 3
+_EXPECT_VALUE_OR_ARRAY_END = 4
+_EXPECT_COMMA_OR_ARRAY_END = 5
+_EXPECT_END = 6
+
+
+def _replace_escape(match: re.Match[str]) -> str:
+    octal, hexadecimal, character = match.groups()
+
+    if octal is not None:
+        return chr(int(octal, 8))
+
+    if hexadecimal is not None:
+        return chr(int(hexadecimal, 16))
+
+    return _SIMPLE_ESCAPES.get(character, character)
+
+
+def _unescape(value: str) -> str:
+    if "\\" not in value:
+        return value
+    return _ESCAPE_PATTERN.sub(_replace_escape, value)
+
+
+class _Reader:
+    """Supplies text to the parser a block at a time.
+
+    Blocks must end at the end of a line. No token other than a quoted string,
+    a comment or data can span lines, and those fail to match when they are
+    incomplete, so any match against a partial buffer is the same as the match
+    against the complete text.
+
+    :param blocks: The blocks of text to parse
+    """
+
+    text: str
+    line: int
+    column: int
+
+    def __init__(self, blocks: Iterator[str]) -> None:
+        self._blocks = blocks
+        self.text = ""
+
+        # The location of the start of `text` in the complete input
+        self.line = 1
+        self.column = 1
+
+    def refill(self, position: int) -> bool:
+        """Discard the text before the position and append the next block.
+
+        :param position: The position of the first character that hasn't been consumed
+
+        :returns: False if there are no more blocks, True otherwise
+        """
+
+        block = next(self._blocks, None)
+
+        if block is None:
+            return False
+
+        self.line, self.column = self.location(position)
+        self.text = self.text[position:] + block
+        return True
+
+    def location(self, position: int) -> tuple[int, int]:
+        """Get the line and column of a position in the current text.
+
+        :param position: The position in the current text
+
+        :returns: The line and column in the complete input
+        """
+
+        newlines = self.text.count("\n", 0, position)
+
+        if newlines == 0:
+            return self.line, self.column + position
+
+        return self.line + newlines, position - self.text.rfind("\n", 0, position)
+
+    def error(self, message: str, position: int) -> PBXProjParseError:
+        """Create an error for a position in the current text.
+
+        :param message: A description of the problem
+        :param position: The position in the current text
+
+        :returns: The error to raise
+        """
+
+        return PBXProjParseError(message, *self.location(position))
+
+
+def _read_blocks(path: str) -> Iterator[str]:
+    """Read a UTF-8 file in blocks which end at the end of a line.
+
+    :param path: The path of the file to read
+
+    :returns: An iterator over the blocks of text
+    """
+
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    pending = b""
+
+    with open(path, "rb") as input_file:
+        while data := input_file.read(_BLOCK_SIZE):
+            data = pending + data
+            end = data.rfind(b"\n") + 1
+
+            if end == 0:
+                pending = data
+                continue
+
+            pending = data[end:]
+            yield decoder.decode(data[:end])
+
+    yield decoder.decode(pending, final=True)
+
+
+def parse_pbxproj(content: bytes | str, *, object_hook: ObjectHook | None = None) -> dict[str, Any]:
+    """Parse the contents of a pbxproj file.
+
+    Only the subset of the format that Xcode writes is supported: dictionaries,
+    arrays, strings and data. As with `plutil -convert json`, every scalar value
+    (including numbers) is returned as a string. Data values are returned as bytes.
+
+    >>> parse_pbxproj('{ a = 1; b = (x, "y z", ); c = { d = "\\\\"e\\\\""; }; }')
+    {'a': '1', 'b': ['x', 'y z'], 'c': {'d': '"e"'}}
+
+    If an object hook is supplied, it is called with the key and dictionary of
+    each entry in the top level `objects` dictionary as soon as that entry has
+    been read, and its return value is stored in place of the dictionary. This
+    allows objects to be built while parsing rather than from a complete tree.
+
+    >>> parse_pbxproj('{ objects = { A = { isa = X; }; }; }', object_hook=lambda key, value: key + value["isa"])
+    {'objects': {'A': 'AX'}}
+
+    :param content: The raw bytes (UTF-8) or text of the pbxproj
+    :param object_hook: Called with each entry of the `objects` dictionary
+
+    :raises PBXProjParseError: If the content is not a valid property list
+
+    :returns: The root dictionary of the file
+    """
+
+    text = content.decode("utf-8-sig") if isinstance(content, bytes) else content
+    return _parse(_Reader(iter((text,))), object_hook)
+
+
+def load_pbxproj(path: str, *, object_hook: ObjectHook | None = None) -> dict[str, Any]:
+    """Load and parse a pbxproj file.
+
+    The file is read incrementally, so its contents are never held in memory in
+    full.
+
+    :param path: The path to the `project.pbxproj` file
+    :param object_hook: Called with each entry of the `objects` dictionary. See `parse_pbxproj`.
+
+    :raises PBXProjParseError: If the content is not a valid property list
+
+    :returns: The root dictionary of the file
+    """
+
+    return _parse(_Reader(_read_blocks(path)), object_hook)
+
+
+def _parse(reader: _Reader, object_hook: ObjectHook | None) -> dict[str, Any]:
+    """Parse a property list.
+
+    :param reader: The reader supplying the text
+    :param object_hook: Called with each entry of the `objects` dictionary
+
+    :raises PBXProjParseError: If the content is not a valid property list
+
+    :returns: The root dictionary
+    """
+
+    match_token = _TOKEN_PATTERN.match
+    text = reader.text
+    position = 0
+    state = _EXPECT_VALUE
+
+    # The containers currently being built, innermost last, along with the key
+    # each pending dictionary value will be stored under.
+    containers: list[Any] = []
+    pending_keys: list[str | None] = []
+    root: Any = None
+
+    # Keys, object references and many values (such as `isa`) are repeated
+    # throughout the file, so share a single instance of each string
+    memo: dict[str, str] = {}
+    share = memo.setdefault
+
+    while state != _EXPECT_END:
+        match = match_token(text, position)
+
+        if match is None:
+            if reader.refill(position):
+                text = reader.text
+                position = 0
+                continue
+            if _TRAILING_PATTERN.match(text, position).end() == len(text):  # type: ignore[union-attr]
+                raise reader.error("Unexpected end of file", len(text))
+            raise reader.error("Unexpected character", position)
+
+        position = match.end()
+        kind = cast(int, match.lastindex)
+        value: Any
+
+        if kind <= _ENTRY_CONTAINER:
+            if state != _EXPECT_KEY_OR_DICT_END:
+                raise reader.error("Unexpected dictionary entry", match.start(kind))
+
+            quoted_key, key = match.group(1, 2)
+            if key is None:
+                key = _unescape(quoted_key)
+            key = share(key, key)
+
+            if kind == _ENTRY_UNQUOTED_VALUE:
+                value = match.group(kind)
+                containers[-1][key] = share(value, value)
+            elif kind == _ENTRY_QUOTED_VALUE:
+                value = _unescape(match.group(kind))
+                containers[-1][key] = share(value, value)
+            else:
+                pending_keys[-1] = key
+                if match.group(kind) == "{":
+                    containers.append({})
+                    state = _EXPECT_KEY_OR_DICT_END
+                else:
+                    containers.append([])
+                    state = _EXPECT_VALUE_OR_ARRAY_END
+                pending_keys.append(None)
+            continue
+
+        if kind <= _ITEM_UNQUOTED:
+            if state != _EXPECT_VALUE_OR_ARRAY_END:
+                raise reader.error("Unexpected array item", match.start(kind))
+
+            value = match.group(kind) if kind == _ITEM_UNQUOTED else _unescape(match.group(kind))
+            containers[-1].append(share(value, value))
+            continue
+
+        if kind <= _CLOSE_SEPARATED:
+            token = match.group(_CLOSE)
+            closes_dict = token == "}" and state == _EXPECT_KEY_OR_DICT_END
+            closes_array = token == ")" and state in (_EXPECT_VALUE_OR_ARRAY_END, _EXPECT_COMMA_OR_ARRAY_END)
+
+            if not closes_dict and not closes_array:
+                raise reader.error(f"Unexpected '{token}'", match.start(_CLOSE))
+
+            value = containers.pop()
+            pending_keys.pop()
+
+            if object_hook is not None and len(containers) == 2 and pending_keys[0] == "objects" and closes_dict:
+                value = object_hook(cast(str, pending_keys[1]), value)
+
+            if kind == _CLOSE_SEPARATED:
+                separator = match.group(kind)
+
+                if not containers:
+                    raise reader.error("Unexpected content after the root object", match.start(kind))
+
+                if pending_keys[-1] is not None:
+                    if separator != ";":
+                        raise reader.error(f"Expected ';' but found '{separator}'", match.start(kind))
+                    containers[-1][pending_keys[-1]] = value
+                    state = _EXPECT_KEY_OR_DICT_END
+                else:
+                    if separator != ",":
+                        raise reader.error(f"Expected ',' but found '{separator}'", match.start(kind))
+                    containers[-1].append(value)
+                    state = _EXPECT_VALUE_OR_ARRAY_END
+                continue
+
+        elif kind == _PUNCTUATION:
+            token = match.group(kind)
+
+            if state == _EXPECT_EQUALS:
+                if token != "=":
+                    raise reader.error(f"Expected '=' but found '{token}'", match.start(kind))
+                state = _EXPECT_VALUE
+                continue
+
+            if state == _EXPECT_SEMICOLON:
+                if token != ";":
+                    raise reader.error(f"Expected ';' but found '{token}'", match.start(kind))
+                state = _EXPECT_KEY_OR_DICT_END
+                continue
+
+            if state == _EXPECT_COMMA_OR_ARRAY_END and token == ",":
+                state = _EXPECT_VALUE_OR_ARRAY_END
+                continue
+
+            if token in "{(" and state in (_EXPECT_VALUE, _EXPECT_VALUE_OR_ARRAY_END):
+                containers.append({} if token == "{" else [])
+                pending_keys.append(None)
+                state = _EXPECT_KEY_OR_DICT_END if token == "{" else _EXPECT_VALUE_OR_ARRAY_END
+                continue
+
+            raise reader.error(f"Unexpected '{token}'", match.start(kind))
+
+        elif kind == _DATA:
+            if state not in (_EXPECT_VALUE, _EXPECT_VALUE_OR_ARRAY_END):
+                raise reader.error("Unexpected data value", match.start(kind))
+            hex_digits = "".join(match.group(kind).split())
+            if len(hex_digits) % 2 != 0:
+                raise reader.error("Data value has an odd number of digits", match.start(kind))
+            value = bytes.fromhex(hex_digits)
+
+        else:
+            value = match.group(_STRING_UNQUOTED) if kind == _STRING_UNQUOTED else _unescape(match.group(kind))
+            value = share(value, value)
+
+            if state == _EXPECT_KEY_OR_DICT_END:
+                pending_keys[-1] = value
+                state = _EXPECT_EQUALS
+                continue
+
+            if state not in (_EXPECT_VALUE, _EXPECT_VALUE_OR_ARRAY_END):
+                raise reader.error(f"Unexpected string '{value}'", match.start(kind))
+
+        # A complete value has been read, so store it in its parent container
+        if not containers:
+            root = value
+            state = _EXPECT_END
+        elif pending_keys[-1] is not None:
+            containers[-1][pending_keys[-1]] = value
+            state = _EXPECT_SEMICOLON
+        else:
+            containers[-1].append(value)
+            state = _EXPECT_COMMA_OR_ARRAY_END
+
+    # Only whitespace and comments may follow the root object
+    while reader.refill(position):
+        text = reader.text
+        position = 0
+
+    if _TRAILING_PATTERN.match(text, position).end() != len(text):  # type: ignore[union-attr]
+        raise reader.error("Unexpected content after the root object", position)
+
+    if not isinstance(root, dict):
+        raise PBXProjParseError("The root object is not a dictionary", 1, 1)
+
+    return root
@@ -9,7 +9,6 @@ from .pbxobject import PBXObject
 
 
 @deserialize.key("source_tree", "sourceTree")
-@deserialize.ignore("_parent_group_reference")
 @deserialize.downcast_identifier(PBXObject, "PBXPathObject")
 class PBXPathObject(PBXObject):
     """Represents an object with a path (i.e. file or group)."""
@@ -17,37 +16,34 @@ class PBXPathObject(PBXObject):
     path: str | None
     source_tree: str
 
-    _parent_group_reference: str | None
     _relative_path: str | None
 
     def parent_group(self) -> "PBXGroup | None":
         """Find the parent group of a reference.
 
         If a reference happens to be in multiple groups, only the first found
-        instance will be returned.
+        instance will be returned. Use `parent_groups` to get all of them.
 
         :returns: The parent group if found, None otherwise
         """
 
-        if hasattr(self, "_parent_group_reference") and self._parent_group_reference is not None:
-            return cast(
-                PBXGroup,
-                self.project().objects[self._parent_group_reference],
-            )
+        parent_keys = self.project().parent_group_keys(self.object_key)
 
-        group_types_to_check: list[type] = [
-            PBXGroup,
-            PBXVariantGroup,
-            XCVersionGroup,
-        ]
+        if not parent_keys:
+            return None
+
+        return cast(PBXGroup, self.objects()[parent_keys[0]])
 
-        for group_type in group_types_to_check:
-            for group in self.project().fetch_type(group_type).values():
-                if self in group.children:
-                    self._parent_group_reference = group.object_key
-                    return group
+    def parent_groups(self) -> list["PBXGroup | XCVersionGroup"]:
+        """Find all groups which contain this reference.
+
+        :returns: The groups, in the same order that `parent_group` searches them
+        """
 
-        return None
+        return [
+            cast("PBXGroup | XCVersionGroup", self.objects()[parent_key])
+            for parent_key in self.project().parent_group_keys(self.object_key)
+        ]
 
     def relative_path(self) -> str | None:
         """Get the relative path for the group to the source root
@@ -192,6 +188,10 @@ class PBXGroup(PBXPathObject):
     uses_tabs: bool | None
     name: str | None
 
+    def referenced_keys(self) -> list[str]:
+        """Get the keys in `children_ids`."""
+        return list(self.children_ids)
+
     @property
     def children(self) -> list[PBXPathObject]:
         """Get all the children for this group.
@@ -257,6 +257,10 @@ class XCVersionGroup(PBXPathObject):
     version_group_type: str
     name: str | None
 
+    def referenced_keys(self) -> list[str]:
+        """Get the keys in `child_ids` and `current_version`."""
+        return [*self.child_ids, self.current_version]
+
     @property
     def children(self) -> list[PBXPathObject]:
         """Get all the children for this group.
@@ -280,6 +284,10 @@ class PBXReferenceProxy(PBXPathObject):
     remote_ref: str
     source_tree: str
 
+    def referenced_keys(self) -> list[str]:
+        """Get the key in `remote_ref`."""
+        return [self.remote_ref]
+
 
 @deserialize.auto_snake()
 @deserialize.key("explicit_file_types", "explicitFileTypes")
@@ -299,3 +307,7 @@ class PBXFileSystemSynchronizedRootGroup(PBXPathObject):
     exception_ids: list[str]
     explicit_file_types: dict[str, str]
     explicit_folders: list[str]
+
+    def referenced_keys(self) -> list[str]:
+        """Get the keys in `exception_ids`."""
+        return list(self.exception_ids)
@@ -32,6 +32,16 @@ class PBXObject:
             new_dict[key] = value
         return new_dict
 
+    def referenced_keys(self) -> list[str]:
+        """Get the keys of the objects this object refers to.
+
+        Subclasses list the keys from each of their fields which hold an
+        object key.
+
+        :returns: The referenced keys, in field order
+        """
+        return []
+
     def objects(self) -> Objects:
         """Resolve objects reference.
 
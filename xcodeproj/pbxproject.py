@@ -39,6 +39,17 @@ class PBXProject(PBXObject):
     minimized_project_reference_proxies: str | None
     preferred_project_object_version: str | None
 
+    def referenced_keys(self) -> list[str]:
+        """Get the keys in the configuration list, groups, targets, project references and packages."""
+        keys = [self.build_configuration_list_id, self.main_group_id]
+        if self.product_ref_group is not None:
+            keys.append(self.product_ref_group)
+        keys.extend(self.target_ids)
+        for project_reference in self.project_references or []:
+            keys.extend([project_reference.product_group, project_reference.project_ref])
+        keys.extend(self.package_references or [])
+        return keys
+
     @property
     def targets(self) -> list[PBXTarget]:
         """Get the targets in the project."""
@@ -0,0 +1,293 @@
+"""Loading of the projects a project refers to."""
+
+import concurrent.futures
+import os
+import threading
+from collections.abc import Callable
+from typing import TYPE_CHECKING, cast
+
+from .other import PBXContainerItemProxy, PBXTargetDependency
+from .pathobjects import PBXFileReference, PBXReferenceProxy
+from .pbxobject import PBXObject
+
+if TYPE_CHECKING:
+    from . import XcodeProject
+
+
+def _normalized(path: str) -> str:
+    """Normalize the path of a project, so that each project has one path.
+
+    :param path: The path of the project
+
+    :returns: The normalized path
+    """
+
+    return os.path.normcase(os.path.realpath(path))
+
+
+class ProjectGraph:
+    """A project and the projects it refers to, loaded as they are needed.
+
+    Projects are loaded on a thread pool, and each project is only loaded
+    once however many projects refer to it. By default projects are loaded
+    with `XcodeProject.from_cache`, so any cached projects are shared.
+
+    Referenced projects which don't exist are skipped by `load_all`, and
+    their paths are kept in `missing_project_paths`.
+
+    :param root: The project to start from
+    :param loader: The function to load a project from its path. Defaults to `XcodeProject.from_cache`.
+    :param max_workers: The maximum number of projects to load at the same time
+    """
+
+    _root: "XcodeProject"
+    _loader: Callable[[str], "XcodeProject"]
+    _max_workers: int | None
+    _lock: threading.Lock
+    _executor: concurrent.futures.ThreadPoolExecutor | None
+    _futures: dict[str, "concurrent.futures.Future[XcodeProject]"]
+    missing_project_paths: list[str]
+
+    def __init__(
+        self,
+        root: "XcodeProject",
+        *,
+        loader: Callable[[str], "XcodeProject"] | None = None,
+        max_workers: int | None = None,
+    ) -> None:
+        self._root = root
+        self._loader = loader if loader is not None else type(root).from_cache
+        self._max_workers = max_workers
+        self._lock = threading.Lock()
+        self._executor = None
+        self.missing_project_paths = []
+
+        root_future: concurrent.futures.Future[XcodeProject] = concurrent.futures.Future()
+        root_future.set_result(root)
+        self._futures = {_normalized(root.path): root_future}
+
+    def __enter__(self) -> "ProjectGraph":
+        return self
+
+    def __exit__(self, *args: object) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Stop the threads used to load projects. Loaded projects can still be used."""
+
+        with self._lock:
+            executor = self._executor
+            self._executor = None
+
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+    @property
+    def root(self) -> "XcodeProject":
+        """Get the project the graph starts from."""
+        return self._root
+
+    def loaded_projects(self) -> dict[str, "XcodeProject"]:
+        """Get the projects which have been loaded so far.
+
+        :returns: The projects, keyed by their normalized path
+        """
+
+        with self._lock:
+            futures = dict(self._futures)
+
+        return {
+            path: future.result() for path, future in futures.items() if future.done() and future.exception() is None
+        }
+
+    def referenced_project_paths(self, project: "XcodeProject") -> list[str]:
+        """Get the paths of the projects a project refers to.
+
+        :param project: The project
+
+        :returns: The paths, in the order they are referenced
+        """
+
+        paths: list[str] = []
+
+        for project_reference in project.project.project_references or []:
+            file_reference = project.objects.get(project_reference.project_ref)
+
+            if not isinstance(file_reference, PBXFileReference):
+                continue
+
+            path = file_reference.absolute_path()
+
+            # Projects relative to build variables can't be found
+            if path is not None and not path.startswith("$("):
+                paths.append(path)
+
+        return paths
+
+    def project_at(self, path: str) -> "XcodeProject":
+        """Get the project at a path, loading it if it hasn't been already.
+
+        :param path: The path of the project
+
+        :returns: The project
+        """
+
+        return self._submit(path).result()
+
+    def load_all(self) -> dict[str, "XcodeProject"]:
+        """Load every project which can be reached from the root project.
+
+        Projects are loaded concurrently, and the projects each one refers to
+        are queued as soon as it has loaded. Projects which don't exist are
+        added to `missing_project_paths` and the rest are still loaded.
+
+        :raises Exception: If a project which exists fails to load
+
+        :returns: The projects, keyed by their normalized path
+        """
+
+        visited = {_normalized(self._root.path)}
+        pending = {self._submit(path): path for path in self._new_paths(self._root, visited)}
+        missing_project_paths: list[str] = []
+
+        while pending:
+            done, _ = concurrent.futures.wait(pending, return_when=concurrent.futures.FIRST_COMPLETED)
+
+            for future in done:
+                path = pending.pop(future)
+
+                try:
+                    project = future.result()
+                except FileNotFoundError:
+                    missing_project_paths.append(path)
+                    continue
+
+                pending.update((self._submit(new_path), new_path) for new_path in self._new_paths(project, visited))
+
+        self.missing_project_paths = sorted(missing_project_paths)
+
+        return self.loaded_projects()
+
+    def project_for_portal(self, project: "XcodeProject", container_portal: str) -> "XcodeProject":
+        """Get the project a container portal refers to.
+
+        :param project: The project the portal is in
+        :param container_portal: The key of the portal, which is either the
+            project object or a reference to another project
+
+        :raises KeyError: If the portal isn't in the project
+
+        :returns: The project
+        """
+
+        if container_portal == project.project.object_key:
+            return project
+
+        file_reference = project.objects[container_portal]
+        path = file_reference.absolute_path() if isinstance(file_reference, PBXFileReference) else None
+
+        if path is None:
+            raise KeyError(f"Container portal {container_portal} doesn't refer to a project")
+
+        return self.project_at(path)
+
+    def resolve_proxy(self, project: "XcodeProject", proxy: PBXContainerItemProxy) -> tuple["XcodeProject", PBXObject]:
+        """Get the object a container item proxy stands for, in whichever project it is in.
+
+        :param project: The project the proxy is in
+        :param proxy: The proxy
+
+        :raises KeyError: If the object can't be found
+
+        :returns: The project the object is in, and the object
+        """
+
+        remote_project = self.project_for_portal(project, proxy.container_portal)
+        return remote_project, remote_project.objects[proxy.remote_global_id_string]
+
+    def resolve_reference_proxy(
+        self, project: "XcodeProject", reference_proxy: PBXReferenceProxy
+    ) -> tuple["XcodeProject", PBXObject]:
+        """Get the object a reference proxy stands for, usually a product of another project.
+
+        :param project: The project the reference proxy is in
+        :param reference_proxy: The reference proxy
+
+        :raises KeyError: If the object can't be found
+
+        :returns: The project the object is in, and the object
+        """
+
+        proxy = project.objects[reference_proxy.remote_ref]
+
+        if not isinstance(proxy, PBXContainerItemProxy):
+            raise KeyError(f"Reference proxy {reference_proxy.object_key} doesn't refer to a container item proxy")
+
+        return self.resolve_proxy(project, proxy)
+
+    def resolve_target_dependency(
+        self, project: "XcodeProject", dependency: PBXTargetDependency
+    ) -> tuple["XcodeProject", PBXObject]:
+        """Get the target a target dependency refers to, in whichever project it is in.
+
+        :param project: The project the dependency is in
+        :param dependency: The dependency
+
+        :raises KeyError: If the target can't be found
+
+        :returns: The project the target is in, and the target
+        """
+
+        if dependency.target is not None:
+            return project, project.objects[dependency.target]
+
+        proxy = project.objects[dependency.target_proxy]
+
+        if not isinstance(proxy, PBXContainerItemProxy):
+            raise KeyError(f"Target dependency {dependency.object_key} doesn't refer to a container item proxy")
+
+        return self.resolve_proxy(project, proxy)
+
+    def _new_paths(self, project: "XcodeProject", visited: set[str]) -> list[str]:
+        """Get the paths of the projects a project refers to which haven't been seen yet.
+
+        :param project: The project
+        :param visited: The normalized paths seen so far, which is updated
+
+        :returns: The new paths
+        """
+
+        paths = []
+
+        for path in self.referenced_project_paths(project):
+            normalized = _normalized(path)
+
+            if normalized not in visited:
+                visited.add(normalized)
+                paths.append(path)
+
+        return paths
+
+    def _submit(self, path: str) -> "concurrent.futures.Future[XcodeProject]":
+        """Start loading a project, unless it is already loading or loaded.
+
+        :param path: The path of the project
+
+        :returns: The future for the project
+        """
+
+        normalized = _normalized(path)
+
+        with self._lock:
+            future = self._futures.get(normalized)
+
+            if future is None:
+                if self._executor is None:
+                    self._executor = concurrent.futures.ThreadPoolExecutor(
+                        max_workers=self._max_workers, thread_name_prefix="xcodeproj"
+                    )
+
+                future = self._executor.submit(self._loader, path)
+                self._futures[normalized] = future
+
+        return cast("concurrent.futures.Future[XcodeProject]", future)
@@ -0,0 +1,372 @@
+"""Streaming scheme parser.
+
+`Scheme.from_file` builds an ElementTree of the whole file and then walks it
+again to build the scheme. This parser builds the scheme objects directly
+from the events of an expat parser instead, so no tree is ever built. This
+matters for schemes listing thousands of tests in `SelectedTests` or
+`SkippedTests`.
+
+Each object is created when its element starts, with the same constructor
+used by `Scheme.from_file`, given a stand-in for the element which holds the
+attributes dictionary from expat and has no children. The items of a list
+share one stand-in, so no element is allocated for each of them. Their
+children are then attached as they are parsed, following the same rules as
+the constructors, so unknown elements and attributes fail in the same way.
+"""
+
+import os
+import xml.parsers.expat
+from collections.abc import Callable, Iterator
+from typing import Any
+
+from .schemes import (
+    KV,
+    Action,
+    ActionContent,
+    AdditionalOption,
+    AnalyzeAction,
+    ArchiveAction,
+    BuildableProductRunnable,
+    BuildableReference,
+    BuildAction,
+    BuildActionEntry,
+    CodeCoverageTargets,
+    CommandLineArgument,
+    EnvironmentBuildable,
+    EnvironmentVariable,
+    ExecutionAction,
+    LaunchAction,
+    LocationScenarioReference,
+    MacroExpansion,
+    ProfileAction,
+    RemoteRunnable,
+    RunAction,
+    Scheme,
+    Test,
+    TestableReference,
+    TestAction,
+    TestPlanReference,
+)
+
+# The children which are single objects, as the class and the attribute they are stored in
+_OBJECT_CHILDREN: dict[type[Any], dict[str, tuple[type[Any], str]]] = {
+    Scheme: {
+        "BuildAction": (BuildAction, "build_action"),
+        "TestAction": (TestAction, "test_action"),
+        "LaunchAction": (LaunchAction, "launch_action"),
+        "ProfileAction": (ProfileAction, "profile_action"),
+        "AnalyzeAction": (AnalyzeAction, "analyze_action"),
+        "ArchiveAction": (ArchiveAction, "archive_action"),
+    },
+    Action: {"MacroExpansion": (MacroExpansion, "macro_expansion")},
+    RunAction: {"RemoteRunnable": (RemoteRunnable, "remote_runnable")},
+    TestAction: {"CodeCoverageTargets": (CodeCoverageTargets, "code_coverage_targets")},
+    LaunchAction: {"BuildableProductRunnable": (BuildableProductRunnable, "buildable_product_runnable")},
+    ProfileAction: {"BuildableProductRunnable": (BuildableProductRunnable, "buildable_product_runnable")},
+    TestableReference: {"LocationScenarioReference": (LocationScenarioReference, "location_scenario_reference")},
+    ActionContent: {"EnvironmentBuildable": (EnvironmentBuildable, "environment_buildable")},
+    ExecutionAction: {"ActionContent": (ActionContent, "action_content")},
+}
+
+# The children which hold a list, as the list attribute, and the tag and class of the items
+_CONTAINER_CHILDREN: dict[type[Any], dict[str, tuple[str, str, type[Any]]]] = {
+    Action: {
+        "CommandLineArguments": ("command_line_arguments", "CommandLineArgument", CommandLineArgument),
+        "EnvironmentVariables": ("environment_variables", "EnvironmentVariable", EnvironmentVariable),
+        "AdditionalOptions": ("additional_options", "AdditionalOption", AdditionalOption),
+        "PreActions": ("pre_actions", "ExecutionAction", ExecutionAction),
+        "PostActions": ("post_actions", "ExecutionAction", ExecutionAction),
+    },
+    BuildAction: {"BuildActionEntries": ("build_action_entries", "BuildActionEntry", BuildActionEntry)},
+    TestAction: {
+        "Testables": ("testables", "TestableReference", TestableReference),
+        "TestPlans": ("test_plans", "TestPlanReference", TestPlanReference),
+    },
+    TestableReference: {
+        "SelectedTests": ("selected_tests", "Test", Test),
+        "SkippedTests": ("skipped_tests", "Test", Test),
+    },
+}
+
+# The classes with a list of buildable references as their only children
+_BUILDABLE_REFERENCE_OWNERS = (
+    BuildActionEntry,
+    MacroExpansion,
+    CodeCoverageTargets,
+    RemoteRunnable,
+    BuildableProductRunnable,
+    EnvironmentBuildable,
+    TestableReference,
+)
+
+
+def _rules_for(
+    class_reference: type[Any],
+) -> tuple[dict[str, tuple[type[Any], str]], dict[str, tuple[str, str, type[Any]]]]:
+    """Collect the rules for the children of a class, including those of its base classes.
+
+    :param class_reference: The class
+
+    :returns: The rules for object children and container children
+    """
+
+    object_children: dict[str, tuple[type[Any], str]] = {}
+    container_children: dict[str, tuple[str, str, type[Any]]] = {}
+
+    for base in reversed(class_reference.__mro__):
+        object_children.update(_OBJECT_CHILDREN.get(base, {}))
+        container_children.update(_CONTAINER_CHILDREN.get(base, {}))
+
+    return object_children, container_children
+
+
+_RULES = {
+    class_reference: _rules_for(class_reference)
+    for class_reference in {
+        *_OBJECT_CHILDREN,
+        *_CONTAINER_CHILDREN,
+        *(child for children in _OBJECT_CHILDREN.values() for child, _ in children.values()),
+        *(child for children in _CONTAINER_CHILDREN.values() for _, _, child in children.values()),
+        *_BUILDABLE_REFERENCE_OWNERS,
+        BuildableReference,
+    }
+}
+
+
+class _Element:
+    """A stand-in for an element with attributes but no children, to pass to the scheme constructors.
+
+    The constructors pop the attributes they understand and don't keep the
+    element, so it can be reused by setting its attributes again.
+
+    :param tag: The tag of the element
+    :param attrib: The attributes of the element
+    """
+
+    __slots__ = ("attrib", "tag")
+
+    tag: str
+    attrib: dict[str, str]
+
+    def __init__(self, tag: str, attrib: dict[str, str]) -> None:
+        self.tag = tag
+        self.attrib = attrib
+
+    def __iter__(self) -> Iterator[Any]:
+        return iter(())
+
+
+# Handles a child element of an object, and returns the handler for the child's own children
+_ChildHandler = Callable[[str, dict[str, str]], "_ChildHandler"]
+
+# The classes which can't have any children
+_LEAF_CLASSES = (BuildableReference, CommandLineArgument, KV, Test, TestPlanReference)
+
+
+def _no_children(tag: str, _attributes: dict[str, str]) -> _ChildHandler:
+    """Handle a child of an object which can't have any.
+
+    :param tag: The tag of the child
+    :param _attributes: The attributes of the child
+
+    :raises AssertionError: Always
+    """
+
+    raise AssertionError(f"Unknown child: {tag}")
+
+
+def _ignored_children(_tag: str, _attributes: dict[str, str]) -> _ChildHandler:
+    """Handle a child which isn't stored, along with everything in it.
+
+    :param _tag: The tag of the child
+    :param _attributes: The attributes of the child
+
+    :returns: This handler, for the child's own children
+    """
+
+    return _ignored_children
+
+
+def _container_children(items: list[Any], item_tag: str, item_class: type[Any]) -> _ChildHandler:
+    """Create the handler for the children of an element which holds a list.
+
+    :param items: The list to add the items to
+    :param item_tag: The tag each item has
+    :param item_class: The class of each item
+
+    :returns: The handler
+    """
+
+    element = _Element(item_tag, {})
+    append = items.append
+    is_leaf = issubclass(item_class, _LEAF_CLASSES)
+
+    # This is called for every test in a scheme, so avoids allocating anything but the item
+    def handle(tag: str, attributes: dict[str, str]) -> _ChildHandler:
+        if tag != item_tag:
+            raise AssertionError(f"Unknown child: {tag}")
+
+        element.attrib = attributes
+        item = item_class(element)
+        append(item)
+        return _no_children if is_leaf else _children_handler(item)
+
+    return handle
+
+
+def _children_handler(owner: Any) -> _ChildHandler:
+    """Get the handler for the children of an object.
+
+    :param owner: The object
+
+    :returns: The handler
+    """
+
+    if isinstance(owner, _LEAF_CLASSES):
+        return _no_children
+
+    # Location scenario references don't look at their children at all
+    if isinstance(owner, LocationScenarioReference):
+        return _ignored_children
+
+    return lambda tag, attributes: _object_child(owner, tag, attributes)
+
+
+def _object_child(owner: Any, tag: str, attributes: dict[str, str]) -> _ChildHandler:
+    """Attach a child element to the object it is in.
+
+    :param owner: The object the element is in
+    :param tag: The tag of the element
+    :param attributes: The attributes of the element
+
+    :raises AssertionError: If the element isn't allowed in the object
+
+    :returns: The handler for the element's own children
+    """
+
+    if isinstance(owner, ExecutionAction):
+        assert owner.action_content is None
+
+    object_children, container_children = _RULES[type(owner)]
+
+    if tag == "BuildableReference" and isinstance(owner, _BUILDABLE_REFERENCE_OWNERS):
+        owner.buildable_references.append(BuildableReference(_Element(tag, attributes)))
+        return _no_children
+
+    object_child = object_children.get(tag)
+
+    if object_child is not None:
+        child_class, attribute_name = object_child
+        child = child_class(_Element(tag, attributes))
+        setattr(owner, attribute_name, child)
+        return _children_handler(child)
+
+    container_child = container_children.get(tag)
+
+    if container_child is not None:
+        assert len(attributes) == 0, f"Unhandled attributes: {list(attributes.keys())}"
+        list_name, item_tag, item_class = container_child
+        return _container_children(getattr(owner, list_name), item_tag, item_class)
+
+    # Actions ignore children they understand but don't store
+    if isinstance(owner, Action):
+        assert owner._understands_tag(tag)
+        return _ignored_children
+
+    raise AssertionError(f"Unknown child: {tag}")
+
+
+class _SchemeBuilder:
+    """Builds a scheme from the events of an expat parser.
+
+    The stack holds the handler for the children of each open element, so
+    each event only has to call the handler at the top.
+
+    :param name: The name of the scheme
+    """
+
+    scheme: Scheme | None
+    _stack: list[_ChildHandler]
+
+    def __init__(self, name: str) -> None:
+        self.scheme = None
+
+        def root(tag: str, attributes: dict[str, str]) -> _ChildHandler:
+            assert self.scheme is None, "Scheme has more than one root element"
+            self.scheme = Scheme(_Element(tag, attributes), name)
+            return _children_handler(self.scheme)
+
+        self._stack = [root]
+
+    def parser(self) -> "xml.parsers.expat.XMLParserType":
+        """Create an expat parser which passes its events to this builder.
+
+        :returns: The parser
+        """
+
+        stack = self._stack
+        push = stack.append
+        pop = stack.pop
+
+        # These are called for every element, so are kept as small as possible
+        def start(tag: str, attributes: dict[str, str]) -> None:
+            push(stack[-1](tag, attributes))
+
+        def end(_tag: str) -> None:
+            pop()
+
+        parser = xml.parsers.expat.ParserCreate()
+        parser.StartElementHandler = start
+        parser.EndElementHandler = end
+        return parser
+
+    def built_scheme(self) -> Scheme:
+        """Get the scheme which was built.
+
+        :raises AssertionError: If the document had no elements
+
+        :returns: The scheme
+        """
+
+        assert self.scheme is not None, "Scheme has no root element"
+        return self.scheme
+
+
+def parse_scheme_file(path: str) -> Scheme:
+    """Load a scheme from a file, without building an ElementTree.
+
+    This gives the same results as `Scheme.from_file`.
+
+    :param path: The path of the scheme file
+
+    :raises xml.parsers.expat.ExpatError: If the file isn't valid XML
+    :raises AssertionError: If the scheme contains elements or attributes which aren't understood
+
+    :returns: A loaded scheme
+    """
+
+    builder = _SchemeBuilder(".".join(os.path.basename(path).split(".")[:-1]))
+
+    with open(path, "rb") as scheme_file:
+        builder.parser().ParseFile(scheme_file)
+
+    return builder.built_scheme()
+
+
+def parse_scheme_string(contents: str, name: str) -> Scheme:
+    """Load a scheme from a string, without building an ElementTree.
+
+    This gives the same results as `Scheme.from_string`.
+
+    :param contents: The XML string
+    :param name: The name of the scheme
+
+    :raises xml.parsers.expat.ExpatError: If the string isn't valid XML
+    :raises AssertionError: If the scheme contains elements or attributes which aren't understood
+
+    :returns: A loaded scheme
+    """
+
+    builder = _SchemeBuilder(name)
+    builder.parser().Parse(contents, True)
+    return builder.built_scheme()
@@ -1,7 +1,11 @@
 """Schemes"""
 
+import concurrent.futures
 import os
 import xml.etree.ElementTree as ET
+from collections.abc import Sequence
+
+from .workspace import resolve_location
 
 
 class Action:
@@ -74,21 +78,21 @@ class Action:
                     if option.tag == "AdditionalOption":
                         self.additional_options.append(AdditionalOption(option))
                     else:
-                        raise AssertionError(f"Unknown child: {variable.tag}")
+                        raise AssertionError(f"Unknown child: {option.tag}")
             elif child.tag == "PreActions":
                 assert len(child.attrib) == 0, f"Unhandled attributes: {list(child.attrib.keys())}"
                 for action in child:
                     if action.tag == "ExecutionAction":
                         self.pre_actions.append(ExecutionAction(action))
                     else:
-                        raise AssertionError(f"Unknown child: {variable.tag}")
+                        raise AssertionError(f"Unknown child: {action.tag}")
             elif child.tag == "PostActions":
                 assert len(child.attrib) == 0, f"Unhandled attributes: {list(child.attrib.keys())}"
                 for action in child:
                     if action.tag == "ExecutionAction":
                         self.post_actions.append(ExecutionAction(action))
                     else:
-                        raise AssertionError(f"Unknown child: {variable.tag}")
+                        raise AssertionError(f"Unknown child: {action.tag}")
 
     def _understands_tag(self, tag: str) -> bool:
         return tag in self._understood_tags
@@ -576,3 +580,276 @@ class Scheme:
         """
         root = ET.fromstring(contents)
         return Scheme(root, name)
+
+
+class SchemeFile:
+    """An xcscheme file in a project, which hasn't necessarily been parsed.
+
+    :param name: The name of the scheme
+    :param path: The path of the file
+    :param user: The user the scheme belongs to, or None if it is shared
+    """
+
+    name: str
+    path: str
+    user: str | None
+
+    def __init__(self, name: str, path: str, user: str | None) -> None:
+        self.name = name
+        self.path = path
+        self.user = user
+
+    @property
+    def is_shared(self) -> bool:
+        """Check if the scheme is shared rather than belonging to a user."""
+        return self.user is None
+
+    def __repr__(self) -> str:
+        owner = "shared" if self.user is None else f"user {self.user}"
+        return f"SchemeFile({self.name!r}, {owner})"
+
+
+def _scheme_files_in(folder: str, user: str | None) -> list[SchemeFile]:
+    """Find the xcscheme files in a folder.
+
+    :param folder: The folder the schemes are in
+    :param user: The user the schemes belong to, or None if they are shared
+
+    :returns: The scheme files, sorted by name
+    """
+
+    try:
+        with os.scandir(folder) as entries:
+            scheme_files = [
+                SchemeFile(entry.name[: -len(".xcscheme")], entry.path, user)
+                for entry in entries
+                if entry.name.endswith(".xcscheme") and entry.is_file()
+            ]
+    except OSError:
+        return []
+
+    scheme_files.sort(key=lambda scheme_file: scheme_file.name)
+    return scheme_files
+
+
+def find_scheme_files(project_path: str) -> list[SchemeFile]:
+    """Find the schemes in a project without parsing them.
+
+    Only the folders Xcode keeps schemes in are looked at:
+    `xcshareddata/xcschemes` for shared schemes and
+    `xcuserdata/<user>.xcuserdatad/xcschemes` for each user's schemes.
+
+    :param project_path: The path to the xcodeproj
+
+    :returns: The shared schemes, then the schemes of each user, sorted by
+        user and then name
+    """
+
+    scheme_files = _scheme_files_in(os.path.join(project_path, "xcshareddata", "xcschemes"), None)
+
+    try:
+        with os.scandir(os.path.join(project_path, "xcuserdata")) as entries:
+            user_folders = sorted(
+                (entry.name.removesuffix(".xcuserdatad"), entry.path)
+                for entry in entries
+                if entry.name.endswith(".xcuserdatad") and entry.is_dir()
+            )
+    except OSError:
+        user_folders = []
+
+    for user, user_folder in user_folders:
+        scheme_files.extend(_scheme_files_in(os.path.join(user_folder, "xcschemes"), user))
+
+    return scheme_files
+
+
+def parse_scheme_files(
+    paths: list[str],
+    *,
+    max_workers: int | None = None,
+    use_processes: bool = False,
+) -> list[Scheme]:
+    """Parse many scheme files at once.
+
+    :param paths: The paths of the scheme files
+    :param max_workers: The maximum number of files to parse at the same time
+    :param use_processes: Set to True to parse on a process pool rather than a
+        thread pool. This is only worth it for a large number of schemes.
+
+    :returns: The parsed schemes, in the same order as the paths
+    """
+
+    # Starting a pool isn't worth it for a single scheme
+    if len(paths) <= 1 or max_workers == 1:
+        return [Scheme.from_file(path) for path in paths]
+
+    executor_type = concurrent.futures.ProcessPoolExecutor if use_processes else concurrent.futures.ThreadPoolExecutor
+
+    with executor_type(max_workers=max_workers) as executor:
+        return list(executor.map(Scheme.from_file, paths))
+
+
+# The actions a scheme can use a target in
+SCHEME_ACTIONS = ("build", "test", "launch", "profile", "archive")
+
+
+def scheme_buildable_references(scheme: Scheme) -> dict[str, list[BuildableReference]]:
+    """Get the buildable references a scheme uses for each action.
+
+    Building covers every build action entry, whichever actions it is built
+    for, while archiving only covers the entries built for archiving. Testing
+    covers the testables which aren't skipped, and launching and profiling
+    cover the runnables.
+
+    :param scheme: The scheme
+
+    :returns: The references, keyed by action
+    """
+
+    references: dict[str, list[BuildableReference]] = {action: [] for action in SCHEME_ACTIONS}
+
+    if scheme.build_action is not None:
+        for entry in scheme.build_action.build_action_entries:
+            references["build"].extend(entry.buildable_references)
+
+            if entry.build_for_archiving:
+                references["archive"].extend(entry.buildable_references)
+
+    if scheme.test_action is not None:
+        for testable in scheme.test_action.testables:
+            if not testable.skipped:
+                references["test"].extend(testable.buildable_references)
+
+    for action_name, action in [("launch", scheme.launch_action), ("profile", scheme.profile_action)]:
+        if action is None:
+            continue
+
+        if action.buildable_product_runnable is not None:
+            references[action_name].extend(action.buildable_product_runnable.buildable_references)
+
+        remote_runnable = getattr(action, "remote_runnable", None)
+
+        if remote_runnable is not None:
+            references[action_name].extend(remote_runnable.buildable_references)
+
+    return references
+
+
+class SchemeTargetIndex:
+    """Links the schemes of a project to the targets they use, in both directions.
+
+    Targets are identified by the path of the project they are in and their
+    object key, which is the blueprint identifier of a buildable reference.
+    A reference's `ReferencedContainer` can point to another project, so
+    targets aren't necessarily in the project the schemes are in.
+
+    :param project_path: The path to the xcodeproj the schemes are in
+    :param schemes: Each scheme file along with its parsed scheme
+    """
+
+    project_path: str
+    _scheme_files: dict[str, SchemeFile]
+    _targets_by_scheme: dict[str, dict[str, list[tuple[str, str]]]]
+    _schemes_by_target: dict[tuple[str, str], dict[str, list[str]]]
+
+    def __init__(self, project_path: str, schemes: Sequence[tuple[SchemeFile, Scheme]]) -> None:
+        self.project_path = os.path.normpath(os.path.abspath(project_path))
+        self._scheme_files = {}
+        self._targets_by_scheme = {}
+        self._schemes_by_target = {}
+
+        container_folder = os.path.dirname(self.project_path)
+
+        for scheme_file, scheme in schemes:
+            self._scheme_files[scheme_file.path] = scheme_file
+            scheme_targets = self._targets_by_scheme.setdefault(scheme_file.path, {})
+
+            for action, references in scheme_buildable_references(scheme).items():
+                action_targets = scheme_targets.setdefault(action, [])
+
+                for reference in references:
+                    if reference.blueprint_identifier is None:
+                        continue
+
+                    if reference.referenced_container is None:
+                        target_project_path: str | None = self.project_path
+                    else:
+                        target_project_path = resolve_location(
+                            reference.referenced_container,
+                            group_folder=container_folder,
+                            container_folder=container_folder,
+                            self_folder=self.project_path,
+                        )
+
+                    if target_project_path is None:
+                        continue
+
+                    target = (target_project_path, reference.blueprint_identifier)
+
+                    if target in action_targets:
+                        continue
+
+                    action_targets.append(target)
+                    target_schemes = self._schemes_by_target.setdefault(target, {}).setdefault(action, [])
+
+                    if scheme_file.path not in target_schemes:
+                        target_schemes.append(scheme_file.path)
+
+    def schemes_for_target(
+        self,
+        target_key: str,
+        *,
+        project_path: str | None = None,
+        action: str | None = None,
+    ) -> list[SchemeFile]:
+        """Get the schemes which use a target.
+
+        :param target_key: The object key of the target
+        :param project_path: The path to the xcodeproj the target is in, if it
+            isn't the one the schemes are in
+        :param action: The action to limit the results to, such as "test", or
+            None for any action
+
+        :raises ValueError: If the action isn't one of `SCHEME_ACTIONS`
+
+        :returns: The schemes, in the order they were given to the index
+        """
+
+        if action is not None and action not in SCHEME_ACTIONS:
+            raise ValueError(f"Unknown scheme action: {action}")
+
+        project_path = os.path.normpath(os.path.abspath(project_path or self.project_path))
+        actions = self._schemes_by_target.get((project_path, target_key), {})
+        scheme_paths = {
+            scheme_path
+            for action_name, action_schemes in actions.items()
+            if action is None or action_name == action
+            for scheme_path in action_schemes
+        }
+
+        return [scheme_file for path, scheme_file in self._scheme_files.items() if path in scheme_paths]
+
+    def targets_for_scheme(self, scheme_path: str, *, action: str | None = None) -> list[tuple[str, str]]:
+        """Get the targets a scheme uses.
+
+        :param scheme_path: The path of the scheme file
+        :param action: The action to limit the results to, such as "build", or
+            None for any action
+
+        :raises ValueError: If the action isn't one of `SCHEME_ACTIONS`
+
+        :returns: The path to the xcodeproj each target is in and its object
+            key, in the order the scheme lists them
+        """
+
+        if action is not None and action not in SCHEME_ACTIONS:
+            raise ValueError(f"Unknown scheme action: {action}")
+
+        actions = self._targets_by_scheme.get(scheme_path, {})
+        targets: dict[tuple[str, str], None] = {}
+
+        for action_name in SCHEME_ACTIONS:
+            if action is None or action_name == action:
+                targets.update(dict.fromkeys(actions.get(action_name, [])))
+
+        return list(targets)
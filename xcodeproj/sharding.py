@@ -0,0 +1,374 @@
+"""Splitting the tests of a scheme across machines.
+
+The tests a scheme runs are split into units, each of which is given to one
+shard. A testable which selects its tests is split into a unit per test. One
+which has tests listed in the historical durations is split into a unit per
+suite, and a suite is split into a unit per test if it would take its shard
+past an even share of the work. Otherwise there is no way to know a
+testable's tests without building it, so it is a single unit, as is any
+testable which isn't parallelizable.
+
+Units are assigned longest first, each to the shard with the least work so
+far. The longest shard is then at most a third longer than it would be with
+the best possible split.
+
+The durations can't list tests added since they were recorded, so each
+testable split using them also gets a catch-all unit, which runs the whole
+testable except for the suites and tests given to other shards. Tests added
+to a suite which is kept whole run with the rest of the suite, and keeping
+suites whole keeps the catch-all's list of skipped tests short.
+"""
+
+import heapq
+import itertools
+import json
+import math
+from collections.abc import Mapping
+
+from .schemes import Scheme, TestableReference
+
+# The most tests of each testable which are split out of their suites by default
+DEFAULT_MAX_SPLIT_TESTS = 1000
+
+
+class TestShard:
+    """The tests one machine should run.
+
+    :param index: The position of the shard, from 0
+    """
+
+    index: int
+    only_testing: list[str]
+    skip_testing: list[str]
+    duration: float
+
+    # Stop pytest trying to collect this as a test class
+    __test__ = False
+
+    def __init__(self, index: int) -> None:
+        self.index = index
+        self.only_testing = []
+        self.skip_testing = []
+        self.duration = 0.0
+
+    def arguments(self) -> list[str]:
+        """Get the arguments to pass to xcodebuild to run the shard's tests.
+
+        :returns: The `-only-testing` and `-skip-testing` arguments
+        """
+
+        return [f"-only-testing:{test}" for test in self.only_testing] + [
+            f"-skip-testing:{test}" for test in self.skip_testing
+        ]
+
+    def __repr__(self) -> str:
+        return f"TestShard({self.index}, tests={len(self.only_testing)}, duration={self.duration:.1f})"
+
+
+class _TestUnit:
+    """Tests which go to the same shard.
+
+    :param only_testing: The identifiers to pass to `-only-testing`
+    :param duration: The expected duration in seconds, or None if it isn't known
+    :param skip_testing: The identifiers to pass to `-skip-testing`
+    :param split_testable: The name of the testable, if the unit is one of its suites or tests from the durations
+    :param tests: The units for each test, if the unit is a suite which can be split
+    """
+
+    only_testing: list[str]
+    duration: float | None
+    skip_testing: list[str]
+    split_testable: str | None
+    tests: list["_TestUnit"]
+
+    def __init__(
+        self,
+        only_testing: list[str],
+        duration: float | None,
+        skip_testing: list[str],
+        split_testable: str | None = None,
+        tests: list["_TestUnit"] | None = None,
+    ) -> None:
+        self.only_testing = only_testing
+        self.duration = duration
+        self.skip_testing = skip_testing
+        self.split_testable = split_testable
+        self.tests = tests if tests is not None else []
+
+
+def load_test_durations(path: str) -> dict[str, float]:
+    """Load the durations of tests from a previous run.
+
+    The file is a JSON object mapping each test's identifier, such as
+    `"AppTests/LoginTests/testLogin()"`, to its duration in seconds. The
+    identifiers are the testable's name followed by the identifier the
+    scheme uses for the test.
+
+    :param path: The path of the JSON file
+
+    :raises ValueError: If the file isn't an object mapping identifiers to durations
+
+    :returns: The durations, keyed by test identifier
+    """
+
+    with open(path, encoding="utf-8") as durations_file:
+        contents = json.load(durations_file)
+
+    if not isinstance(contents, dict):
+        raise ValueError(f"Test durations should be a JSON object: {path}")
+
+    durations: dict[str, float] = {}
+
+    for identifier, duration in contents.items():
+        if isinstance(duration, bool) or not isinstance(duration, (int, float)) or not math.isfinite(duration):
+            raise ValueError(f"Invalid duration for {identifier}: {duration!r}")
+
+        durations[identifier] = float(duration)
+
+    return durations
+
+
+def _testable_name(testable: TestableReference) -> str | None:
+    """Get the name xcodebuild knows a testable by.
+
+    :param testable: The testable
+
+    :returns: The name, or None if the testable doesn't reference a target
+    """
+
+    for reference in testable.buildable_references:
+        if reference.blueprint_name:
+            return reference.blueprint_name
+
+        if reference.buildable_name:
+            return reference.buildable_name.removesuffix(".xctest")
+
+    return None
+
+
+def _tests_by_testable(durations: Mapping[str, float]) -> dict[str, list[str]]:
+    """Group the tests with durations by the testable they are in.
+
+    :param durations: The durations, keyed by test identifier
+
+    :returns: The test identifiers, keyed by testable name
+    """
+
+    tests: dict[str, list[str]] = {}
+
+    for identifier in durations:
+        testable_name, separator, _ = identifier.partition("/")
+
+        if separator:
+            tests.setdefault(testable_name, []).append(identifier)
+
+    return tests
+
+
+def _is_skipped(test: str, skipped: set[str]) -> bool:
+    """Check whether a test is skipped, either itself or through the suite it is in.
+
+    :param test: The test identifier, starting with the testable's name
+    :param skipped: The skipped identifiers, starting with the testable's name
+
+    :returns: True if the test is skipped
+    """
+
+    components = test.split("/")
+    return any("/".join(components[:count]) in skipped for count in range(2, len(components) + 1))
+
+
+def _suite_units(name: str, tests: list[str], durations: Mapping[str, float], skipped: set[str]) -> list[_TestUnit]:
+    """Group the tests of a testable split using the durations into a unit per suite.
+
+    :param name: The name of the testable
+    :param tests: The identifiers of the tests to run
+    :param durations: The durations of tests from a previous run, keyed by test identifier
+    :param skipped: The identifiers the scheme skips in the testable
+
+    :returns: The units
+    """
+
+    suites: dict[str, list[str]] = {}
+
+    for test in tests:
+        suite, _, _ = test.rpartition("/")
+        suites.setdefault(suite if suite != name else test, []).append(test)
+
+    units: list[_TestUnit] = []
+
+    for suite, suite_tests in suites.items():
+        test_units = [_TestUnit([test], durations[test], [], name) for test in suite_tests]
+
+        if suite == suite_tests[0]:
+            # A test which isn't in a suite
+            units.extend(test_units)
+            continue
+
+        suite_skipped = sorted(test for test in skipped if test.startswith(f"{suite}/"))
+        duration = sum(durations[test] for test in suite_tests)
+        units.append(_TestUnit([suite], duration, suite_skipped, name, test_units))
+
+    return units
+
+
+def _test_units(scheme: Scheme, durations: Mapping[str, float]) -> tuple[list[_TestUnit], dict[str, list[str]]]:
+    """Split the tests a scheme runs into units which can be given to different shards.
+
+    :param scheme: The scheme
+    :param durations: The durations of tests from a previous run, keyed by test identifier
+
+    :raises ValueError: If the scheme doesn't have a test action
+
+    :returns: The units, and the tests the scheme skips in each testable which was split using the durations
+    """
+
+    if scheme.test_action is None:
+        raise ValueError(f"Scheme has no test action: {scheme.name}")
+
+    historical_tests = _tests_by_testable(durations)
+    units: list[_TestUnit] = []
+    split_testables: dict[str, list[str]] = {}
+
+    for testable in scheme.test_action.testables:
+        name = _testable_name(testable)
+
+        if testable.skipped or name is None:
+            continue
+
+        skipped = {f"{name}/{test.identifier}" for test in testable.skipped_tests}
+
+        if testable.use_test_selection_whitelist:
+            tests = [f"{name}/{test.identifier}" for test in testable.selected_tests]
+
+            if not tests:
+                continue
+        else:
+            tests = [test for test in historical_tests.get(name, []) if not _is_skipped(test, skipped)]
+
+        if tests and testable.parallelizable:
+            if testable.use_test_selection_whitelist:
+                units.extend(_TestUnit([test], durations.get(test), []) for test in tests)
+            else:
+                units.extend(_suite_units(name, tests, durations, skipped))
+                split_testables[name] = sorted(skipped)
+
+            continue
+
+        known = [durations[test] for test in tests if test in durations]
+        duration = sum(known) if known else None
+
+        if testable.use_test_selection_whitelist:
+            units.append(_TestUnit(tests, duration, []))
+        else:
+            # Tests which aren't in the durations can't be listed, so the testable is run as a whole
+            units.append(_TestUnit([name], durations.get(name, duration), sorted(skipped)))
+
+    return units, split_testables
+
+
+def plan_test_shards(
+    scheme: Scheme,
+    shard_count: int,
+    *,
+    durations: Mapping[str, float] | None = None,
+    max_split_tests: int = DEFAULT_MAX_SPLIT_TESTS,
+) -> list[TestShard]:
+    """Split the tests a scheme runs into shards which take about the same time.
+
+    Tests without a duration are assumed to take the mean duration of those
+    with one, or all the same time if there are no durations at all. When a
+    testable is split using the durations, the suites listed in them are
+    spread across the shards, and the rest of the testable, such as tests
+    added since the durations were recorded, is run on the shard with the
+    least work. That shard runs the whole testable, skipping the suites and
+    tests given to other shards, and it is assumed to take as long as one
+    test without a duration. Suites too long to share the work out evenly
+    are split into their tests, which the catch-all has to skip one by one,
+    so only up to `max_split_tests` tests of each testable are split out.
+
+    :param scheme: The scheme
+    :param shard_count: The number of shards to make
+    :param durations: The durations of tests from a previous run, keyed by
+        test identifier, as loaded by `load_test_durations`. A testable which
+        is run as a whole can be given a duration by its name.
+    :param max_split_tests: The most tests of each testable to split out of
+        their suites. This bounds the length of the catch-all's arguments.
+
+    :raises ValueError: If the shard count isn't positive, or the scheme doesn't have a test action
+
+    :returns: The shards. Some are empty if there are fewer units than shards.
+    """
+
+    if shard_count < 1:
+        raise ValueError(f"Shard count must be positive: {shard_count}")
+
+    if durations is None:
+        durations = {}
+
+    units, split_testables = _test_units(scheme, durations)
+    # Suites are counted test by test, as tests without a duration are compared with single tests
+    known = [test.duration for unit in units for test in unit.tests or [unit] if test.duration is not None]
+    default_duration = sum(known) / len(known) if known else 1.0
+
+    # The longest unit is at the top, with ties going in order of identifier
+    order = itertools.count()
+
+    def pending_entry(unit: _TestUnit) -> tuple[float, str, int, _TestUnit]:
+        duration = default_duration if unit.duration is None else unit.duration
+        return -duration, unit.only_testing[0], next(order), unit
+
+    pending = [pending_entry(unit) for unit in units]
+    heapq.heapify(pending)
+
+    # A suite which would take its shard past an even share of the work is split into its tests
+    target = (sum(-item[0] for item in pending) + default_duration * len(split_testables)) / shard_count
+    split_budgets = dict.fromkeys(split_testables, max_split_tests)
+
+    shards = [TestShard(index) for index in range(shard_count)]
+
+    # The shard with the least work is at the top, with ties going to the earliest shard
+    loads = [(0.0, index) for index in range(shard_count)]
+
+    # The shard each suite or test of a split testable was given to, keyed by testable name
+    placements: dict[str, list[tuple[str, int]]] = {name: [] for name in split_testables}
+
+    while pending:
+        negative_duration, _, _, unit = heapq.heappop(pending)
+        duration = -negative_duration
+        load, index = loads[0]
+
+        split_testable = unit.split_testable
+
+        if (
+            unit.tests
+            and split_testable is not None
+            and load + duration > target
+            and len(unit.tests) <= split_budgets[split_testable]
+        ):
+            split_budgets[split_testable] -= len(unit.tests)
+
+            for test_unit in unit.tests:
+                heapq.heappush(pending, pending_entry(test_unit))
+
+            continue
+
+        shard = shards[index]
+        shard.only_testing.extend(unit.only_testing)
+        shard.skip_testing.extend(unit.skip_testing)
+        shard.duration = load + duration
+        heapq.heapreplace(loads, (shard.duration, index))
+
+        if split_testable is not None:
+            placements[split_testable].extend((test, index) for test in unit.only_testing)
+
+    for name, skipped in split_testables.items():
+        load, index = loads[0]
+        shard = shards[index]
+        shard.only_testing.append(name)
+        shard.skip_testing.extend(sorted(test for test, test_index in placements[name] if test_index != index))
+        shard.skip_testing.extend(skipped)
+        shard.duration = load + default_duration
+        heapq.heapreplace(loads, (shard.duration, index))
+
+    return shards
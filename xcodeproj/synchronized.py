@@ -0,0 +1,285 @@
+"""Expansion of synchronized folders.
+
+A `PBXFileSystemSynchronizedRootGroup` stands for everything in a folder on
+disk, and each target listing the group in `fileSystemSynchronizedGroups`
+builds all of it. A `PBXFileSystemSynchronizedBuildFileExceptionSet` on the
+group lists paths which are the exception for one target: they are left out
+of the target if it uses the group, and added to it if it doesn't.
+
+Paths within a group are relative to the group's folder and always use `/`.
+"""
+
+import concurrent.futures
+import os
+from collections.abc import Iterable, Mapping, Sequence
+
+# Folders which Xcode treats as a single file rather than looking inside
+_PACKAGE_EXTENSIONS = frozenset(
+    [
+        ".app",
+        ".appex",
+        ".bundle",
+        ".docc",
+        ".framework",
+        ".icon",
+        ".playground",
+        ".rcproject",
+        ".scnassets",
+        ".xcassets",
+        ".xcdatamodeld",
+        ".xcframework",
+        ".xcmappingmodel",
+        ".xctemplate",
+    ]
+)
+
+
+class DirectoryListingCache:
+    """Listings of directories, reused while their modification times are unchanged.
+
+    A directory's modification time changes when anything is added to,
+    removed from or renamed in it, which is all that matters for what a
+    synchronized folder contains. Editing a file doesn't cause a rescan.
+    """
+
+    _listings: dict[str, tuple[int, list[str], list[str]]]
+
+    def __init__(self) -> None:
+        self._listings = {}
+
+    def __len__(self) -> int:
+        """Get the number of directories which have been listed.
+
+        :returns: The number of directories
+        """
+
+        return len(self._listings)
+
+    def listing(self, path: str) -> tuple[list[str], list[str]]:
+        """List a directory, unless it hasn't changed since it was last listed.
+
+        Hidden entries are left out, as Xcode ignores them.
+
+        :param path: The path of the directory
+
+        :returns: The names of the files and the names of the folders in the
+            directory, sorted. Both are empty if the directory doesn't exist.
+        """
+
+        try:
+            modification_time = os.stat(path).st_mtime_ns
+        except OSError:
+            self._listings.pop(path, None)
+            return [], []
+
+        cached = self._listings.get(path)
+
+        if cached is not None and cached[0] == modification_time:
+            return cached[1], cached[2]
+
+        files: list[str] = []
+        folders: list[str] = []
+
+        try:
+            with os.scandir(path) as entries:
+                for entry in entries:
+                    if entry.name.startswith("."):
+                        continue
+
+                    if entry.is_dir():
+                        folders.append(entry.name)
+                    else:
+                        files.append(entry.name)
+        except OSError:
+            return [], []
+
+        files.sort()
+        folders.sort()
+
+        # Assigning a single key is atomic, so listings can be made from several threads
+        self._listings[path] = (modification_time, files, folders)
+        return files, folders
+
+    def clear(self) -> None:
+        """Forget every listing."""
+
+        self._listings.clear()
+
+
+def scan_folders(
+    roots: Sequence[tuple[str, Iterable[str]]],
+    *,
+    listing_cache: DirectoryListingCache | None = None,
+    max_workers: int | None = None,
+) -> list[list[str]]:
+    """Find everything in some synchronized folders.
+
+    The folders are scanned breadth first, with the directories at each
+    depth listed concurrently on a thread pool.
+
+    :param roots: The path of each folder, and the paths within it which
+        should be treated as a single item rather than looked inside
+    :param listing_cache: The cache to list directories with, if it should be shared
+    :param max_workers: The maximum number of directories to list at the same time
+
+    :returns: The paths within each folder, sorted. Packages such as asset
+        catalogs and explicit folders are included as a whole.
+    """
+
+    if listing_cache is None:
+        listing_cache = DirectoryListingCache()
+
+    explicit_folders = [frozenset(folders) for _, folders in roots]
+    results: list[list[str]] = [[] for _ in roots]
+
+    # Each entry is the index of a root and a directory within it
+    level: list[tuple[int, str]] = [(root_index, "") for root_index in range(len(roots))]
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+        while level:
+            listings = executor.map(
+                listing_cache.listing,
+                [os.path.join(roots[root_index][0], relative) for root_index, relative in level],
+            )
+            next_level: list[tuple[int, str]] = []
+
+            for (root_index, relative), (files, folders) in zip(level, listings, strict=True):
+                prefix = f"{relative}/" if relative else ""
+                results[root_index].extend(prefix + name for name in files)
+
+                for name in folders:
+                    folder = prefix + name
+
+                    if folder in explicit_folders[root_index] or os.path.splitext(name)[1] in _PACKAGE_EXTENSIONS:
+                        results[root_index].append(folder)
+                    else:
+                        next_level.append((root_index, folder))
+
+            level = next_level
+
+    for result in results:
+        result.sort()
+
+    return results
+
+
+def _is_excepted(path: str, exceptions: frozenset[str]) -> bool:
+    """Check if a path, or a folder it is in, is one of a set of exceptions.
+
+    :param path: The path within the group
+    :param exceptions: The paths of the exceptions
+
+    :returns: True if the path is an exception, False otherwise
+    """
+
+    if path in exceptions:
+        return True
+
+    position = path.find("/")
+
+    while position != -1:
+        if path[:position] in exceptions:
+            return True
+
+        position = path.find("/", position + 1)
+
+    return False
+
+
+class SynchronizedMembership:
+    """The files in synchronized folders, and the targets which build them.
+
+    :param group_files: The absolute path of each group's folder and the paths
+        within it, keyed by group key
+    :param group_targets: The keys of the targets which use each group
+    :param exceptions: The exception paths for each target, keyed by group key
+        and then target key
+    :param file_types: The explicit file types for paths in each group, keyed by group key
+    """
+
+    _files_by_target: dict[str, list[str]]
+    _targets_by_file: dict[str, list[str]]
+    _file_types: dict[str, str]
+    _group_files: dict[str, list[str]]
+
+    def __init__(
+        self,
+        group_files: Mapping[str, tuple[str, list[str]]],
+        group_targets: Mapping[str, list[str]],
+        exceptions: Mapping[str, Mapping[str, Iterable[str]]],
+        file_types: Mapping[str, Mapping[str, str]],
+    ) -> None:
+        self._files_by_target = {}
+        self._targets_by_file = {}
+        self._file_types = {}
+        self._group_files = {}
+
+        for group_key, (root, relative_paths) in group_files.items():
+            absolute_paths = [os.path.join(root, relative_path) for relative_path in relative_paths]
+            self._group_files[group_key] = absolute_paths
+
+            for relative_path, file_type in file_types.get(group_key, {}).items():
+                self._file_types[os.path.join(root, relative_path)] = file_type
+
+            using_targets = group_targets.get(group_key, [])
+            group_exceptions = exceptions.get(group_key, {})
+            target_keys = list(dict.fromkeys([*using_targets, *group_exceptions]))
+
+            for target_key in target_keys:
+                target_exceptions = frozenset(group_exceptions.get(target_key, []))
+                uses_group = target_key in using_targets
+                target_files = self._files_by_target.setdefault(target_key, [])
+
+                # Exceptions leave files out of targets which use the group, and add them to those which don't
+                for relative_path, absolute_path in zip(relative_paths, absolute_paths, strict=True):
+                    if _is_excepted(relative_path, target_exceptions) != uses_group:
+                        target_files.append(absolute_path)
+                        self._targets_by_file.setdefault(absolute_path, []).append(target_key)
+
+    def target_keys(self) -> list[str]:
+        """Get the targets which build any synchronized files.
+
+        :returns: The keys of the targets
+        """
+
+        return list(self._files_by_target)
+
+    def group_files(self, group_key: str) -> list[str]:
+        """Get everything in a group's folder, whichever targets build it.
+
+        :param group_key: The key of the group
+
+        :returns: The absolute paths, sorted
+        """
+
+        return list(self._group_files.get(group_key, []))
+
+    def files_for_target(self, target_key: str) -> list[str]:
+        """Get the synchronized files a target builds.
+
+        :param target_key: The key of the target
+
+        :returns: The absolute paths, in group order
+        """
+
+        return list(self._files_by_target.get(target_key, []))
+
+    def targets_for_file(self, path: str) -> list[str]:
+        """Get the targets which build a synchronized file.
+
+        :param path: The absolute path of the file
+
+        :returns: The keys of the targets
+        """
+
+        return list(self._targets_by_file.get(os.path.normpath(path), []))
+
+    def file_type(self, path: str) -> str | None:
+        """Get the file type a synchronized file has been given explicitly.
+
+        :param path: The absolute path of the file
+
+        :returns: The file type, or None if Xcode works it out from the extension
+        """
+
+        return self._file_types.get(os.path.normpath(path))
@@ -0,0 +1,317 @@
+"""The graph of dependencies between targets."""
+
+from collections.abc import Iterable
+
+
+class DependencyCycleError(Exception):
+    """Raised when targets depend on each other, so they can't be ordered.
+
+    :param cycles: The keys of the targets in each cycle
+    """
+
+    def __init__(self, cycles: list[list[str]]) -> None:
+        super().__init__(f"Target dependencies contain {len(cycles)} cycle(s): {cycles}")
+        self.cycles = cycles
+
+
+class TargetGraph:
+    """The dependencies between targets, and the orders they can be built in.
+
+    The strongly connected components of the graph are found once, when the
+    graph is built. Transitive closures are computed for every target the
+    first time one is asked for, as bitsets over the components, and then
+    kept.
+
+    :param dependencies: The keys of the targets each target depends on
+        directly, in project order. Keys which aren't targets in the graph are
+        ignored.
+    """
+
+    _keys: list[str]
+    _positions: dict[str, int]
+    _dependencies: list[list[int]]
+    _dependents: list[list[int]]
+    _components: list[list[int]]
+    _component_of: list[int]
+    _levels: list[list[int]] | None
+    _dependency_closures: list[int] | None
+    _dependent_closures: list[int] | None
+    _closure_keys_cache: dict[tuple[bool, int], list[str]]
+
+    def __init__(self, dependencies: Iterable[tuple[str, list[str]]]) -> None:
+        edges = list(dependencies)
+
+        self._keys = [target_key for target_key, _ in edges]
+        self._positions = {target_key: position for position, target_key in enumerate(self._keys)}
+        self._dependencies = []
+        self._dependents = [[] for _ in self._keys]
+
+        for position, (_, dependency_keys) in enumerate(edges):
+            dependency_positions = list(
+                dict.fromkeys(
+                    self._positions[dependency_key]
+                    for dependency_key in dependency_keys
+                    if dependency_key in self._positions
+                )
+            )
+            self._dependencies.append(dependency_positions)
+
+            for dependency_position in dependency_positions:
+                self._dependents[dependency_position].append(position)
+
+        self._components, self._component_of = self._find_components()
+        self._levels = None
+        self._dependency_closures = None
+        self._dependent_closures = None
+        self._closure_keys_cache = {}
+
+    def __len__(self) -> int:
+        """Get the number of targets in the graph.
+
+        :returns: The number of targets
+        """
+
+        return len(self._keys)
+
+    def dependencies(self, target_key: str) -> list[str]:
+        """Get the targets a target depends on directly.
+
+        :param target_key: The key of the target
+
+        :returns: The keys of the dependencies, in the order they are listed
+        """
+
+        return self._to_keys(self._dependencies[self._positions[target_key]])
+
+    def dependents(self, target_key: str) -> list[str]:
+        """Get the targets which depend on a target directly.
+
+        :param target_key: The key of the target
+
+        :returns: The keys of the dependents, in project order
+        """
+
+        return self._to_keys(self._dependents[self._positions[target_key]])
+
+    def transitive_dependencies(self, target_key: str) -> list[str]:
+        """Get every target a target depends on, directly or indirectly.
+
+        :param target_key: The key of the target
+
+        :returns: The keys of the dependencies, in project order. The target
+            itself is only included if it is part of a cycle.
+        """
+
+        if self._dependency_closures is None:
+            self._dependency_closures = self._closures(self._dependencies)
+
+        return self._closure_keys(self._dependency_closures, target_key, dependents=False)
+
+    def transitive_dependents(self, target_key: str) -> list[str]:
+        """Get every target which depends on a target, directly or indirectly.
+
+        :param target_key: The key of the target
+
+        :returns: The keys of the dependents, in project order. The target
+            itself is only included if it is part of a cycle.
+        """
+
+        if self._dependent_closures is None:
+            self._dependent_closures = self._closures(self._dependents)
+
+        return self._closure_keys(self._dependent_closures, target_key, dependents=True)
+
+    def cycles(self) -> list[list[str]]:
+        """Find the groups of targets which depend on each other.
+
+        :returns: The keys of the targets in each cycle, in project order
+        """
+
+        return [
+            self._to_keys(sorted(component))
+            for component in self._components
+            if len(component) > 1 or component[0] in self._dependencies[component[0]]
+        ]
+
+    def levels(self) -> list[list[str]]:
+        """Group the targets so that each group only depends on earlier ones.
+
+        The targets in a level can be built in parallel once the levels before
+        it have been built.
+
+        :raises DependencyCycleError: If there are cycles in the graph
+
+        :returns: The keys of the targets in each level, in project order
+        """
+
+        if self._levels is None:
+            cycles = self.cycles()
+
+            if cycles:
+                raise DependencyCycleError(cycles)
+
+            # The components are found in reverse topological order, with dependencies first
+            level_of = [0] * len(self._keys)
+            levels: list[list[int]] = []
+
+            for component in self._components:
+                position = component[0]
+                level = max((level_of[dependency] + 1 for dependency in self._dependencies[position]), default=0)
+                level_of[position] = level
+
+                while len(levels) <= level:
+                    levels.append([])
+
+                levels[level].append(position)
+
+            self._levels = [sorted(level) for level in levels]
+
+        return [self._to_keys(level) for level in self._levels]
+
+    def topological_order(self) -> list[str]:
+        """Order the targets so that every target comes after its dependencies.
+
+        :raises DependencyCycleError: If there are cycles in the graph
+
+        :returns: The keys of the targets, level by level
+        """
+
+        return [target_key for level in self.levels() for target_key in level]
+
+    def _to_keys(self, positions: Iterable[int]) -> list[str]:
+        """Convert target positions to keys.
+
+        :param positions: The positions
+
+        :returns: The keys
+        """
+
+        keys = self._keys
+        return [keys[position] for position in positions]
+
+    def _find_components(self) -> tuple[list[list[int]], list[int]]:
+        """Find the strongly connected components, without recursion.
+
+        This is Tarjan's algorithm with an explicit stack.
+
+        :returns: The components, with each one after every component it
+            depends on, and the component of each target
+        """
+
+        count = len(self._keys)
+        index_of = [-1] * count
+        low_link = [0] * count
+        on_stack = [False] * count
+        component_of = [-1] * count
+        components: list[list[int]] = []
+        stack: list[int] = []
+        next_index = 0
+
+        for root in range(count):
+            if index_of[root] != -1:
+                continue
+
+            # Each frame is a target and the position of the next dependency to visit
+            frames = [(root, 0)]
+            index_of[root] = low_link[root] = next_index
+            next_index += 1
+            stack.append(root)
+            on_stack[root] = True
+
+            while frames:
+                position, next_dependency = frames[-1]
+                dependencies = self._dependencies[position]
+
+                if next_dependency < len(dependencies):
+                    frames[-1] = (position, next_dependency + 1)
+                    dependency = dependencies[next_dependency]
+
+                    if index_of[dependency] == -1:
+                        index_of[dependency] = low_link[dependency] = next_index
+                        next_index += 1
+                        stack.append(dependency)
+                        on_stack[dependency] = True
+                        frames.append((dependency, 0))
+                    elif on_stack[dependency]:
+                        low_link[position] = min(low_link[position], index_of[dependency])
+
+                    continue
+
+                frames.pop()
+
+                if frames:
+                    parent = frames[-1][0]
+                    low_link[parent] = min(low_link[parent], low_link[position])
+
+                if low_link[position] == index_of[position]:
+                    component: list[int] = []
+
+                    while True:
+                        member = stack.pop()
+                        on_stack[member] = False
+                        component_of[member] = len(components)
+                        component.append(member)
+
+                        if member == position:
+                            break
+
+                    components.append(component)
+
+        return components, component_of
+
+    def _closures(self, edges: list[list[int]]) -> list[int]:
+        """Compute the transitive closure of every component.
+
+        :param edges: The edges to follow, either dependencies or dependents
+
+        :returns: A bitset of the reachable targets for each component
+        """
+
+        components = self._components
+        component_of = self._component_of
+        closures = [0] * len(components)
+
+        # Dependencies are closed from the first component onwards, dependents from the last
+        order = range(len(components)) if edges is self._dependencies else range(len(components) - 1, -1, -1)
+
+        for component_index in order:
+            closure = 0
+
+            for position in components[component_index]:
+                for neighbour in edges[position]:
+                    closure |= 1 << neighbour
+
+                    if component_of[neighbour] != component_index:
+                        closure |= closures[component_of[neighbour]]
+
+            closures[component_index] = closure
+
+        return closures
+
+    def _closure_keys(self, closures: list[int], target_key: str, *, dependents: bool) -> list[str]:
+        """Convert the closure of a target to keys.
+
+        :param closures: The closures of each component
+        :param target_key: The key of the target
+        :param dependents: True if the closures are of dependents, False if they are of dependencies
+
+        :returns: The keys of the reachable targets, in project order
+        """
+
+        component_index = self._component_of[self._positions[target_key]]
+        cache_key = (dependents, component_index)
+        keys = self._closure_keys_cache.get(cache_key)
+
+        if keys is None:
+            closure = closures[component_index]
+            positions = []
+
+            while closure:
+                lowest = closure & -closure
+                positions.append(lowest.bit_length() - 1)
+                closure ^= lowest
+
+            keys = self._to_keys(positions)
+            self._closure_keys_cache[cache_key] = keys
+
+        return list(keys)
@@ -49,6 +49,15 @@ class PBXTarget(PBXObject):
     name: str
     product_name: str | None
 
+    def referenced_keys(self) -> list[str]:
+        """Get the keys in the configuration list, build phases, dependencies and synchronized groups."""
+        return [
+            self.build_configuration_list_id,
+            *self.build_phases_ids,
+            *self.dependency_ids,
+            *(self.file_system_synchronized_group_ids or []),
+        ]
+
     @property
     def build_phases(self) -> list[PBXBuildPhase]:
         """Get the build phases in the target."""
@@ -86,6 +95,15 @@ class PBXNativeTarget(PBXTarget):
     package_product_dependencies: list[str] | None
     file_system_synchronized_groups: list[str] | None
 
+    def referenced_keys(self) -> list[str]:
+        """Get the keys of any target, and those in the build rules, product and package products."""
+        keys = super().referenced_keys()
+        keys.extend(self.build_rule_ids or [])
+        if self.product_reference_id is not None:
+            keys.append(self.product_reference_id)
+        keys.extend(self.package_product_dependencies or [])
+        return keys
+
     @property
     def product_reference(self) -> PBXFileReference | None:
         """Get the product reference of the target."""
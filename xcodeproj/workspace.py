@@ -0,0 +1,327 @@
+"""Reading of workspaces and loading of the projects in them.
+
+A workspace lists its members in `contents.xcworkspacedata`, as `FileRef`
+elements which may be nested in `Group` elements. Each location is relative
+to something depending on its prefix:
+
+- `group:` is relative to the enclosing group, or the container at the top level
+- `container:` is relative to the folder containing the workspace
+- `self:` is relative to the project a workspace is embedded in
+- `absolute:` is an absolute path
+- `developer:` is relative to the Xcode developer folder, so can't be resolved here
+"""
+
+import concurrent.futures
+import functools
+import os
+import xml.etree.ElementTree as ET
+from typing import TYPE_CHECKING, Any, cast
+
+from . import cache
+from .pathobjects import PBXFileReference
+from .targets import PBXNativeTarget, PBXTarget
+
+if TYPE_CHECKING:
+    from . import XcodeProject
+
+WORKSPACE_DATA_FILE_NAME = "contents.xcworkspacedata"
+
+
+class WorkspaceParseError(Exception):
+    """Raised when the contents of a workspace can't be read.
+
+    :param message: A description of the problem
+    :param path: The path of the workspace
+    """
+
+    def __init__(self, message: str, path: str) -> None:
+        super().__init__(f"{message}: {path}")
+        self.path = path
+
+
+class WorkspaceFileRef:
+    """A file in a workspace, usually a project.
+
+    :param location: The location as written in the workspace, such as "group:App.xcodeproj"
+    :param path: The absolute path of the file, or None if it can't be worked out
+    :param groups: The names of the groups the file is in, outermost first
+    """
+
+    location: str
+    path: str | None
+    groups: list[str]
+
+    def __init__(self, location: str, path: str | None, groups: list[str]) -> None:
+        self.location = location
+        self.path = path
+        self.groups = groups
+
+    @property
+    def is_project(self) -> bool:
+        """Check if the file is an Xcode project."""
+        return self.path is not None and self.path.endswith(".xcodeproj")
+
+    def __repr__(self) -> str:
+        return f"WorkspaceFileRef({self.location!r})"
+
+
+def resolve_location(location: str, *, group_folder: str, container_folder: str, self_folder: str) -> str | None:
+    """Resolve a location in a workspace to a path.
+
+    Schemes use the same locations for the containers of their buildable
+    references, such as "container:App.xcodeproj".
+
+    :param location: The location, such as "group:App.xcodeproj"
+    :param group_folder: The folder of the enclosing group
+    :param container_folder: The folder containing the workspace
+    :param self_folder: The project the workspace is embedded in, or the container folder if it isn't
+
+    :returns: The absolute path, or None if the location can't be resolved
+    """
+
+    kind, _, relative_path = location.partition(":")
+
+    if kind == "group":
+        base_folder = group_folder
+    elif kind == "container":
+        base_folder = container_folder
+    elif kind == "self":
+        base_folder = self_folder
+    elif kind == "absolute":
+        base_folder = "/"
+    else:
+        return None
+
+    return os.path.normpath(os.path.join(base_folder, relative_path))
+
+
+def read_workspace_data(workspace_path: str) -> list[WorkspaceFileRef]:
+    """Read the files a workspace contains.
+
+    :param workspace_path: The path of the .xcworkspace
+
+    :raises WorkspaceParseError: If the contents of the workspace can't be read
+
+    :returns: The files, in the order they are listed
+    """
+
+    workspace_path = os.path.abspath(workspace_path)
+    data_path = os.path.join(workspace_path, WORKSPACE_DATA_FILE_NAME)
+
+    try:
+        root = ET.parse(data_path).getroot()
+    except (OSError, ET.ParseError) as ex:
+        raise WorkspaceParseError("Unable to read workspace contents", workspace_path) from ex
+
+    if root.tag != "Workspace":
+        raise WorkspaceParseError(f"Unexpected root element {root.tag}", workspace_path)
+
+    # A workspace inside a project, such as project.xcworkspace, belongs to that project
+    self_folder = os.path.dirname(workspace_path)
+    container_folder = os.path.dirname(self_folder) if self_folder.endswith(".xcodeproj") else self_folder
+
+    file_refs: list[WorkspaceFileRef] = []
+
+    # Each entry is an element, the folder of its group and the names of the enclosing groups
+    stack: list[tuple[ET.Element, str, list[str]]] = [(child, container_folder, []) for child in reversed(list(root))]
+
+    while stack:
+        element, group_folder, groups = stack.pop()
+        location = element.attrib.get("location", "")
+        path = resolve_location(
+            location,
+            group_folder=group_folder,
+            container_folder=container_folder,
+            self_folder=self_folder,
+        )
+
+        if element.tag == "FileRef":
+            file_refs.append(WorkspaceFileRef(location, path, groups))
+        elif element.tag == "Group":
+            # Groups without a location don't change the folder
+            child_folder = group_folder if path is None else path
+            child_groups = [*groups, element.attrib.get("name", os.path.basename(child_folder))]
+            stack.extend((child, child_folder, child_groups) for child in reversed(list(element)))
+
+    return file_refs
+
+
+def _load_project_payload(
+    project_path: str,
+    *,
+    ignore_deserialization_errors: bool,
+    use_plutil: bool,
+    write_cache: bool,
+) -> dict[str, Any]:
+    """Load the cache payload of a project, parsing the project on a cache miss.
+
+    This runs in a worker process, and the payload is what is sent back, as
+    it is much quicker to pickle than the objects themselves.
+
+    :param project_path: The path to the xcodeproj
+    :param ignore_deserialization_errors: Set to True to ignore unknown keys on objects
+    :param use_plutil: Set to True to parse the pbxproj with `plutil` on a cache miss
+    :param write_cache: Set to True to cache the project on a cache miss
+
+    :returns: The payload for the project
+    """
+
+    try:
+        cache_path = cache.project_cache_path(project_path)
+        payload = cast(dict[str, Any], cache.read_payload(cache_path))
+        cache.mark_used(cache_path)
+        return payload
+    except Exception:
+        pass
+
+    # The package imports this module, so the project class is imported here to avoid a cycle
+    from . import XcodeProject  # noqa: PLC0415
+
+    project = XcodeProject(
+        project_path,
+        ignore_deserialization_errors=ignore_deserialization_errors,
+        use_plutil=use_plutil,
+    )
+
+    if write_cache:
+        project.write_cache()
+
+    return project._cache_payload()
+
+
+class XcodeWorkspace:
+    """Represents an Xcode workspace and the projects in it.
+
+    The member projects are loaded on a process pool, through the cache, so
+    large workspaces load in roughly the time of their largest projects.
+    Projects which don't exist on disk are skipped.
+
+    :param path: The path to the .xcworkspace
+    :param max_workers: The maximum number of processes to load projects with. Defaults to the number of CPUs.
+    :param ignore_deserialization_errors: Set to True to ignore unknown keys on objects
+    :param use_plutil: Set to True to parse each pbxproj with `plutil` on a cache miss
+    :param write_cache: Set to True to cache each project which wasn't cached already
+
+    :raises WorkspaceParseError: If the contents of the workspace can't be read
+    """
+
+    path: str
+    file_refs: list[WorkspaceFileRef]
+    projects: dict[str, "XcodeProject"]
+    missing_project_paths: list[str]
+
+    def __init__(
+        self,
+        path: str,
+        *,
+        max_workers: int | None = None,
+        ignore_deserialization_errors: bool = False,
+        use_plutil: bool = False,
+        write_cache: bool = False,
+    ) -> None:
+        self.path = path
+        self.file_refs = read_workspace_data(path)
+        self.missing_project_paths = []
+
+        project_paths: list[str] = []
+
+        for file_ref in self.file_refs:
+            if not file_ref.is_project:
+                continue
+
+            project_path = cast(str, file_ref.path)
+
+            if project_path in project_paths:
+                continue
+
+            if os.path.isfile(os.path.join(project_path, "project.pbxproj")):
+                project_paths.append(project_path)
+            else:
+                self.missing_project_paths.append(project_path)
+
+        load_payload = functools.partial(
+            _load_project_payload,
+            ignore_deserialization_errors=ignore_deserialization_errors,
+            use_plutil=use_plutil,
+            write_cache=write_cache,
+        )
+
+        if max_workers is None:
+            max_workers = os.cpu_count() or 1
+
+        max_workers = min(max_workers, len(project_paths))
+
+        # Starting processes isn't worth it for a single project
+        if max_workers <= 1:
+            payloads = [load_payload(project_path) for project_path in project_paths]
+        else:
+            with concurrent.futures.ProcessPoolExecutor(max_workers=max_workers) as executor:
+                payloads = list(executor.map(load_payload, project_paths))
+
+        from . import XcodeProject  # noqa: PLC0415
+
+        self.projects = {
+            project_path: XcodeProject._from_cache_payload(project_path, payload)
+            for project_path, payload in zip(project_paths, payloads, strict=True)
+        }
+
+    def targets_named(self, name: str) -> list[tuple["XcodeProject", PBXTarget]]:
+        """Get all the targets with a name in any project, including aggregate targets.
+
+        :param name: The name of the targets to find
+
+        :returns: The project and target of each match, in workspace order
+        """
+
+        return [(project, target) for project in self.projects.values() for target in project.targets_named(name)]
+
+    def target_by_name(self, name: str) -> tuple["XcodeProject", PBXNativeTarget] | None:
+        """Get the first native target with a name in any project.
+
+        :param name: The name of the target to find
+
+        :returns: The project and target if found, else None
+        """
+
+        for project in self.projects.values():
+            target = project.target_by_name(name)
+
+            if target is not None:
+                return project, target
+
+        return None
+
+    def file_references_for_path(
+        self, path: str, *, case_sensitive: bool = True
+    ) -> list[tuple["XcodeProject", PBXFileReference]]:
+        """Find the file references for a path on disk in any project.
+
+        :param path: The path of the file. Relative paths are relative to the current directory.
+        :param case_sensitive: Set to False to match paths regardless of case, as APFS does
+
+        :returns: The project and file reference of each match, in workspace order
+        """
+
+        return [
+            (project, file_reference)
+            for project in self.projects.values()
+            for file_reference in project.file_references_for_path(path, case_sensitive=case_sensitive)
+        ]
+
+    def targets_containing_path(
+        self, path: str, *, case_sensitive: bool = True
+    ) -> list[tuple["XcodeProject", PBXTarget]]:
+        """Find the targets in any project which build a file on disk.
+
+        :param path: The path of the file. Relative paths are relative to the current directory.
+        :param case_sensitive: Set to False to match paths regardless of case, as APFS does
+
+        :returns: The project and target of each match, in workspace order
+        """
+
+        matches: list[tuple[XcodeProject, PBXTarget]] = []
+
+        for project, file_reference in self.file_references_for_path(path, case_sensitive=case_sensitive):
+            matches.extend((project, target) for target in project.targets_containing_file(file_reference.object_key))
+
+        return matches
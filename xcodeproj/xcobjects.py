@@ -21,6 +21,12 @@ class XCBuildConfiguration(PBXObject):
     build_settings: dict[str, Any]
     name: str
 
+    def referenced_keys(self) -> list[str]:
+        """Get the key in `base_configuration_reference_id`."""
+        if not self.base_configuration_reference_id:
+            return []
+        return [self.base_configuration_reference_id]
+
     @property
     def base_configuration(self) -> "XCBuildConfiguration | None":
         """Get the base configuration for this build configureation.
@@ -49,6 +55,10 @@ class XCConfigurationList(PBXObject):
     default_configuration_is_visible: bool
     default_configuration_name: str
 
+    def referenced_keys(self) -> list[str]:
+        """Get the keys in `build_configuration_ids`."""
+        return list(self.build_configuration_ids)
+
     @property
     def build_configurations(self) -> list[XCBuildConfiguration]:
         """Get all the build configurations for this list.
@@ -72,6 +82,10 @@ class XCSwiftPackageProductDependency(PBXObject):
     package: str
     product_name: str
 
+    def referenced_keys(self) -> list[str]:
+        """Get the key in `package`."""
+        return [self.package]
+
 
 @deserialize.key("repository_url", "repositoryURL")
 @deserialize.downcast_identifier(PBXObject, "XCRemoteSwiftPackageReference")